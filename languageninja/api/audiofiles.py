@@ -0,0 +1,78 @@
+# audiofiles.py
+import os
+from starlette.exceptions import HTTPException
+from fastapi.staticfiles import StaticFiles
+from languageninja.audio.service import TTSBusyError
+from languageninja.models.word import parse_audio_file_name, speech_text
+
+#----------------------------------#
+# Class definition: LazyAudioFiles #
+#----------------------------------#
+class LazyAudioFiles(StaticFiles):
+    def __init__(self, directory, service, vocabulary, lazy: bool = True):
+        """
+        Serves /audio/{key}/{key}_{lang}_{nn}_{rate}.mp3 from the audio folder, like StaticFiles.
+        In lazy mode, clips missing from the folder (or the whole folder) are synthesized on demand
+        by the TTS service and served from its size-bounded clip cache; concurrent requests for
+        the same clip share one synthesis.
+
+        :param directory: Pre-rendered audio folder (may be absent or partial)
+        :param service: TTSService (see audio/service.py)
+        :param vocabulary: VocabularyStore providing the texts
+        :param lazy: Synthesize missing clips (False: plain StaticFiles behaviour)
+        """
+        super().__init__(directory=directory, check_dir=False)
+        self.service = service
+        self.vocabulary = vocabulary
+        self.lazy = lazy
+
+    async def check_config(self):
+        """
+        Like StaticFiles, but in lazy mode the audio folder may not exist (yet): every clip is then synthesized.
+        """
+        if self.lazy and not os.path.exists(self.directory):
+            return
+        await super().check_config()
+
+    def clip_text(self, path: str):
+        """
+        Returns (text, lang, rate) of a clip path "key/file", or None if it names no clip of a known word.
+        """
+        key, _, file_name = path.replace(os.sep, "/").partition("/")
+        parsed = parse_audio_file_name(key, file_name)
+        if parsed is None or parsed[3] != self.service.encoder.ext:
+            return None
+        lang, sentence, rate, _ = parsed
+        entry = self.vocabulary.get(key)
+        if entry is None:
+            return None
+        try:
+            text, _ = speech_text(entry["langs"], entry["samples"], lang, sentence)
+        except (ValueError, KeyError, IndexError, TypeError):
+            return None
+        return (text, lang, rate) if text else None
+
+    async def get_response(self, path: str, scope):
+        try:
+            return await super().get_response(path, scope)
+        except HTTPException as e:
+            if e.status_code != 404 or not self.lazy:
+                raise
+            clip = self.clip_text(path)
+            if clip is None:
+                raise
+
+        # Missing clip of a known word: synthesize (or join a running synthesis), then serve from the cache
+        for _ in range(2):
+            try:
+                digest = await self.service.clip(*clip)
+            except TTSBusyError as e:
+                raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+            except Exception as e:
+                raise HTTPException(status_code=502, detail=f"Speech synthesis failed: {e}")
+            clip_path = self.service.clip_path(digest)
+            try:
+                return self.file_response(clip_path, os.stat(clip_path), scope)
+            except FileNotFoundError:
+                continue  # evicted in between: synthesize again
+        raise HTTPException(status_code=503, detail="Clip cache under pressure, try again later", headers={"Retry-After": "1"})
@@ -0,0 +1,157 @@
+# caching.py
+import hashlib
+from dataclasses import dataclass
+from typing import Optional
+from languageninja.api.responses import negotiate_encoding
+
+#-------------#
+# Cache rules #
+#-------------#
+# - etag="version": ETag derived from the content version + URL + content coding, checked before the endpoint runs
+# - etag="body":    ETag derived from the response body (for content without a version)
+# - etag=None:      leave ETag handling to the endpoint (StaticFiles already sends ETags and 304s)
+@dataclass(frozen=True)
+class CacheRule:
+    prefix: str
+    cache_control: str
+    etag: Optional[str] = None
+
+# Audio clips only change when the audio tree is rebuilt (i.e. on deployment)
+AUDIO_CACHE_CONTROL = "public, max-age=604800, immutable"
+
+CACHE_RULES = (
+    CacheRule("/api/word/", "public, max-age=3600", etag="version"),
+    CacheRule("/api/words", "public, max-age=3600", etag="version"),
+    CacheRule("/api/search", "public, max-age=3600", etag="version"),
+    CacheRule("/api/formats", "public, max-age=3600", etag="body"),
+    CacheRule("/api/audio/", AUDIO_CACHE_CONTROL, etag="body"),
+    # Synthesized clips are content-addressed: a URL always names the same audio
+    CacheRule("/api/tts/", AUDIO_CACHE_CONTROL, etag="body"),
+    # Random picks: browsers always ask again, shared caches (CDN) may reuse a pick for a few seconds
+    CacheRule("/api/random", "public, max-age=0, s-maxage=5"),
+    # Per-user scheduling state
+    CacheRule("/api/next", "private, no-store"),
+    CacheRule("/api/review", "private, no-store"),
+    CacheRule("/audio/", AUDIO_CACHE_CONTROL),
+    CacheRule("/audio-", AUDIO_CACHE_CONTROL),
+    CacheRule("/bundles/", AUDIO_CACHE_CONTROL),
+)
+
+# Strong ETag from arbitrary bytes
+def make_etag(*parts: bytes) -> str:
+    digest = hashlib.blake2b(digest_size=12)
+    for part in parts:
+        digest.update(part)
+        digest.update(b'\0')
+    return f'"{digest.hexdigest()}"'
+
+# Does an If-None-Match header value match the ETag?
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+#-------------------------------------#
+# Class definition: CachingMiddleware #
+#-------------------------------------#
+class CachingMiddleware:
+    def __init__(self, app, version=lambda: "", rules=CACHE_RULES):
+        """
+        ASGI middleware adding Cache-Control/ETag headers and answering If-None-Match with 304.
+
+        :param version: Callable returning the current content version (changes on data reload)
+        :param rules: Cache rules, matched by URL path prefix (first match wins)
+        """
+        self.app = app
+        self.version = version
+        self.rules = rules
+
+    def match(self, path: str) -> Optional[CacheRule]:
+        for rule in self.rules:
+            if path.startswith(rule.prefix):
+                return rule
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        rule = self.match(scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        if_none_match = headers.get(b"if-none-match", b"").decode("latin-1")
+
+        # Version ETag: answer revalidations without running the endpoint
+        etag = None
+        if rule.etag == "version":
+            coding = negotiate_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+            etag = make_etag(self.version().encode(), scope["path"].encode(), scope.get("query_string", b""), coding.encode())
+            if etag_matches(if_none_match, etag):
+                # The ETag depends on the content coding, like the 200 response it stands for
+                await self.send_not_modified(send, etag, rule, vary=b"Accept-Encoding")
+                return
+
+        # Body ETag: buffer the (small) response to hash it
+        if rule.etag == "body":
+            await self.call_buffered(scope, receive, send, rule, if_none_match)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = self.add_headers(message, rule, etag)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    @staticmethod
+    def add_headers(message, rule: CacheRule, etag: Optional[str]):
+        """
+        Adds Cache-Control (and ETag) to successful responses that do not set them already.
+        """
+        headers = list(message.get("headers", []))
+        if message["status"] not in (200, 206):
+            return headers
+        names = {name.lower() for name, _ in headers}
+        if b"cache-control" not in names:
+            headers.append((b"cache-control", rule.cache_control.encode()))
+        if etag and b"etag" not in names:
+            headers.append((b"etag", etag.encode()))
+        return headers
+
+    @staticmethod
+    async def send_not_modified(send, etag: str, rule: CacheRule, vary: Optional[bytes] = None):
+        """
+        Answers a matching revalidation with 304, carrying the Vary header of the full response (if any).
+        """
+        headers = [(b"etag", etag.encode()), (b"cache-control", rule.cache_control.encode())]
+        if vary:
+            headers.append((b"vary", vary))
+        await send({"type": "http.response.start", "status": 304, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def call_buffered(self, scope, receive, send, rule: CacheRule, if_none_match: str):
+        start, chunks = None, []
+
+        async def capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+
+        body = b"".join(chunks)
+        etag = make_etag(body)
+        if start["status"] == 200 and etag_matches(if_none_match, etag):
+            vary = next((value for name, value in start.get("headers", []) if name.lower() == b"vary"), None)
+            await self.send_not_modified(send, etag, rule, vary=vary)
+            return
+        start["headers"] = self.add_headers(start, rule, etag)
+        await send(start)
+        await send({"type": "http.response.body", "body": body})
@@ -1,6 +1,17 @@
 # main.py
 from languageninja.api.router import api
+from languageninja.api.caching import CachingMiddleware
+from languageninja.api.audiofiles import LazyAudioFiles
+from languageninja.api.responses import payloads
+from languageninja.models.search import search_index
+from languageninja.models.scheduler import scheduler
+from languageninja.models.vocabulary import vocabulary
+from languageninja.audio.bundle import bundles, BUNDLES_URL_PREFIX
+from languageninja.audio.service import tts
+from languageninja.audio.encoder import DEFAULT_PROFILE, available_profiles, get_profile, profile_folder
+from contextlib import asynccontextmanager
 from pathlib import Path
+import os
 from fastapi import FastAPI
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
@@ -8,10 +19,45 @@ from fastapi.staticfiles import StaticFiles
 APP_DIR = Path(__file__).resolve().parent
 FRONTEND = "ui"
 INDEX_FILE = Path(FRONTEND) / "main.html"
+# Synthesize /audio clips missing from data/audio on demand (the folder may be left out of the image);
+# on by default where ffmpeg and the TTS engine are installed, otherwise missing clips are plain 404s
+LAZY_AUDIO = os.getenv("LANGUAGENINJA_LAZY_AUDIO", "1" if tts.available() else "0") == "1"
+AUDIO_DIR = APP_DIR.parent.parent / "data" / "audio"
+# Audio trees of the other encoding profiles are served under /audio-<profile>
+AUDIO_PROFILE_URL_PREFIX = "/audio-"
 
-app = FastAPI(title="LanguageNinja API (minimal)")
+# Encoding profiles with an audio tree, smallest first (clients play the first format they support)
+def audio_formats():
+    formats = []
+    for name in available_profiles(str(AUDIO_DIR)):
+        encoder = get_profile(name)
+        url = "/audio" if name == DEFAULT_PROFILE else f"{AUDIO_PROFILE_URL_PREFIX}{name}"
+        formats.append({"profile": name, "url": url, "ext": encoder.ext, "mime": encoder.mime, "kbps": encoder.bitrate_kbps})
+    return sorted(formats, key=lambda f: f["kbps"])
+
+# Load vocabulary and audio bundle index, pre-encode word responses and build the search index, once per worker
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    vocabulary.load()
+    bundles.load()
+    payloads.build()
+    search_index.build()
+    yield
+    scheduler.close()
+    tts.close()
+
+app = FastAPI(title="LanguageNinja API (minimal)", lifespan=lifespan)
 app.include_router(api, prefix="/api")
-app.mount("/audio", StaticFiles(directory=APP_DIR.parent.parent / "data" / "audio"), name="audio")
+app.add_middleware(CachingMiddleware, version=payloads.current_version)
+app.state.audio_formats = audio_formats()
+for fmt in app.state.audio_formats:
+    if fmt["profile"] != DEFAULT_PROFILE:
+        app.mount(fmt["url"], StaticFiles(directory=profile_folder(fmt["profile"], str(AUDIO_DIR))), name=f"audio-{fmt['profile']}")
+app.mount("/audio", LazyAudioFiles(AUDIO_DIR, tts, vocabulary, lazy=LAZY_AUDIO), name="audio")
+# Optional audio bundles (see audio/bundle.py)
+BUNDLES_DIR = APP_DIR.parent.parent / "data" / "audio_bundles"
+if BUNDLES_DIR.is_dir():
+    app.mount(BUNDLES_URL_PREFIX, StaticFiles(directory=BUNDLES_DIR), name="bundles")
 
 @app.get("/")
 def root():
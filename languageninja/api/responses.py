@@ -0,0 +1,157 @@
+# responses.py
+import gzip, json
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from languageninja.models.vocabulary import vocabulary
+from languageninja.audio.bundle import bundles
+
+# Brotli is optional: without it only gzip variants are built
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+#-------------------#
+# Static parameters #
+#-------------------#
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+# Batches are compressed per request: trade ratio for speed
+BATCH_GZIP_LEVEL = 5
+BATCH_BROTLI_QUALITY = 5
+
+# Word payload returned by the API (with the audio bundle index, if bundles are built)
+def word_payload(entry):
+    payload = {"key": entry["key"], "langs": entry["langs"], "samples": entry["samples"]}
+    audio = bundles.describe(entry["key"])
+    if audio is not None:
+        payload["audio"] = audio
+    return payload
+
+# Pick the best content coding we have for an Accept-Encoding header ("br", "gzip" or "identity")
+def negotiate_encoding(accept_encoding: str) -> str:
+    accepted = {}
+    for item in (accept_encoding or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    available = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best = max(available, key=lambda c: accepted.get(c, accepted.get("*", 0.0)))
+    return best if accepted.get(best, accepted.get("*", 0.0)) > 0 else "identity"
+
+#--------------------------------#
+# Class definition: PayloadCache #
+#--------------------------------#
+class PayloadCache:
+    def __init__(self, store=vocabulary, bundle_index=bundles):
+        """
+        Word responses serialised once, stored as bytes in identity/gzip/brotli variants.
+        Bodies are serialised up front (cheap); gzip/brotli variants are compressed on first request
+        and kept. Everything is rebuilt when the vocabulary or the bundle index is reloaded.
+        """
+        self.store = store
+        self.bundle_index = bundle_index
+        self.version = None
+        self._encoded = {}
+
+    def current_version(self) -> str:
+        return f"{self.store.version}:{self.bundle_index.version}"
+
+    @staticmethod
+    def serialise(payload) -> bytes:
+        """
+        Returns the JSON body of a payload.
+        """
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def encode(body: bytes, coding: str) -> bytes:
+        """
+        Compresses a cached body with the strong settings (done once per word and coding).
+        """
+        if coding == "gzip":
+            return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+        if coding == "br":
+            return brotli.compress(body, quality=BROTLI_QUALITY)
+        return body
+
+    @staticmethod
+    def compress(body: bytes, coding: str) -> bytes:
+        """
+        Compresses a dynamically assembled body with the fast batch settings.
+        """
+        if coding == "gzip":
+            return gzip.compress(body, compresslevel=BATCH_GZIP_LEVEL, mtime=0)
+        if coding == "br":
+            return brotli.compress(body, quality=BATCH_BROTLI_QUALITY)
+        return body
+
+    def build(self):
+        """
+        Serialises every word of the vocabulary (call at startup); nothing is compressed yet.
+        """
+        self.store.ensure_loaded()
+        version = self.current_version()
+        self._encoded = {key: {"identity": PayloadCache.serialise(word_payload(self.store.get(key)))} for key in self.store.keys()}
+        self.version = version
+
+    def get(self, key: str, coding: str = "identity"):
+        """
+        Returns the body of a word in a content coding, compressing it on first use (None if unknown).
+        """
+        if self.version != self.current_version():
+            self.build()
+        variants = self._encoded.get(key)
+        if variants is None:
+            return None
+        body = variants.get(coding)
+        if body is None:
+            body = variants[coding] = PayloadCache.encode(variants["identity"], coding)
+        return body
+
+    def response(self, key: str, accept_encoding: str = ""):
+        """
+        Returns a ready-to-send JSON response for a word (None if unknown).
+        """
+        coding = negotiate_encoding(accept_encoding)
+        body = self.get(key, coding)
+        if body is None:
+            return None
+        headers = {"Vary": "Accept-Encoding"}
+        if coding != "identity":
+            headers["Content-Encoding"] = coding
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def batch(self, keys, accept_encoding: str = ""):
+        """
+        Returns a JSON array response for several words, assembled from the pre-serialised bodies.
+        Unknown keys are skipped.
+        """
+        bodies = [body for body in map(self.get, keys) if body is not None]
+        coding = negotiate_encoding(accept_encoding)
+        headers = {"Vary": "Accept-Encoding"}
+        if coding != "identity":
+            headers["Content-Encoding"] = coding
+        body = PayloadCache.compress(b"[" + b",".join(bodies) + b"]", coding)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def stream(self, keys):
+        """
+        Returns an NDJSON response (one word per line) streamed as the words are looked up.
+        Unknown keys are skipped.
+        """
+        def lines():
+            for key in keys:
+                body = self.get(key)
+                if body is not None:
+                    yield body + b"\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+# Shared cache instance
+payloads = PayloadCache()
@@ -1,53 +1,164 @@
 # router.py
-from languageninja.models.word import Word
+from languageninja.models.word import speech_text, audio_file_path
+from languageninja.models.vocabulary import vocabulary
+from languageninja.audio.bundle import bundles
+from languageninja.audio.service import tts, TTSBusyError
+from languageninja.models.search import search_index, SEARCH_LIMIT
+from languageninja.models.scheduler import scheduler
+from languageninja.api.responses import payloads
 from typing import Optional, Union, Literal
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from pathlib import Path
-import random
-
-WORDS_FOLDER_PATH = './data/words'
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from pydantic import BaseModel, Field
+from random import randint
+import asyncio, json
 
 api = APIRouter()
 
+# Maximum number of words per batch request
+MAX_BATCH_SIZE = 100
+
 class SayPayload(BaseModel):
     key: str
     lang: str = "en"
     sentence: Optional[Union[int, str]] = None  # e.g. 0 or "random" or null
     rate: Optional[Literal["slow", "normal"]] = "normal"
-    save_to: Optional[bool] = False
+    save_to: Optional[bool] = False     # also store the clip in the audio tree (served under /audio)
+    stream: Optional[bool] = False      # answer with the clip itself instead of its URL
+
+class ReviewPayload(BaseModel):
+    user: str = Field(..., min_length=1, max_length=128)
+    key: str
+    lang: str
+    grade: int = Field(..., ge=0, le=5)  # SM-2 grade: 0-2 forgotten, 3 hard, 4 good, 5 easy
 
 @api.get("/word/{key}")
-def get_word(key: str):
-    w = Word(key=key)
-    w.load()
-    if not w.langs.get("en"):
+def get_word(key: str, request: Request):
+    response = payloads.response(key, request.headers.get("accept-encoding", ""))
+    if response is None:
         raise HTTPException(status_code=404, detail="Word not found or missing data.")
-    return {"key": key, "langs": w.langs, "samples": w.samples}
+    return response
+
+# Batch of words as a JSON array, or streamed as NDJSON (one word per line)
+def batch_response(keys, request: Request, format: str):
+    if format == "ndjson":
+        return payloads.stream(keys)
+    return payloads.batch(keys, request.headers.get("accept-encoding", ""))
+
+@api.get("/words")
+def get_words(request: Request, keys: str = Query(..., description="Comma-separated word keys"),
+              format: Literal["json", "ndjson"] = "json"):
+    keys = [k for k in (k.strip() for k in keys.split(",")) if k]
+    if len(keys) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} keys per request.")
+    return batch_response(keys, request, format)
 
+# One random word, or a list of n distinct random words (n=...) to preload a session
 @api.get("/random")
-def random_word():
-    folder = Path(WORDS_FOLDER_PATH)
-    files = list(folder.glob("*.json"))
-    if not files:
+def random_word(request: Request, weighted: bool = False,
+                n: Optional[int] = Query(None, ge=1, le=MAX_BATCH_SIZE),
+                format: Literal["json", "ndjson"] = "json"):
+    if n is not None:
+        return batch_response(vocabulary.random_keys(n, weighted=weighted), request, format)
+    entry = vocabulary.random(weighted=weighted)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="No word files found.")
+    return payloads.response(entry["key"], request.headers.get("accept-encoding", ""))
+
+# Word lookup in any language/script, diacritic-insensitive (prefix matches for autocomplete)
+@api.get("/search")
+def search(q: str = Query(..., min_length=1), limit: int = Query(SEARCH_LIMIT, ge=1, le=MAX_BATCH_SIZE),
+           lang: Optional[str] = None):
+    return {"query": q, "results": search_index.search(q, limit=limit, lang=lang)}
+
+# Scheduled card together with its (pre-serialised) word payload
+def card_response(card):
+    word = payloads.get(card["key"])
+    body = b'{"card":' + json.dumps(card).encode("utf-8") + b',"word":' + (word or b"null") + b"}"
+    return Response(content=body, media_type="application/json")
+
+# Next card to study for a user (spaced repetition, SM-2)
+@api.get("/next")
+def next_card(user: str = Query(..., min_length=1, max_length=128), lang: str = "en"):
+    try:
+        card = scheduler.next(user, lang)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if card is None:
         raise HTTPException(status_code=404, detail="No word files found.")
-    key = random.choice(files).stem
-    w = Word(key=key)
-    w.load()
-    return {"key": key, "langs": w.langs, "samples": w.samples}
+    return card_response(card)
 
+@api.post("/review")
+def review_card(p: ReviewPayload):
+    try:
+        card = scheduler.review(p.user, p.key, p.lang, p.grade)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return card_response(card)
+
+# Audio formats clients can choose from (encoding profiles with an audio tree, smallest first)
+@api.get("/formats")
+def audio_formats(request: Request):
+    return {"formats": request.app.state.audio_formats}
+
+@api.get("/audio/{key}/{clip}")
+def get_clip(key: str, clip: str):
+    data = bundles.read_clip(key, clip)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Clip not found.")
+    return Response(content=data, media_type="audio/mpeg")
+
+# Sentence index of a /say request (None speaks the word itself)
+def say_sentence(entry, lang, sentence):
+    if sentence == "random":
+        samples = (entry["samples"] or {}).get(lang)
+        if isinstance(samples, dict):
+            samples = next(iter(samples.values()), None)
+        return randint(0, len(samples) - 1) if samples else None
+    if isinstance(sentence, str):
+        try:
+            return int(sentence)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid sentence: {sentence}")
+    return sentence
+
+# Synthesized speech (see audio/service.py): the clip is synthesized once and served from the clip cache
 @api.post("/say")
-def say_word(p: SayPayload):
-    w = Word(key=p.key)
-    w.load()
+async def say_word(p: SayPayload):
+    entry = vocabulary.get(p.key)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Word not found or missing data.")
+    sentence = say_sentence(entry, p.lang, p.sentence)
+    rate = p.rate or "normal"
     try:
-        w.say(lang=p.lang, sentence=p.sentence, rate=p.rate, save_to=p.save_to)
+        text, _ = speech_text(entry["langs"], entry["samples"], p.lang, sentence)
+    except (ValueError, KeyError, IndexError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Nothing to say: {e}")
+
+    try:
+        digest = await tts.clip(text, p.lang, rate)
+    except TTSBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise HTTPException(status_code=502, detail=f"Speech synthesis failed: {e}")
+
+    if p.save_to:
+        await asyncio.to_thread(tts.save_copy, digest, audio_file_path(p.key, p.lang, sentence, rate, ext=tts.encoder.ext))
+    if p.stream:
+        return FileResponse(tts.clip_path(digest), media_type=tts.media_type)
     return {
         "ok": True,
+        "url": tts.url(digest),
         "spoke": {
             "key": p.key, "lang": p.lang,
-            "sentence": p.sentence, "rate": p.rate, "saved": p.save_to
+            "sentence": sentence, "rate": rate, "saved": p.save_to
         }
-    }
\ No newline at end of file
+    }
+
+@api.get("/tts/{name}")
+def get_tts_clip(name: str):
+    path = tts.cached_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Clip not found.")
+    with open(path, "rb") as f:
+        return Response(content=f.read(), media_type=tts.media_type)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import hashlib, json, os
+from languageninja.models.word import AUDIO_FOLDER_PATH
+
+#-------------------#
+# Static parameters #
+#-------------------#
+BUNDLES_FOLDER_PATH = './data/audio_bundles'
+BUNDLES_INDEX_FILE_NAME = 'index.json'
+BUNDLES_URL_PREFIX = '/bundles'
+
+#------------------------------#
+# Function: Build word bundles #
+#------------------------------#
+# One file per word with all its clips concatenated (MP3 frames can be concatenated as is),
+# plus a single index {key: {clip_name: [offset, length]}}.
+def build_bundles(audio_folder=AUDIO_FOLDER_PATH, bundles_folder=BUNDLES_FOLDER_PATH, ext='mp3', force=False, verbose=False):
+    os.makedirs(bundles_folder, exist_ok=True)
+
+    # Keep entries of bundles that are still up to date
+    index_path = os.path.join(bundles_folder, BUNDLES_INDEX_FILE_NAME)
+    try:
+        with open(index_path, 'r') as f:
+            old_index = json.load(f)
+    except FileNotFoundError:
+        old_index = {}
+
+    index, n_built = {}, 0
+    for key in sorted(os.listdir(audio_folder)):
+        word_folder = os.path.join(audio_folder, key)
+        if not os.path.isdir(word_folder):
+            continue
+        clips = sorted(f for f in os.listdir(word_folder) if f.endswith(f".{ext}"))
+        if not clips:
+            continue
+        bundle_path = os.path.join(bundles_folder, f"{key}.{ext}")
+
+        # Skip bundles newer than all their clips
+        clip_paths = [os.path.join(word_folder, c) for c in clips]
+        if not force and key in old_index and sorted(old_index[key]) == clips and os.path.exists(bundle_path) \
+                and os.path.getmtime(bundle_path) >= max(os.path.getmtime(p) for p in clip_paths):
+            index[key] = old_index[key]
+            continue
+
+        # Concatenate clips and record their byte ranges
+        entries, offset = {}, 0
+        tmp_path = f"{bundle_path}.tmp"
+        with open(tmp_path, 'wb') as out:
+            for clip, clip_path in zip(clips, clip_paths):
+                with open(clip_path, 'rb') as f:
+                    data = f.read()
+                out.write(data)
+                entries[clip] = [offset, len(data)]
+                offset += len(data)
+        os.replace(tmp_path, bundle_path)
+        index[key] = entries
+        n_built += 1
+
+    # Remove bundles of words that no longer have audio
+    for key in set(old_index) - set(index):
+        try:
+            os.remove(os.path.join(bundles_folder, f"{key}.{ext}"))
+        except FileNotFoundError:
+            pass
+
+    # Write index
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, index_path)
+
+    if verbose:
+        print(f"📦 {n_built} bundles built, {len(index) - n_built} up to date ({bundles_folder})")
+    return index
+
+#-------------------------------#
+# Class definition: BundleIndex #
+#-------------------------------#
+# Byte-range index over the word bundles, loaded once; clips are read with a single seek+read.
+class BundleIndex():
+
+    # Class constructor
+    def __init__(self, bundles_folder=BUNDLES_FOLDER_PATH, ext='mp3'):
+        self.bundles_folder = bundles_folder
+        self.ext = ext
+        self.index = {}
+        self.version = ''
+
+    # Method: Load the index (bundles stay disabled if it does not exist)
+    def load(self):
+        try:
+            with open(os.path.join(self.bundles_folder, BUNDLES_INDEX_FILE_NAME), 'rb') as f:
+                data = f.read()
+            self.index = json.loads(data)
+            self.version = hashlib.blake2b(data, digest_size=8).hexdigest()
+        except FileNotFoundError:
+            self.index = {}
+            self.version = ''
+        return self
+
+    # Property: Are bundles available?
+    @property
+    def enabled(self):
+        return bool(self.index)
+
+    # Method: Bundle file path for a word
+    def bundle_path(self, key):
+        return os.path.join(self.bundles_folder, f"{key}.{self.ext}")
+
+    # Method: Bundle metadata for the word API (None if the word has no bundle)
+    def describe(self, key):
+        clips = self.index.get(key)
+        if clips is None:
+            return None
+        return {"bundle": f"{BUNDLES_URL_PREFIX}/{key}.{self.ext}", "clips": clips}
+
+    # Method: Read one clip from its bundle (None if unknown)
+    def read_clip(self, key, clip):
+        span = self.index.get(key, {}).get(clip)
+        if span is None:
+            return None
+        offset, length = span
+        with open(self.bundle_path(key), 'rb') as f:
+            f.seek(offset)
+            return f.read(length)
+
+#-----------------------#
+# Shared index instance #
+#-----------------------#
+bundles = BundleIndex()
+
+#================#
+# Main execution #
+#================#
+if __name__ == "__main__":
+    build_bundles(verbose=True)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os, shutil, threading
+from dataclasses import dataclass, asdict, field, replace
+from languageninja.common.executor import run_command
+from languageninja.models.word import AUDIO_FOLDER_PATH
+
+#-------------------#
+# Static parameters #
+#-------------------#
+FFMPEG = os.getenv('FFMPEG', 'ffmpeg')
+
+# Files encoded per ffmpeg process by encode_files (one process start instead of one per clip)
+FFMPEG_BATCH_SIZE = int(os.getenv('LANGUAGENINJA_FFMPEG_BATCH', 32))
+
+# Loudness target (EBU R128 single pass): integrated loudness, true peak, loudness range
+LOUDNORM_FILTER = "loudnorm=I=-16:TP=-1.5:LRA=11"
+
+# Leading and trailing silence below -50 dB is cut (the track is reversed to trim its end)
+TRIM_FILTER = ("silenceremove=start_periods=1:start_threshold=-50dB:start_silence=0.05,areverse,"
+               "silenceremove=start_periods=1:start_threshold=-50dB:start_silence=0.05,areverse")
+
+# Options that only enter the settings (hence clip hashes) when enabled, so existing clips stay up to date
+FILTER_OPTIONS = ('trim_silence', 'loudnorm')
+
+# Temporary file written next to out_path before the rename, unique per process and thread
+# (the audio and cache folders are shared by the API workers, which may render the same clip)
+def part_path(out_path):
+    return f"{out_path}.part-{os.getpid()}-{threading.get_ident()}"
+
+#---------------------------#
+# Class definition: Encoder #
+#---------------------------#
+# ffmpeg encoder fed through stdin: TTS output is piped in, no intermediate file is re-read.
+# Defaults match aiff_to_mp3: mono, 22050 Hz, 64 kbps CBR MP3.
+@dataclass(frozen=True)
+class Encoder():
+    codec: str = 'libmp3lame'
+    format: str = 'mp3'
+    ext: str = 'mp3'
+    bitrate_kbps: int = 64
+    sample_rate: int = 22050
+    channels: int = 1
+    mime: str = 'audio/mpeg'
+    trim_silence: bool = False
+    loudnorm: bool = False
+    extra_args: tuple = field(default=())
+
+    # Static method: Whether ffmpeg is installed
+    @staticmethod
+    def available():
+        return shutil.which(FFMPEG) is not None
+
+    # Method: Settings that define the output (used to detect stale clips)
+    def settings(self):
+        settings = asdict(self)
+        for name in FILTER_OPTIONS:
+            if not settings[name]:
+                del settings[name]
+        if not settings['extra_args']:
+            del settings['extra_args']
+        else:
+            settings['extra_args'] = list(settings['extra_args'])
+        del settings['mime']
+        return settings
+
+    # Method: ffmpeg audio filter chain (None without filters)
+    def filters(self):
+        chain = []
+        if self.trim_silence:
+            chain.append(TRIM_FILTER)
+        if self.loudnorm:
+            chain.append(LOUDNORM_FILTER)
+        return ",".join(chain) or None
+
+    # Method: ffmpeg output arguments
+    def output_args(self):
+        args = ["-af", self.filters()] if self.filters() else []
+        return args + [
+            "-ac", str(self.channels),
+            "-ar", str(self.sample_rate),
+            "-c:a", self.codec,
+            "-b:a", f"{self.bitrate_kbps}k",
+            *self.extra_args,
+            "-f", self.format,
+        ]
+
+    # Method: Encode audio bytes (any container ffmpeg can probe) into out_path
+    def encode(self, audio, out_path):
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+
+        # Write next to the target and rename, so readers never see a partial clip
+        tmp_path = part_path(out_path)
+        cmd = [FFMPEG, "-y", "-loglevel", "error", "-i", "pipe:0", *self.output_args(), tmp_path]
+        try:
+            run_command(cmd, input=audio).check()
+            os.replace(tmp_path, out_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return out_path
+
+    # Method: ffmpeg command encoding (in_path, out_path) files in one process (each input mapped to its own output)
+    def batch_argv(self, jobs):
+        argv = [FFMPEG, "-y", "-loglevel", "error"]
+        for in_path, _ in jobs:
+            argv += ["-i", in_path]
+        for i, (_, out_path) in enumerate(jobs):
+            argv += ["-map", f"{i}:a", *self.output_args(), part_path(out_path)]
+        return argv
+
+    # Method: Encode (in_path, out_path) files, batch_size per ffmpeg process; returns one CommandResult per job
+    # Jobs of a successful batch share its time equally. A failed batch is re-run one job per process,
+    # so a bad input only fails its own clip and every job gets its own exit code.
+    def encode_files(self, jobs, batch_size=FFMPEG_BATCH_SIZE):
+        results = []
+        for start in range(0, len(jobs), batch_size):
+            batch = jobs[start:start + batch_size]
+            for _, out_path in batch:
+                os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+            if len(batch) > 1:
+                result = run_command(self.batch_argv(batch))
+                if result.ok:
+                    for _, out_path in batch:
+                        os.replace(part_path(out_path), out_path)
+                    results += [replace(result, seconds=result.seconds / len(batch), shared=len(batch)) for _ in batch]
+                    continue
+            for job in batch:
+                result = run_command(self.batch_argv([job]))
+                if result.ok:
+                    os.replace(part_path(job[1]), job[1])
+                elif os.path.exists(part_path(job[1])):
+                    os.remove(part_path(job[1]))
+                results.append(result)
+        return results
+
+#-------------------#
+# Encoding profiles #
+#-------------------#
+# Each profile builds into its own audio tree (see profile_folder). 'mp3-64' is the original tree
+# (data/audio, untouched settings); the Opus profiles are 3-4x smaller, trimmed and loudness-normalized.
+DEFAULT_PROFILE = 'mp3-64'
+PROFILES = {
+    'mp3-64': Encoder(),
+    'opus-24': Encoder(codec='libopus', format='ogg', ext='opus', bitrate_kbps=24, sample_rate=24000,
+                       mime='audio/ogg; codecs=opus', trim_silence=True, loudnorm=True, extra_args=('-application', 'voip')),
+    'opus-16': Encoder(codec='libopus', format='ogg', ext='opus', bitrate_kbps=16, sample_rate=16000,
+                       mime='audio/ogg; codecs=opus', trim_silence=True, loudnorm=True, extra_args=('-application', 'voip')),
+}
+
+# Get encoder of a profile
+def get_profile(name=None):
+    name = name or DEFAULT_PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"Unknown encoding profile '{name}' (available: {', '.join(PROFILES)})")
+    return PROFILES[name]
+
+# Audio tree of a profile: the default profile uses the audio folder itself, others a sibling folder
+def profile_folder(name, audio_folder=AUDIO_FOLDER_PATH):
+    if name == DEFAULT_PROFILE:
+        return audio_folder
+    return f"{os.path.normpath(audio_folder)}_{name}"
+
+# Profiles with an audio tree (the default profile always counts: missing clips can be synthesized)
+def available_profiles(audio_folder=AUDIO_FOLDER_PATH):
+    return [name for name in PROFILES if name == DEFAULT_PROFILE or os.path.isdir(profile_folder(name, audio_folder))]
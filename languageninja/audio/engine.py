@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import argparse, math, os, tempfile, time
+from dataclasses import dataclass, replace
+from languageninja.audio.encoder import DEFAULT_PROFILE, FFMPEG_BATCH_SIZE, PROFILES, get_profile, profile_folder
+from languageninja.audio.manifest import AudioManifest
+from languageninja.audio.tts import get_backend, TTS_BACKEND
+from languageninja.common.executor import CommandError, CommandExecutor, CommandResult
+from languageninja.models.vocabulary import VocabularyStore
+from languageninja.models.word import LANGS, AUDIO_SENTENCES, AUDIO_RATES, AUDIO_FOLDER_PATH, RATE_MAP, speech_text, audio_file_path
+
+#----------------------------#
+# Class definition: AudioJob #
+#----------------------------#
+# One clip to render: (word, lang, sentence, rate) -> out_path
+@dataclass(frozen=True)
+class AudioJob():
+    key: str
+    lang: str
+    sentence: int
+    rate: str
+    text: str
+    out_path: str
+    digest: str = ''
+
+# Auxiliary function: All clips for the given vocabulary entries
+def plan_jobs(entries, folder=AUDIO_FOLDER_PATH, ext='mp3'):
+    for entry in entries:
+        key = entry["key"]
+        for lang in LANGS:
+            for sentence in AUDIO_SENTENCES:
+                try:
+                    text, _ = speech_text(entry["langs"], entry["samples"], lang, sentence)
+                except (IndexError, KeyError, TypeError):
+                    continue
+                if not text:
+                    continue
+                for rate in AUDIO_RATES:
+                    yield AudioJob(key, lang, sentence, rate, text, audio_file_path(key, lang, sentence, rate, ext=ext, folder=folder))
+
+# Auxiliary function: Render a batch of clips: one TTS run per clip into a temp folder, then one ffmpeg run
+# for the whole batch. Returns one CommandResult per job (a failed synthesis reports the TTS exit code).
+def render_batch(jobs, backend_name, encoder):
+    backend = get_backend(backend_name)
+    results = [None] * len(jobs)
+    synthesized = []    # (index, temp file, seconds)
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, job in enumerate(jobs):
+            t0 = time.perf_counter()
+            try:
+                audio = backend.synthesize(job.text, job.lang, job.rate)
+            except CommandError as e:
+                results[i] = e.result
+                continue
+            except Exception as e:
+                results[i] = CommandResult([backend.name], 1, time.perf_counter() - t0, stderr=str(e).encode('utf-8'))
+                continue
+            in_path = os.path.join(tmp, f"{i}.{backend.ext}")
+            with open(in_path, 'wb') as f:
+                f.write(audio)
+            synthesized.append((i, in_path, time.perf_counter() - t0))
+
+        encoded = encoder.encode_files([(in_path, jobs[i].out_path) for i, in_path, _ in synthesized])
+        for (i, _, seconds), result in zip(synthesized, encoded):
+            results[i] = replace(result, seconds=result.seconds + seconds)
+    return results
+
+#-------------------------------#
+# Class definition: AudioEngine #
+#-------------------------------#
+# Parallel, incremental audio build: fans (word, lang, sentence, rate) jobs out in batches over a
+# pool of workers; each batch is encoded by a single ffmpeg process (see render_batch). A manifest of input hashes decides what
+# is stale, so an edited sentence is re-rendered and a no-op run never stats the audio tree.
+# Each encoding profile (see encoder.py) builds into its own tree, with its own manifest.
+class AudioEngine():
+
+    # Class constructor
+    def __init__(self, backend=TTS_BACKEND, encoder=None, workers=None, store=None, folder=None, profile=DEFAULT_PROFILE):
+        self.backend = backend
+        self.profile = profile
+        self.encoder = encoder or get_profile(profile)
+        self.workers = workers or os.cpu_count()
+        self.folder = folder or profile_folder(profile)
+        self.manifest = AudioManifest(self.folder)
+
+        # Read sentences straight from the JSON folders (not from a packed corpus)
+        self.store = store or VocabularyStore(corpus_file=None)
+
+    # Method: Source file timestamp for a word (only used for clips the manifest does not know)
+    def source_mtime(self, key):
+        mtimes = [0.0]
+        for folder in (self.store.words_folder, self.store.sentences_folder):
+            try:
+                mtimes.append(os.path.getmtime(os.path.join(folder, f"{key}.json")))
+            except OSError:
+                pass
+        return max(mtimes)
+
+    # Method: Existing clip rendered after its sources were last changed?
+    def is_up_to_date(self, job, source_mtime):
+        try:
+            return os.path.getmtime(job.out_path) >= source_mtime
+        except OSError:
+            return False
+
+    # Method: All planned jobs (with input hashes) for the given keys (all words by default)
+    def plan(self, keys=None):
+        self.store.ensure_loaded()
+        backend = get_backend(self.backend)
+        settings = self.encoder.settings()
+        entries = filter(None, (self.store.get(key) for key in (keys or self.store.keys())))
+        return [
+            replace(job, digest=AudioManifest.clip_hash(job.text, backend.voice(job.lang), RATE_MAP[job.rate][job.lang], settings))
+            for job in plan_jobs(entries, folder=self.folder, ext=self.encoder.ext)
+        ]
+
+    # Method: Jobs whose inputs changed since they were rendered
+    # Clips missing from the manifest (e.g. rendered before it existed) are adopted if newer than their sources.
+    def stale(self, planned, force=False):
+        jobs, source_mtimes = [], {}
+        for job in planned:
+            recorded = self.manifest.get(job.out_path)
+            if not force and recorded == job.digest:
+                continue
+            if not force and recorded is None:
+                if job.key not in source_mtimes:
+                    source_mtimes[job.key] = self.source_mtime(job.key)
+                if self.is_up_to_date(job, source_mtimes[job.key]):
+                    self.manifest.set(job.out_path, job.digest)
+                    continue
+            jobs.append(job)
+        return jobs
+
+    # Method: Remove tracked clips that are no longer planned (and, with prune, untracked files)
+    def remove_orphans(self, planned, prune=False):
+        orphans = self.manifest.orphans(job.out_path for job in planned)
+        if prune:
+            orphans += self.manifest.untracked(ext=self.encoder.ext)
+        for path in orphans:
+            try:
+                os.remove(path)
+                # Drop the word folder once its last clip is gone
+                os.rmdir(os.path.dirname(path))
+            except OSError:
+                pass
+            self.manifest.discard(path)
+        return len(orphans)
+
+    # Method: Run jobs in batches over the workers, recording successful clips in the manifest
+    # Batches hold up to FFMPEG_BATCH_SIZE jobs, smaller when there are too few jobs to keep every worker busy.
+    def run(self, jobs, verbose=False):
+        stats = {"jobs": len(jobs), "rendered": 0, "failed": 0, "batches": 0, "seconds": 0.0}
+        if not jobs:
+            return stats
+
+        t0 = time.perf_counter()
+        batch_size = max(1, min(FFMPEG_BATCH_SIZE, math.ceil(len(jobs) / self.workers)))
+        batches = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+        executor = CommandExecutor(workers=self.workers)
+        for batch, results in executor.imap(lambda batch: render_batch(batch, self.backend, self.encoder), batches):
+            stats["batches"] += 1
+            for job, result in zip(batch, results):
+                if result.ok:
+                    self.manifest.set(job.out_path, job.digest)
+                    stats["rendered"] += 1
+                    if verbose:
+                        print(f"🔊 {job.out_path} ({result.seconds:.2f} s): {job.text}")
+                else:
+                    stats["failed"] += 1
+                    self.manifest.discard(job.out_path)
+                    print(f"❌ Failed to render {job.out_path} (exit code {result.returncode}): {result.error_text()}")
+        stats["seconds"] = time.perf_counter() - t0
+        return stats
+
+    # Method: Incremental build for the given keys (all words by default)
+    # Orphans are only removed on full builds, since a partial plan does not cover every clip.
+    def build(self, keys=None, force=False, prune=False, verbose=False):
+        t0 = time.perf_counter()
+        self.manifest.load()
+        planned = self.plan(keys=keys)
+        jobs = self.stale(planned, force=force)
+        removed = self.remove_orphans(planned, prune=prune) if keys is None else 0
+        print(f"🎧 {len(jobs)} of {len(planned)} '{self.profile}' clips to render with '{self.backend}' on {self.workers} workers ({self.folder})")
+        try:
+            stats = self.run(jobs, verbose=verbose)
+        finally:
+            self.manifest.save()
+        stats.update(planned=len(planned), removed=removed, seconds=time.perf_counter() - t0)
+        print(f"🏁 Rendered {stats['rendered']} clips in {stats['batches']} batches ({stats['failed']} failed, {removed} removed) in {stats['seconds']:.2f} s")
+        return stats
+
+#================#
+# Main execution #
+#================#
+# Example: python -m languageninja.audio.engine --backend stub --profile mp3-64 opus-16 --keys dog cat
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render audio clips for the vocabulary.")
+    parser.add_argument("--backend", default=TTS_BACKEND)
+    parser.add_argument("--profile", nargs="+", choices=list(PROFILES), default=[DEFAULT_PROFILE],
+                        help="encoding profiles to build (one audio tree each)")
+    parser.add_argument("--trim", action="store_true", help="trim leading/trailing silence (any profile)")
+    parser.add_argument("--loudnorm", action="store_true", help="normalize loudness (any profile)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--keys", nargs="*", default=None)
+    parser.add_argument("--force", action="store_true")
+    parser.add_argument("--prune", action="store_true", help="also delete audio files the manifest does not track")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    for profile in args.profile:
+        encoder = get_profile(profile)
+        encoder = replace(encoder, trim_silence=encoder.trim_silence or args.trim, loudnorm=encoder.loudnorm or args.loudnorm)
+        engine = AudioEngine(backend=args.backend, encoder=encoder, workers=args.workers, profile=profile)
+        engine.build(keys=args.keys, force=args.force, prune=args.prune, verbose=args.verbose)
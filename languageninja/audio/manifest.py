@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import hashlib, json, os
+from languageninja.models.word import AUDIO_FOLDER_PATH
+
+#-------------------#
+# Static parameters #
+#-------------------#
+MANIFEST_FILE_NAME = 'manifest.json'
+
+#---------------------------------#
+# Class definition: AudioManifest #
+#---------------------------------#
+# Records, for every clip under the audio folder, a hash of the inputs it was rendered from
+# (text, voice, rate, encoder settings). A clip is stale exactly when its hash changes.
+class AudioManifest():
+
+    # Class constructor
+    def __init__(self, folder=AUDIO_FOLDER_PATH):
+        self.folder = folder
+        self.path = os.path.join(folder, MANIFEST_FILE_NAME)
+        self.clips = {}
+
+    # Static method: Hash of the inputs of one clip
+    @staticmethod
+    def clip_hash(text, voice, rate, encoder_settings):
+        data = json.dumps([text, voice, rate, encoder_settings], ensure_ascii=False, sort_keys=True)
+        return hashlib.blake2b(data.encode('utf-8'), digest_size=12).hexdigest()
+
+    # Method: Path of a clip relative to the audio folder (manifest key)
+    def relpath(self, out_path):
+        return os.path.relpath(out_path, self.folder).replace(os.sep, '/')
+
+    # Method: Load manifest from disk (empty if missing)
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                self.clips = json.load(f).get("clips", {})
+        except FileNotFoundError:
+            self.clips = {}
+        return self
+
+    # Method: Save manifest (write to temp file, then rename)
+    def save(self):
+        os.makedirs(self.folder, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"clips": self.clips}, f, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    # Method: Hash recorded for a clip (None if unknown)
+    def get(self, out_path):
+        return self.clips.get(self.relpath(out_path))
+
+    # Method: Record hash for a clip
+    def set(self, out_path, digest):
+        self.clips[self.relpath(out_path)] = digest
+
+    # Method: Forget a clip
+    def discard(self, out_path):
+        self.clips.pop(self.relpath(out_path), None)
+
+    # Method: Full paths of tracked clips that are not in the given set of paths
+    def orphans(self, out_paths):
+        wanted = {self.relpath(p) for p in out_paths}
+        return [os.path.join(self.folder, rel) for rel in self.clips if rel not in wanted]
+
+    # Method: Full paths of audio files on disk that the manifest does not track (one tree walk)
+    def untracked(self, ext='mp3'):
+        found = []
+        for root, _, files in os.walk(self.folder):
+            for file_name in files:
+                if file_name.endswith(f".{ext}"):
+                    path = os.path.join(root, file_name)
+                    if self.relpath(path) not in self.clips:
+                        found.append(path)
+        return found
+
+    def __len__(self):
+        return len(self.clips)
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio, os, re, shutil, threading, time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from languageninja.audio.encoder import Encoder, part_path
+from languageninja.audio.manifest import AudioManifest
+from languageninja.audio.tts import get_backend, TTS_BACKEND
+from languageninja.models.word import RATE_MAP
+
+#-------------------#
+# Static parameters #
+#-------------------#
+TTS_WORKERS = int(os.getenv('LANGUAGENINJA_TTS_WORKERS', 2))       # syntheses running at once
+TTS_QUEUE_SIZE = int(os.getenv('LANGUAGENINJA_TTS_QUEUE', 16))     # distinct syntheses queued or running
+TTS_CACHE_FOLDER_PATH = os.getenv('LANGUAGENINJA_TTS_CACHE', './data/tts_cache')
+TTS_CACHE_MAX_BYTES = int(os.getenv('LANGUAGENINJA_TTS_CACHE_MAX_BYTES', 512 * 2**20))
+TTS_CACHE_RESCAN_SECONDS = 60    # re-measure the folder (shared with the other worker processes) at least this often
+TTS_ATIME_RESOLUTION = 60        # access times are only rewritten when older than this (seconds)
+TTS_URL_PREFIX = '/api/tts'
+
+# Content types of the encoder formats
+MEDIA_TYPES = {'mp3': 'audio/mpeg', 'ogg': 'audio/ogg', 'opus': 'audio/ogg', 'wav': 'audio/wav'}
+
+# Raised instead of queueing when the service already has queue_size syntheses pending
+class TTSBusyError(RuntimeError):
+    pass
+
+#------------------------------#
+# Class definition: TTSService #
+#------------------------------#
+# Text-to-speech for the API: synthesis and encoding run on a small thread pool (the work happens in
+# TTS/ffmpeg subprocesses), so request handlers only await a future. Clips are stored under the hash
+# of their inputs (text, voice, rate, encoder settings), so a clip is synthesized once and then served
+# from disk; concurrent requests for the same clip share one synthesis. When queue_size syntheses are
+# already pending, new ones are refused (TTSBusyError) instead of piling up.
+# The cache folder is bounded to max_bytes: least recently used clips are deleted first (the order
+# survives restarts through file access times, refreshed on hits; mtimes, hence ETags, do not change).
+# The folder is shared by the worker processes, so it is re-measured before evicting; disk work is
+# never done under the lock nor on the event loop.
+class TTSService():
+
+    # Class constructor
+    def __init__(self, backend=TTS_BACKEND, encoder=None, workers=TTS_WORKERS, queue_size=TTS_QUEUE_SIZE,
+                 folder=TTS_CACHE_FOLDER_PATH, max_bytes=TTS_CACHE_MAX_BYTES):
+        self.backend = get_backend(backend)
+        self.encoder = encoder or Encoder()
+        self.workers = workers
+        self.queue_size = queue_size
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "syntheses": 0, "joined": 0, "rejected": 0, "failed": 0, "evictions": 0}
+        self._executor = None
+        self._inflight = {}
+        self._lru = None        # {path: size}, least recently used first
+        self._bytes = 0
+        self._scanned_at = 0.0
+        self._lock = threading.Lock()
+        self._name_pattern = re.compile(rf"^([0-9a-f]{{24}})\.{re.escape(self.encoder.ext)}$")
+
+    # Property: Content type of the clips
+    @property
+    def media_type(self):
+        return MEDIA_TYPES.get(self.encoder.ext, 'application/octet-stream')
+
+    # Method: Whether clips can be synthesized here (TTS engine and ffmpeg installed)
+    def available(self):
+        return self.backend.available() and self.encoder.available()
+
+    # Method: Content address of a clip
+    def digest(self, text, lang, rate='normal'):
+        return AudioManifest.clip_hash(text, self.backend.voice(lang), RATE_MAP[rate][lang], self.encoder.settings())
+
+    # Method: Cache file of a clip (sharded by the first two hex digits)
+    def clip_path(self, digest):
+        return os.path.join(self.folder, digest[:2], f"{digest}.{self.encoder.ext}")
+
+    # Method: Public URL of a clip
+    def url(self, digest):
+        return f"{TTS_URL_PREFIX}/{digest}.{self.encoder.ext}"
+
+    # Method: Cache file for a clip file name from a URL (None if malformed or not synthesized)
+    def cached_path(self, name):
+        match = self._name_pattern.match(name)
+        if match is None:
+            return None
+        path = self.clip_path(match.group(1))
+        return path if os.path.isfile(path) else None
+
+    # Method: Thread pool, created on first synthesis
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='tts')
+        return self._executor
+
+    # Method: Scan the cache folder: {path: size}, least recently used (oldest access time) first
+    def _scan(self):
+        clips = []
+        if os.path.isdir(self.folder):
+            for shard in os.scandir(self.folder):
+                if shard.is_dir():
+                    for entry in os.scandir(shard.path):
+                        if not entry.name.endswith(f".{self.encoder.ext}"):
+                            continue
+                        try:
+                            st = entry.stat()
+                        except FileNotFoundError:
+                            continue
+                        clips.append((st.st_atime, entry.path, st.st_size))
+        return OrderedDict((path, size) for _, path, size in sorted(clips))
+
+    # Method: Replace the LRU index by a fresh scan (call with the lock held)
+    def _install(self, lru):
+        self._lru = lru
+        self._bytes = sum(lru.values())
+        self._scanned_at = time.monotonic()
+
+    # Method: Build the LRU index on first use (the scan runs outside the lock)
+    def _load_index(self):
+        if self._lru is None:
+            lru = self._scan()
+            with self._lock:
+                if self._lru is None:
+                    self._install(lru)
+
+    # Method: Mark a cached clip as recently used; False if it is gone
+    def _touch(self, path):
+        self._load_index()
+        try:
+            st = os.stat(path)
+            if st.st_atime < time.time() - TTS_ATIME_RESOLUTION:
+                os.utime(path, (time.time(), st.st_mtime))
+        except FileNotFoundError:
+            # Deleted meanwhile (e.g. evicted by another worker process)
+            with self._lock:
+                self._bytes -= self._lru.pop(path, 0)
+            return False
+        with self._lock:
+            if path in self._lru:
+                self._lru.move_to_end(path)
+            else:
+                self._lru[path] = st.st_size
+                self._bytes += st.st_size
+        return True
+
+    # Method: Delete least recently used clips above max_bytes
+    def _evict(self, keep):
+        if not self.max_bytes:
+            return
+        with self._lock:
+            stale = time.monotonic() - self._scanned_at > TTS_CACHE_RESCAN_SECONDS
+            if self._bytes <= self.max_bytes and not stale:
+                return
+
+        # Re-measure first: the other worker processes add and delete clips in the same folder
+        lru = self._scan()
+        victims = []
+        with self._lock:
+            self._install(lru)
+            while self._bytes > self.max_bytes and len(lru) > 1:
+                path, size = next(iter(lru.items()))
+                if path == keep:
+                    lru.move_to_end(path)
+                    continue
+                del lru[path]
+                self._bytes -= size
+                victims.append(path)
+            self.stats["evictions"] += len(victims)
+        for path in victims:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    # Method: Synthesize and encode one clip (runs in the pool)
+    def _render(self, text, lang, rate, out_path):
+        audio = self.backend.synthesize(text, lang, rate)
+        return self.encoder.encode(audio, out_path)
+
+    # Method: Forget a finished synthesis (its clip is on disk, or it failed and may be retried)
+    def _done(self, digest, future):
+        with self._lock:
+            self._inflight.pop(digest, None)
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                self.stats["failed"] += 1
+                return
+        path = future.result()
+        self._touch(path)
+        self._evict(keep=path)
+
+    # Method: Start (or join) the synthesis of a clip; returns (digest, future), future is None if cached
+    # (touches the disk: call it from a thread, not from the event loop)
+    def submit(self, text, lang, rate='normal'):
+        digest = self.digest(text, lang, rate)
+        path = self.clip_path(digest)
+        if self._touch(path):
+            with self._lock:
+                self.stats["hits"] += 1
+            return digest, None
+        with self._lock:
+            future = self._inflight.get(digest)
+            if future is not None:
+                self.stats["joined"] += 1
+                return digest, future
+            if len(self._inflight) >= self.queue_size:
+                self.stats["rejected"] += 1
+                raise TTSBusyError(f"{len(self._inflight)} syntheses pending, try again later")
+            future = self.executor().submit(self._render, text, lang, rate, path)
+            self._inflight[digest] = future
+            self.stats["syntheses"] += 1
+        future.add_done_callback(lambda f: self._done(digest, f))
+        return digest, future
+
+    # Method: Digest of a synthesized clip, awaiting its synthesis if needed
+    async def clip(self, text, lang, rate='normal'):
+        digest, future = await asyncio.to_thread(self.submit, text, lang, rate)
+        if future is not None:
+            # Shielded: a client going away must not cancel a synthesis other requests wait for
+            await asyncio.shield(asyncio.wrap_future(future))
+        return digest
+
+    # Method: Copy a cached clip to another path (e.g. into the audio tree), unless it exists
+    def save_copy(self, digest, out_path):
+        if os.path.isfile(out_path):
+            return False
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        tmp_path = part_path(out_path)
+        shutil.copyfile(self.clip_path(digest), tmp_path)
+        os.replace(tmp_path, out_path)
+        return True
+
+    # Method: Number of syntheses queued or running
+    def pending(self):
+        with self._lock:
+            return len(self._inflight)
+
+    # Method: Number of cached clips and their total size
+    def usage(self):
+        self._load_index()
+        with self._lock:
+            return {"clips": len(self._lru), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+    # Method: Stop the pool (queued syntheses are dropped)
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+# Shared service for the API
+tts = TTSService()
+
+#================#
+# Main execution #
+#================#
+if __name__ == "__main__":
+    service = TTSService()
+
+    async def demo():
+        t0 = time.perf_counter()
+        digests = await asyncio.gather(*(service.clip("Hello, how are you?", 'en') for _ in range(5)))
+        print(f"🔊 {service.url(digests[0])} in {time.perf_counter()-t0:.2f} s ({service.stats})")
+
+    asyncio.run(demo())
+    service.close()
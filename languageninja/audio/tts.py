@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import io, os, shutil, sys, tempfile, wave
+from languageninja.common.executor import run_command
+from languageninja.models.word import VOICE_MAP, RATE_MAP
+
+#-------------------#
+# Static parameters #
+#-------------------#
+# Default backend: MacOS 'say' where available, espeak-ng elsewhere (override with LANGUAGENINJA_TTS)
+TTS_BACKEND = os.getenv('LANGUAGENINJA_TTS', 'say' if sys.platform == 'darwin' else 'espeak-ng')
+
+# espeak-ng voice names per language code
+ESPEAK_VOICE_MAP = {
+    "en": "en-us",
+    "fr": "fr-fr",
+    "es": "es",
+    "pt": "pt",
+    "ru": "ru",
+    "il": "he",
+}
+
+#------------------------------#
+# Class definition: TTSBackend #
+#------------------------------#
+# A backend turns text into audio bytes in any container ffmpeg can read (AIFF, WAV, ...).
+# Commands run from argument vectors (no shell) and raise CommandError on failure.
+class TTSBackend():
+    name = None
+    ext = None      # container of the audio bytes (file extension)
+    command = None  # executable the backend runs (None: pure Python)
+
+    # Method: Whether the backend can run here (its executable is installed)
+    def available(self):
+        return self.command is None or shutil.which(self.command) is not None
+
+    # Method: Voice used for a language (part of the clip identity, see manifest)
+    def voice(self, lang):
+        raise NotImplementedError
+
+    # Method: Synthesize text and return the audio bytes
+    def synthesize(self, text, lang, rate='normal'):
+        raise NotImplementedError
+
+# MacOS text-to-speech ('say' cannot write to a pipe, so it goes through a private temp file)
+class SayBackend(TTSBackend):
+    name = 'say'
+    ext = 'aiff'
+    command = 'say'
+
+    def voice(self, lang):
+        return VOICE_MAP[lang]
+
+    def synthesize(self, text, lang, rate='normal'):
+        with tempfile.TemporaryDirectory() as tmp:
+            out_path = os.path.join(tmp, 'speech.aiff')
+            # Text goes through stdin: no quoting issues
+            run_command(['say', '-v', self.voice(lang), '-r', RATE_MAP[rate][lang], '-o', out_path],
+                        input=text.encode('utf-8')).check()
+            with open(out_path, 'rb') as f:
+                return f.read()
+
+# espeak-ng (Linux), writes WAV to stdout
+class EspeakBackend(TTSBackend):
+    name = 'espeak-ng'
+    ext = 'wav'
+    command = 'espeak-ng'
+
+    def voice(self, lang):
+        return ESPEAK_VOICE_MAP[lang]
+
+    def synthesize(self, text, lang, rate='normal'):
+        result = run_command(['espeak-ng', '-v', self.voice(lang), '-s', RATE_MAP[rate][lang], '--stdin', '--stdout'],
+                             input=text.encode('utf-8'), capture_stdout=True)
+        return result.check().stdout
+
+# Silent WAV whose length follows the text: for tests and machines without a TTS engine
+class StubBackend(TTSBackend):
+    name = 'stub'
+    ext = 'wav'
+    sample_rate = 22050
+
+    def voice(self, lang):
+        return f"stub-{lang}"
+
+    def synthesize(self, text, lang, rate='normal'):
+        seconds = min(10.0, 0.3 + 6.0 * len(text) / RATE_MAP[rate][lang])
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(self.sample_rate)
+            w.writeframes(bytes(2 * int(seconds * self.sample_rate)))
+        return buffer.getvalue()
+
+#----------------------#
+# Backend registry     #
+#----------------------#
+BACKENDS = {
+    SayBackend.name: SayBackend,
+    EspeakBackend.name: EspeakBackend,
+    StubBackend.name: StubBackend,
+}
+
+# Get backend instance by name (defaults to TTS_BACKEND)
+def get_backend(name=None):
+    name = name or TTS_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown TTS backend '{name}' (available: {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
@@ -1,42 +1,74 @@
-import subprocess
+from dataclasses import replace
 from pathlib import Path
 
+# Convert an AIFF file with an encoder (see audio/encoder.py; default: the 'mp3-64' profile)
+def aiff_to_audio(aiff_path: Path, out_path: Path, encoder=None):
+    from languageninja.audio.encoder import FFMPEG, get_profile
+    from languageninja.common.executor import run_command
+    encoder = encoder or get_profile()
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    cmd = [FFMPEG, "-y", "-loglevel", "error", "-i", aiff_path, *encoder.output_args(), out_path]
+    return run_command(cmd).check()
+
 def aiff_to_mp3(aiff_path: Path, mp3_path: Path, bitrate_kbps=64):
-    mp3_path.parent.mkdir(parents=True, exist_ok=True)
-    # -ac 1 mono, -ar 22050 Hz, -b:a 64k CBR MP3
-    cmd = [
-        "ffmpeg", "-y",
-        "-i", str(aiff_path),
-        "-ac", "1",
-        "-ar", "22050",
-        "-c:a", "libmp3lame",
-        "-b:a", f"{bitrate_kbps}k",
-        str(mp3_path),
-    ]
-    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+    from languageninja.audio.encoder import get_profile
+    # Mono, 22050 Hz, CBR MP3
+    return aiff_to_audio(aiff_path, mp3_path, encoder=replace(get_profile('mp3-64'), bitrate_kbps=bitrate_kbps))
+
+# Batch convert all .aiff files in input folder recursively with an encoding profile
+# (the default profile writes next to the .aiff files, others into the profile's own tree)
+# Files are encoded many per ffmpeg process, batches running in parallel; returns the executor stats.
+def batch_convert_aiff(input_folder: Path, profile=None, workers=None):
+    from languageninja.audio.encoder import get_profile, profile_folder, DEFAULT_PROFILE, FFMPEG_BATCH_SIZE
+    from languageninja.common.executor import CommandExecutor
+    profile = profile or DEFAULT_PROFILE
+    encoder = get_profile(profile)
+    output_folder = Path(profile_folder(profile, str(input_folder)))
+    jobs = []
+    for aiff in input_folder.rglob("*.aiff"):
+        out = (output_folder / aiff.relative_to(input_folder)).with_suffix(f".{encoder.ext}")
+        if not out.exists():
+            jobs.append((str(aiff), str(out)))
+    print(f"Converting {len(jobs)} files ({profile}) ...")
+
+    executor = CommandExecutor(workers=workers)
+    batches = [jobs[i:i + FFMPEG_BATCH_SIZE] for i in range(0, len(jobs), FFMPEG_BATCH_SIZE)]
+    for batch, results in executor.imap(encoder.encode_files, batches):
+        for (aiff, _), result in zip(batch, results):
+            if not result.ok:
+                print(f"❌ Failed to convert {aiff} (exit code {result.returncode}): {result.error_text()}")
+    stats = executor.stats
+    print(f"Converted {stats['jobs'] - stats['failed']} files with {stats['processes']} ffmpeg processes ({stats['failed']} failed)")
+    return stats
 
 # Batch convert all .aiff files in input folder recursively to .mp3
 def batch_convert_aiff_to_mp3(input_folder: Path):
-    for aiff in input_folder.rglob("*.aiff"):
-        print(f"Converting {aiff} ...")
-        mp3 = aiff.with_suffix(".mp3")
-        if not mp3.exists():
-            aiff_to_mp3(aiff, mp3, bitrate_kbps=64)
+    batch_convert_aiff(input_folder)
 
-# Auxiliary function: Parse list of words with stats
-def parse_word_list_with_stats(file_path='resources/sources/list_of_words_with_stats.txt'):
+# Auxiliary function: Parse list of words with stats as (rank, frequency, word) tuples
+def parse_word_stats(file_path='resources/sources/list_of_words_with_stats.txt'):
     with open(file_path, 'r', encoding='utf-8') as f:
         lines = f.readlines()
     # Parse format row_num freq word
-    word_list = []
+    word_stats = []
     for line in lines:
         parts = line.strip().split()
         if len(parts) >= 3:
-            word = parts[2]
-            word_list.append(word)
-    return word_list
+            try:
+                rank, freq = int(parts[0]), float(parts[1])
+            except ValueError:
+                rank, freq = len(word_stats) + 1, 0.0
+            word_stats.append((rank, freq, parts[2]))
+    return word_stats
+
+# Auxiliary function: Parse list of words with stats
+def parse_word_list_with_stats(file_path='resources/sources/list_of_words_with_stats.txt'):
+    return [word for _, _, word in parse_word_stats(file_path)]
 
 # Execute as main
 if __name__ == "__main__":
+    import sys
     input_dir = Path("data/audio")
-    batch_convert_aiff_to_mp3(input_dir)
\ No newline at end of file
+    # Encoding profiles as arguments, e.g. mp3-64 opus-16 (default profile if none)
+    for profile in sys.argv[1:] or [None]:
+        batch_convert_aiff(input_dir, profile)
\ No newline at end of file
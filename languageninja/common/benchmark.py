@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import argparse, io, json, os, statistics, subprocess, sys, tarfile, tempfile
+from pathlib import Path
+
+#-------------------#
+# Static parameters #
+#-------------------#
+REPO_DIR = Path(__file__).resolve().parent.parent.parent
+DEFAULT_MODULE = "languageninja.api.main"
+HEAVY_MODULES = ("openai", "rich", "dotenv", "httpx", "pydantic", "fastapi")
+
+# Code executed in a fresh interpreter: time the import, report what got loaded
+_probe = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+dt = time.perf_counter() - t0
+print(json.dumps({{"seconds": dt, "modules": len(sys.modules),
+                   "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+# Auxiliary function: Time one import of `module` in a fresh interpreter
+def time_import(module=DEFAULT_MODULE, pythonpath=REPO_DIR):
+    env = dict(os.environ, PYTHONPATH=str(pythonpath))
+    code = _probe.format(module=module, heavy=HEAVY_MODULES)
+    out = subprocess.run([sys.executable, "-c", code], cwd=pythonpath, env=env,
+                         check=True, capture_output=True, text=True).stdout
+    # Modules may print on import: the probe result is the last line
+    return json.loads(out.strip().splitlines()[-1])
+
+# Auxiliary function: Repeat time_import and summarise
+def benchmark_import(module=DEFAULT_MODULE, runs=10, pythonpath=REPO_DIR):
+    samples = [time_import(module, pythonpath) for _ in range(runs)]
+    seconds = [s["seconds"] for s in samples]
+    return {
+        "module": module,
+        "runs": runs,
+        "min_ms": 1000 * min(seconds),
+        "median_ms": 1000 * statistics.median(seconds),
+        "modules": samples[-1]["modules"],
+        "heavy": samples[-1]["heavy"],
+    }
+
+# Auxiliary function: Extract the package at a git ref into a temporary folder (for "before" numbers)
+def checkout_ref(ref, target):
+    archive = subprocess.run(["git", "archive", ref, "languageninja"], cwd=REPO_DIR,
+                             check=True, capture_output=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(target, filter="data")
+    # Data and UI folders are resolved relative to the package: link them in
+    for folder in ("data", "ui"):
+        os.symlink(REPO_DIR / folder, Path(target) / folder)
+    return target
+
+# Auxiliary function: Print one benchmark result
+def print_result(label, result):
+    print(f"{label:>8}: median {result['median_ms']:7.1f} ms | min {result['min_ms']:7.1f} ms | "
+          f"{result['modules']} modules | heavy: {', '.join(result['heavy']) or 'none'}")
+
+# Execute as main
+# Example: python -m languageninja.common.benchmark --ref baseline --runs 20
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure import (startup) time of the web app.")
+    parser.add_argument("--module", default=DEFAULT_MODULE)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--ref", help="git ref to compare against (before)")
+    args = parser.parse_args()
+
+    if args.ref:
+        with tempfile.TemporaryDirectory() as tmp:
+            before = benchmark_import(args.module, args.runs, checkout_ref(args.ref, tmp))
+        print_result(args.ref, before)
+    after = benchmark_import(args.module, args.runs)
+    print_result("current", after)
+    if args.ref:
+        print(f"{'speedup':>8}: {before['median_ms'] / after['median_ms']:.2f}x")
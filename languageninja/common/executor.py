@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os, subprocess, time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+
+#-------------------#
+# Static parameters #
+#-------------------#
+# Exit codes for commands that could not run (as a shell would report them)
+EXIT_NOT_FOUND = 127
+EXIT_TIMEOUT = 124
+
+#---------------------------------#
+# Class definition: CommandResult #
+#---------------------------------#
+# Outcome of one job: exit code and wall time. Jobs that shared a process (e.g. several encodes in one
+# ffmpeg run) report the exit code of their own retry if the shared run failed, and an equal share of its time.
+@dataclass
+class CommandResult():
+    argv: list
+    returncode: int
+    seconds: float
+    stdout: bytes = b''
+    stderr: bytes = b''
+    shared: int = 1     # number of jobs that ran in this process
+
+    @property
+    def ok(self):
+        return self.returncode == 0
+
+    # Method: Last line of stderr (for error messages)
+    def error_text(self):
+        lines = self.stderr.decode('utf-8', errors='replace').strip().splitlines()
+        return lines[-1] if lines else f"exit code {self.returncode}"
+
+    # Method: Raise CommandError if the command failed
+    def check(self):
+        if not self.ok:
+            raise CommandError(self)
+        return self
+
+# Failed command (a CalledProcessError, so existing handlers keep working)
+class CommandError(subprocess.CalledProcessError):
+
+    def __init__(self, result):
+        super().__init__(result.returncode, result.argv, result.stdout, result.stderr)
+        self.result = result
+
+    def __str__(self):
+        return f"{os.path.basename(str(self.cmd[0]))} failed ({self.returncode}): {self.result.error_text()}"
+
+#-----------------------#
+# Auxiliary functions   #
+#-----------------------#
+
+# Run one command from an argument vector (never through a shell: no quoting, no injection)
+# - input: bytes for stdin (e.g. text to speak, audio to encode)
+def run_command(argv, input=None, timeout=None, capture_stdout=False):
+    argv = [str(arg) for arg in argv]
+    stdout = subprocess.PIPE if capture_stdout else subprocess.DEVNULL
+    t0 = time.perf_counter()
+    try:
+        completed = subprocess.run(argv, input=input, stdout=stdout, stderr=subprocess.PIPE, timeout=timeout)
+        returncode, out, err = completed.returncode, completed.stdout or b'', completed.stderr or b''
+    except FileNotFoundError as e:
+        returncode, out, err = EXIT_NOT_FOUND, b'', str(e).encode('utf-8')
+    except subprocess.TimeoutExpired as e:
+        returncode, out, err = EXIT_TIMEOUT, b'', (e.stderr or b'') + f"timed out after {timeout} s".encode('utf-8')
+    return CommandResult(argv, returncode, time.perf_counter() - t0, out, err)
+
+#-----------------------------------#
+# Class definition: CommandExecutor #
+#-----------------------------------#
+# Runs many commands on a thread pool (the work happens in the child processes) and keeps totals.
+class CommandExecutor():
+
+    # Class constructor
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count()
+        self.stats = {"processes": 0, "jobs": 0, "failed": 0, "seconds": 0.0}
+
+    # Method: Account for results (jobs that shared a process count as a fraction of it)
+    def record(self, results):
+        self.stats["processes"] += round(sum(1 / r.shared for r in results))
+        self.stats["jobs"] += len(results)
+        self.stats["failed"] += sum(not r.ok for r in results)
+        self.stats["seconds"] += sum(r.seconds for r in results)
+
+    # Method: Run commands (argv lists, or (argv, input) pairs) in parallel; returns results in order
+    def run(self, commands, timeout=None):
+        commands = [c if isinstance(c, tuple) else (c, None) for c in commands]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(lambda c: run_command(c[0], input=c[1], timeout=timeout), commands))
+        self.record(results)
+        return results
+
+    # Method: Run fn over batches in parallel, fn(batch) returning one result per job (it must not raise);
+    # yields (batch, results) as batches finish
+    def imap(self, fn, batches):
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(fn, batch): batch for batch in batches}
+            for future in as_completed(futures):
+                results = future.result()
+                self.record(results)
+                yield futures[future], results
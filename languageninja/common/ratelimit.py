@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio, time
+
+#-------------------------------#
+# Class definition: TokenBucket #
+#-------------------------------#
+# Classic token bucket: `rate` tokens are added per second, up to `capacity`.
+# Callers take tokens before doing work (e.g. 1 per request, or N per LLM token).
+class TokenBucket():
+
+    # Class constructor
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = None
+
+    # Method: Add the tokens accumulated since the last update
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    # Method: Take tokens if available right now (non-blocking)
+    def try_acquire(self, tokens=1):
+        self._refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    # Method: Wait until tokens are available, then take them
+    async def acquire(self, tokens=1):
+        # Requests larger than the bucket would never fit: cap them at capacity
+        tokens = min(tokens, self.capacity)
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        # Serialise waiters so they are served in arrival order
+        async with self._lock:
+            while not self.try_acquire(tokens):
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import json, math
+from collections import deque
+
+# Optional exact tokenizer (the character heuristic below is used without it)
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+#-------------------#
+# Static parameters #
+#-------------------#
+PROMPT_TOKEN_BUDGET = 4000       # prompt tokens per request (header included)
+COMPLETION_TOKEN_BUDGET = 6000   # expected answer tokens per request
+MAX_BATCH_ITEMS = 40             # words per request, whatever the budget
+MAX_ATTEMPTS = 3                 # times a word is sent before it is given up
+TRUNCATION_BACKOFF = 1.5         # a truncated answer scales the per-item answer estimate by this
+ESTIMATE_SMOOTHING = 0.3         # weight of the last batch in the per-item answer estimate
+
+# Character heuristic: latin text and JSON punctuation pack more characters per token than cyrillic/hebrew
+ASCII_CHARS_PER_TOKEN = 3.5
+OTHER_CHARS_PER_TOKEN = 1.5
+TIKTOKEN_ENCODING = "o200k_base"
+
+#-----------------------#
+# Auxiliary functions   #
+#-----------------------#
+
+# Tokenizer, loaded on first use (None if tiktoken or its encoding files are unavailable)
+_encoding = False
+
+def get_encoding():
+    global _encoding
+    if _encoding is False:
+        _encoding = None
+        if tiktoken is not None:
+            try:
+                _encoding = tiktoken.get_encoding(TIKTOKEN_ENCODING)
+            except Exception:
+                pass
+    return _encoding
+
+# Estimated number of tokens of a text
+def estimate_tokens(text):
+    encoding = get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    n_ascii = sum(1 for c in text if c < '\x80')
+    return math.ceil(n_ascii / ASCII_CHARS_PER_TOKEN + (len(text) - n_ascii) / OTHER_CHARS_PER_TOKEN)
+
+# Compact JSON (no indentation, no spaces), as sent in prompts
+def compact_json(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+#-------------------------------#
+# Class definition: BatchPacker #
+#-------------------------------#
+# Packs pending words into requests that fill a token budget instead of a fixed batch size:
+# a batch grows while its prompt (header + items) and its expected answer (items x per-item estimate) fit.
+# The per-item answer estimate follows the answers actually received, and grows after a truncated answer.
+# Words missing from an answer are re-queued (up to max_attempts) and go out first in the next batch.
+class BatchPacker():
+
+    # Class constructor
+    # - cost: function word_key -> prompt tokens of the word's item
+    # - header_tokens: prompt tokens of the fixed instructions
+    # - completion_per_item: initial estimate of answer tokens per word
+    def __init__(self, keys, cost, header_tokens=0, completion_per_item=100,
+                 prompt_budget=PROMPT_TOKEN_BUDGET, completion_budget=COMPLETION_TOKEN_BUDGET,
+                 max_items=MAX_BATCH_ITEMS, max_attempts=MAX_ATTEMPTS):
+        self.queue = deque(keys)
+        self.cost = cost
+        self.header_tokens = header_tokens
+        self.completion_per_item = float(completion_per_item)
+        self.prompt_budget = prompt_budget
+        self.completion_budget = completion_budget
+        self.max_items = max_items
+        self.max_attempts = max_attempts
+        self.attempts = {}
+        self.dropped = []
+        self._costs = {}
+
+    def __len__(self):
+        return len(self.queue)
+
+    # Method: Prompt tokens of a word's item (computed once per word)
+    def item_cost(self, key):
+        if key not in self._costs:
+            self._costs[key] = self.cost(key)
+        return self._costs[key]
+
+    # Method: Largest batch that fits the budgets, taken from the head of the queue (empty tuple when done)
+    def next_batch(self):
+        batch = []
+        prompt_tokens = self.header_tokens
+        max_items = min(self.max_items, max(1, int(self.completion_budget // self.completion_per_item)))
+        while self.queue and len(batch) < max_items:
+            tokens = self.item_cost(self.queue[0])
+            # Always send at least one word, even if it is over budget on its own
+            if batch and prompt_tokens + tokens > self.prompt_budget:
+                break
+            prompt_tokens += tokens
+            batch.append(self.queue.popleft())
+        for key in batch:
+            self.attempts[key] = self.attempts.get(key, 0) + 1
+        return tuple(batch)
+
+    # Method: Account for an answer; re-queues the missing words and returns them
+    # - answered: {word_key: item} of the words present in the answer
+    # - truncated: the answer was cut off (or could not be parsed)
+    def feedback(self, batch, answered, truncated=False):
+        if truncated:
+            self.completion_per_item *= TRUNCATION_BACKOFF
+        elif answered:
+            observed = estimate_tokens(compact_json(answered)) / len(answered)
+            self.completion_per_item += ESTIMATE_SMOOTHING * (observed - self.completion_per_item)
+
+        missing = [key for key in batch if key not in answered]
+        requeued = []
+        for key in missing:
+            if self.attempts.get(key, 0) < self.max_attempts:
+                requeued.append(key)
+            else:
+                self.dropped.append(key)
+        self.queue.extendleft(reversed(requeued))
+        return requeued
+
+    # Method: Put a batch that was not sent back at the head of the queue (the attempt does not count)
+    def requeue(self, batch):
+        for key in batch:
+            self.attempts[key] -= 1
+        self.queue.extendleft(reversed(batch))
+
+    # Method: Drop everything still queued
+    def clear(self):
+        self.queue.clear()
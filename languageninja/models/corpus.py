@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import json, mmap, os, struct, hashlib
+
+#-------------------#
+# Static parameters #
+#-------------------#
+# Packed corpus is opt-in: set LANGUAGENINJA_CORPUS to the file built by build_corpus()
+CORPUS_FILE_PATH = os.getenv('LANGUAGENINJA_CORPUS', '')
+DEFAULT_CORPUS_FILE_PATH = './data/corpus.bin'
+
+#---------------#
+# Binary layout #
+#---------------#
+# [header][entry table (sorted by key)][keys blob][payloads]
+# - header: magic, format version, number of entries, content digest
+# - entry:  key offset, key length, payload offset, payload length (absolute file offsets)
+# - payload: compact UTF-8 JSON {"langs", "samples", "words_validated", "sentences_validated"}
+MAGIC = b'LNCORPUS'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sHHI16s')
+ENTRY = struct.Struct('<IIII')
+
+#-----------------------#
+# Auxiliary functions   #
+#-----------------------#
+
+# Encode one vocabulary entry as a compact UTF-8 JSON payload
+def encode_entry(entry):
+    return json.dumps({
+        "langs": entry["langs"],
+        "samples": entry["samples"],
+        "words_validated": entry["words_validated"],
+        "sentences_validated": entry["sentences_validated"],
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+# Content digest over (key, payload) pairs, used as corpus version
+def corpus_digest(keys, payloads):
+    digest = hashlib.blake2b(digest_size=16)
+    for key, payload in zip(keys, payloads):
+        digest.update(key + b'\0' + payload + b'\0')
+    return digest.digest()
+
+#------------------------#
+# Function: Build corpus #
+#------------------------#
+def build_corpus(out_path=DEFAULT_CORPUS_FILE_PATH, store=None, verbose=False):
+
+    # Parse the JSON folders (unless an already loaded store is given)
+    if store is None:
+        from languageninja.models.vocabulary import VocabularyStore
+        store = VocabularyStore(corpus_file=None)
+        store.load(verbose=verbose)
+
+    # Encode keys and payloads
+    keys = [key.encode('utf-8') for key in store.keys()]
+    payloads = [encode_entry(store.get(key)) for key in store.keys()]
+
+    # Compute offsets
+    keys_offset = HEADER.size + ENTRY.size * len(keys)
+    payloads_offset = keys_offset + sum(len(k) for k in keys)
+    table = bytearray()
+    key_pos, payload_pos = keys_offset, payloads_offset
+    for key, payload in zip(keys, payloads):
+        table += ENTRY.pack(key_pos, len(key), payload_pos, len(payload))
+        key_pos += len(key)
+        payload_pos += len(payload)
+
+    # Write to a temporary file, then swap it in
+    tmp_path = f"{out_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(keys), corpus_digest(keys, payloads)))
+        f.write(table)
+        f.write(b''.join(keys))
+        f.write(b''.join(payloads))
+    os.replace(tmp_path, out_path)
+
+    if verbose:
+        print(f"📦 Packed {len(keys)} words into {out_path} ({os.path.getsize(out_path)/1024:.0f} KB)")
+    return out_path
+
+#--------------------------------#
+# Class definition: CorpusReader #
+#--------------------------------#
+# Memory-maps a packed corpus; only the requested entry is decoded.
+class CorpusReader():
+
+    # Class constructor
+    def __init__(self, path=DEFAULT_CORPUS_FILE_PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # Check header
+        magic, version, _, count, digest = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f"Not a LanguageNinja corpus file (or unsupported version): {path}")
+        self.n = count
+        self.version = digest.hex()
+
+    # Method: Raw table entry i
+    def _entry(self, i):
+        return ENTRY.unpack_from(self._mm, HEADER.size + ENTRY.size * i)
+
+    # Method: Key at position i
+    def key_at(self, i):
+        key_off, key_len, _, _ = self._entry(i)
+        return self._mm[key_off:key_off + key_len].decode('utf-8')
+
+    # Method: Position of key (binary search over the sorted entry table), -1 if missing
+    def position(self, key):
+        target = key.encode('utf-8')
+        lo, hi = 0, self.n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key_off, key_len, _, _ = self._entry(mid)
+            if self._mm[key_off:key_off + key_len] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.n:
+            key_off, key_len, _, _ = self._entry(lo)
+            if self._mm[key_off:key_off + key_len] == target:
+                return lo
+        return -1
+
+    # Method: Decode entry for key (None if missing)
+    def get(self, key):
+        i = self.position(key)
+        if i < 0:
+            return None
+        _, _, payload_off, payload_len = self._entry(i)
+        entry = json.loads(self._mm[payload_off:payload_off + payload_len].decode('utf-8'))
+        entry["key"] = key
+        return entry
+
+    # Method: Iterate over keys (sorted)
+    def keys(self):
+        return (self.key_at(i) for i in range(self.n))
+
+    # Method: Release the mapping
+    def close(self):
+        self._mm.close()
+
+    def __contains__(self, key):
+        return self.position(key) >= 0
+
+    def __len__(self):
+        return self.n
+
+#================#
+# Main execution #
+#================#
+if __name__ == "__main__":
+    build_corpus(out_path=CORPUS_FILE_PATH or DEFAULT_CORPUS_FILE_PATH, verbose=True)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import json, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from languageninja.models.validation import VALIDATION_PROMPT_MARKER
+
+#-------------------#
+# Static parameters #
+#-------------------#
+# Markers used by the Generator prompts (see generator.py); the batch validation marker comes from validation.py
+WORDS_PROMPT_MARKER = "Here's your list of words to process:"
+SENTENCES_PROMPT_MARKER = "Here's your JSON list of words to process:"
+
+#---------------------------------#
+# Class definition: FakeHTTPError #
+#---------------------------------#
+# Raise from a responder to answer with an HTTP error, e.g. FakeHTTPError(429, retry_after=2)
+class FakeHTTPError(Exception):
+
+    # Class constructor
+    def __init__(self, status, message="Fake error", retry_after=None, code=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.retry_after = retry_after
+        self.code = code
+
+#------------------------------#
+# Default (canned) responses   #
+#------------------------------#
+
+# Fake translations for one word
+def fake_langs(word):
+    return {
+        "en": word,
+        "fr": f"{word} (fr)",
+        "es": f"{word} (es)",
+        "pt": f"{word} (pt)",
+        "ru": {"cyr": f"{word} (ru)", "lat": f"{word} (ru-lat)"},
+        "il": {"heb": f"{word} (he)", "lat": f"{word} (he-lat)"},
+    }
+
+# Fake sample sentences for one word
+def fake_samples(word):
+    sentences = lambda tag: [f"Sentence {n} with {word} ({tag})." for n in range(3)]
+    return {
+        "en": sentences("en"),
+        "fr": sentences("fr"),
+        "es": sentences("es"),
+        "pt": sentences("pt"),
+        "ru": {"cyr": sentences("ru"), "lat": sentences("ru-lat")},
+        "il": {"heb": sentences("he"), "lat": sentences("he-lat")},
+    }
+
+# Default responder: answers Generator prompts with fake data, validates everything
+def default_responder(prompt):
+    if VALIDATION_PROMPT_MARKER in prompt:
+        items = json.loads(prompt.split(VALIDATION_PROMPT_MARKER, 1)[1])
+        return {"result": {w: {"validated": True} for w in items}}
+    if WORDS_PROMPT_MARKER in prompt:
+        words = [w.strip() for w in prompt.split(WORDS_PROMPT_MARKER, 1)[1].split(',') if w.strip()]
+        return {"result": [{w: fake_langs(w)} for w in words]}
+    if SENTENCES_PROMPT_MARKER in prompt:
+        items = json.loads(prompt.split(SENTENCES_PROMPT_MARKER, 1)[1])
+        return {"result": [{w: fake_samples(w)} for item in items for w in item]}
+    return {"validated": True}
+
+#----------------------------------#
+# Class definition: FakeChatServer #
+#----------------------------------#
+# Minimal local stand-in for the chat-completions API, for tests and dry runs:
+#   with FakeChatServer(latency=0.5) as server:
+#       ai = GPTConnector(base_url=server.base_url, api_key="fake", cache=ResponseCache(mode="off"))
+class FakeChatServer():
+
+    # Class constructor
+    # - responder: function(prompt) -> dict, serialised as the message content
+    # - latency: seconds to wait before answering (simulates round-trip time)
+    # - stream_chunk / stream_delay: characters per chunk and seconds between chunks of streamed answers
+    def __init__(self, responder=default_responder, latency=0.0, host='127.0.0.1', port=0,
+                 stream_chunk=64, stream_delay=0.0):
+        self.responder = responder
+        self.latency = latency
+        self.stream_chunk = stream_chunk
+        self.stream_delay = stream_delay
+        self.requests = 0
+        self.prompts = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    # Property: Base URL to pass to the OpenAI client
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    # Method: Build the request handler class bound to this server
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_POST(self):
+                if not self.path.endswith('/chat/completions'):
+                    self.send_error(404)
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                prompt = body["messages"][-1]["content"]
+                with fake._lock:
+                    fake.requests += 1
+                    fake.prompts.append(prompt)
+                if fake.latency:
+                    time.sleep(fake.latency)
+                try:
+                    content = json.dumps(fake.responder(prompt), ensure_ascii=False)
+                except FakeHTTPError as e:
+                    headers = {} if e.retry_after is None else {'Retry-After': str(e.retry_after)}
+                    self._send_json({"error": {"message": e.message, "type": "fake_error", "code": e.code}}, e.status, headers)
+                    return
+                if body.get("stream"):
+                    self._send_stream(fake.chunks(body.get("model", "fake"), prompt, content,
+                                                  usage=(body.get("stream_options") or {}).get("include_usage", False)))
+                    return
+                self._send_json(fake.completion(body.get("model", "fake"), prompt, content))
+
+            def _send_stream(self, chunks):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.end_headers()
+                try:
+                    for chunk in chunks:
+                        self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode('utf-8'))
+                        self.wfile.flush()
+                        if fake.stream_delay:
+                            time.sleep(fake.stream_delay)
+                    self.wfile.write(b"data: [DONE]\n\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client gave up (timeout)
+                self.close_connection = True
+
+            def _send_json(self, data, status=200, headers=None):
+                payload = json.dumps(data, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                try:
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client gave up (timeout)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    # Static method: Chat completion envelope (token counts are rough 4-chars-per-token estimates)
+    @staticmethod
+    def completion(model, prompt, content):
+        prompt_tokens, completion_tokens = len(prompt) // 4, len(content) // 4
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    # Method: Streamed chat completion chunks (content split every stream_chunk characters, then usage)
+    def chunks(self, model, prompt, content, usage=False):
+        envelope = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+        for i in range(0, len(content), self.stream_chunk):
+            yield {**envelope, "choices": [{"index": 0, "delta": {"content": content[i:i+self.stream_chunk]}, "finish_reason": None}]}
+        yield {**envelope, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        if usage:
+            yield {**envelope, "choices": [], "usage": FakeChatServer.completion(model, prompt, content)["usage"]}
+
+    # Method: Serve in a background thread
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    # Method: Stop serving
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+#================#
+# Main execution #
+#================#
+if __name__ == "__main__":
+    server = FakeChatServer(latency=1.0, port=8765)
+    print(f"🧪 Fake chat-completions API on {server.base_url} (Ctrl+C to stop)")
+    print(f"   export OPENAI_BASE_URL={server.base_url} OPENAI_API_KEY=fake LANGUAGENINJA_GPT_CACHE_MODE=off")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import json, rich, os
-from random import randint
+import time
 from languageninja.common.auxfcn import parse_word_list_with_stats
-from languageninja.models.gptclient import GPTConnector
+from languageninja.models.batching import BatchPacker, compact_json, estimate_tokens
+from languageninja.models.jsonstream import ResultStreamParser
+from languageninja.models.gptclient import shared_connector
+from languageninja.models.gptretry import GPTError, CircuitOpenError, CIRCUIT_WAIT_MIN, is_fatal
 from languageninja.models.word import Word
+from languageninja.models.repository import shared_repository
+from languageninja.models.status import CorpusStatus
 
 #-------------------#
 # Static parameters #
@@ -12,14 +16,19 @@ from languageninja.models.word import Word
 WORDS_FOLDER_PATH     = './data/words'
 SENTENCES_FOLDER_PATH = './data/sentences'
 
+# Initial estimates of answer tokens per word (refined by BatchPacker as answers come back)
+WORD_COMPLETION_TOKENS = 80
+SENTENCES_COMPLETION_TOKENS = 400
+
 #------------------------#
 # GPT API Initialisation #
 #------------------------#
 
-# Initialize GPT connector
+# GPT connector (created on first use, so importing this module stays cheap)
 ai_model = "gpt-5"
-print(f"Using AI model: {ai_model}")
-ai = GPTConnector(model=ai_model)
+
+def get_ai():
+    return shared_connector(ai_model)
 
 # GPT prompt for word generation
 gpt_prompt_newwords = """
@@ -181,6 +190,14 @@ class Generator():
         self.word_jsonlist_output = None
         self.sentence_jsonlist_output = None
 
+        # Words of the list actually sent (those not generated yet; None until a prompt is built)
+        self.words_to_process = None
+
+        # Outcome of the last request: {word_key: item} answered, words missing, answer cut off
+        self.answered = {}
+        self.missing = []
+        self.truncated = False
+
     # Method: Set word list
     def set(self, word_list):
         self.word_list = word_list
@@ -188,37 +205,122 @@ class Generator():
     # Static method: Check if word has been already processed
     @staticmethod
     def word_exists(word_key):
-        if os.path.exists(os.path.join(WORDS_FOLDER_PATH, f"{word_key}.json")):
-            w = Word(key=word_key)
-            return w.translations_exist
-        else:
-            return False
+        return word_key in shared_repository().words_exist([word_key])
 
     # Static method: Check if senteces has been already generated
     @staticmethod
     def sentences_exist(word_key):
-        w = Word(key=word_key)
-        return w.n_samples>0
+        return word_key in shared_repository().sentences_exist([word_key])
 
     # Static method: Remove words that have been already processed
+    # (set lookups in a CorpusStatus snapshot if given, else one bulk existence query)
     @staticmethod
-    def word_list_clean(word_list, what_to_check='words'):
-        cleaned_word_list = []
+    def word_list_clean(word_list, what_to_check='words', status=None):
+        if status is not None and what_to_check in ('words', 'sentences'):
+            return status.missing(word_list, what_to_check)
         if what_to_check=='words':
-            for word in word_list:
-                if not Generator.word_exists(word):
-                    cleaned_word_list.append(word)
+            existing = shared_repository().words_exist(word_list)
         elif what_to_check=='sentences':
-            for word in word_list:
-                if not Generator.sentences_exist(word):
-                    cleaned_word_list.append(word)
-        return cleaned_word_list
+            existing = shared_repository().sentences_exist(word_list)
+        else:
+            return []
+        return [word for word in word_list if word not in existing]
 
-    # Method: Generate new words
-    def generate_words(self, sym_mode=False, verbose=False):
+    # Static method: Prompt item of a word for sentence generation (compact JSON of its translations)
+    @staticmethod
+    def sentences_item(word_key):
+        return compact_json({word_key: Word(key=word_key).langs})
+
+    # Static method: BatchPacker over a word list, with the prompt costs of the given generation step
+    @staticmethod
+    def packer(word_list, what_to_process='words', **kwargs):
+        if what_to_process=='words':
+            # Words are sent as a comma-separated list
+            return BatchPacker(word_list, cost=lambda word_key: estimate_tokens(word_key) + 1,
+                               header_tokens=estimate_tokens(gpt_prompt_newwords),
+                               completion_per_item=WORD_COMPLETION_TOKENS, **kwargs)
+        return BatchPacker(word_list, cost=lambda word_key: estimate_tokens(Generator.sentences_item(word_key)) + 1,
+                           header_tokens=estimate_tokens(gpt_prompt_newsentences),
+                           completion_per_item=SENTENCES_COMPLETION_TOKENS, **kwargs)
+
+    # Static method: Split a GPT 'result' list into ({word_key: item} for the requested words, missing words)
+    @staticmethod
+    def match_output(words_to_process, jsonlist_output):
+        answered = {}
+        for json_item in jsonlist_output if isinstance(jsonlist_output, list) else []:
+            if isinstance(json_item, dict) and len(json_item)==1:
+                word_key, item = next(iter(json_item.items()))
+                if word_key in words_to_process and isinstance(item, dict):
+                    answered[word_key] = item
+        return answered, [word_key for word_key in words_to_process if word_key not in answered]
+
+    # Method: Record which words an answer covers (an unparseable answer is taken as truncated)
+    def check_output(self, words_to_process, out):
+        return self.record_output(words_to_process, out.get('result', []), truncated='raw_response' in out)
+
+    # Method: Record which words a 'result' list covers and return its well-formed items
+    def record_output(self, words_to_process, jsonlist_output, truncated=False):
+        self.truncated = truncated
+        self.answered, self.missing = Generator.match_output(words_to_process, jsonlist_output)
+        if self.missing:
+            reason = "answer truncated" if self.truncated else "not in answer"
+            print(f"⚠️ {len(self.missing)} words {reason}: {', '.join(self.missing)}")
+        return [{word_key: item} for word_key, item in self.answered.items()]
+
+    # Method: Send a prompt in streaming mode; each item is saved (save(items, verbose)) as soon as it is complete
+    def stream_output(self, words_to_process, full_prompt, save=None, verbose=False):
+        parser = ResultStreamParser()
+        jsonlist_output = []
+        try:
+            for json_item in get_ai().stream_prompt(full_prompt, parser=parser):
+                answered, _ = Generator.match_output(words_to_process, [json_item])
+                if not answered:
+                    continue
+                jsonlist_output.append(json_item)
+                if save is not None:
+                    save([json_item], verbose=verbose)
+
+        # Stream cut off: keep the items already saved, the rest of the batch is sent again
+        except GPTError as e:
+            if not jsonlist_output:
+                raise
+            print(f"⚠️ Stream interrupted after {len(jsonlist_output)} items: {e}")
+            return self.record_output(words_to_process, jsonlist_output, truncated=True)
+        return self.record_output(words_to_process, jsonlist_output, truncated=not parser.complete)
+
+    # Method: Build prompt for new words (returns words to process and prompt; prompt is None if nothing to do)
+    def words_prompt(self):
 
         # Process only words that have not been already generated
         words_to_process = Generator.word_list_clean(self.word_list)
+        self.words_to_process = words_to_process
+        if not words_to_process:
+            return words_to_process, None
+
+        # Generate full prompt
+        return words_to_process, f"{gpt_prompt_newwords}{', '.join(words_to_process)}"
+
+    # Method: Build prompt for new sentences (returns words to process and prompt; prompt is None if nothing to do)
+    def sentences_prompt(self):
+
+        # Process only words that have not been already generated
+        words_to_process = Generator.word_list_clean(self.word_list, what_to_check='sentences')
+        self.words_to_process = words_to_process
+        if not words_to_process:
+            return words_to_process, None
+
+        # Generate input string (compact JSON list of {word: translations})
+        input_str = f"[{','.join(Generator.sentences_item(word_key) for word_key in words_to_process)}]"
+
+        # Generate full prompt
+        return words_to_process, f"{gpt_prompt_newsentences}{input_str}"
+
+    # Method: Generate new words
+    # - stream: save each word's translations as soon as it arrives (no need to call save_words afterwards)
+    def generate_words(self, sym_mode=False, verbose=False, stream=False):
+
+        # Generate full prompt
+        words_to_process, full_prompt = self.words_prompt()
 
         # Check if there are words to process
         if not words_to_process:
@@ -226,9 +328,6 @@ class Generator():
                 print("✅ All words have already been generated.")
             return 0
 
-        # Generate and print full prompt
-        full_prompt = f"{gpt_prompt_newwords}{', '.join(words_to_process)}"
-
         # Print prompt if verbose
         if verbose:
             print('')
@@ -242,18 +341,22 @@ class Generator():
 
         # Return if in symulation mode
         if sym_mode:
-            print(f"♻️ Running in simulation mode. Words not processed.")
+            print("♻️ Running in simulation mode. Words not processed.")
             self.word_jsonlist_output = None
             return 0
 
-        # Execute prompt (function already returns parsed JSON)
-        out = ai.send_prompt(full_prompt)
+        # Execute prompt: streamed and saved item by item, or parsed and kept for save_words()
+        if stream:
+            word_jsonlist_output = self.stream_output(words_to_process, full_prompt, save=Generator.write_words, verbose=verbose)
+        else:
+            out = get_ai().send_prompt(full_prompt)
 
-        # Extract 'result' field from output
-        word_jsonlist_output = out.get('result', [])
+            # Extract 'result' field from output (only well-formed items of requested words)
+            word_jsonlist_output = self.check_output(words_to_process, out)
 
         # Print output if verbose
         if verbose:
+            import rich
             rich.print_json(data=word_jsonlist_output)
 
         # Assign output to internal variable
@@ -262,11 +365,12 @@ class Generator():
         # Return number of generated words
         return len(word_jsonlist_output)
 
-    # Method: Generate new words
-    def generate_sentences(self, sym_mode=False, verbose=False):
+    # Method: Generate new sentences
+    # - stream: save each word's sentences as soon as it arrives (no need to call save_sentences afterwards)
+    def generate_sentences(self, sym_mode=False, verbose=False, stream=False):
 
-        # Process only words that have not been already generated
-        words_to_process = Generator.word_list_clean(self.word_list, what_to_check='sentences')
+        # Generate full prompt
+        words_to_process, full_prompt = self.sentences_prompt()
 
         # Check if there are words to process
         if not words_to_process:
@@ -274,18 +378,6 @@ class Generator():
                 print("✅ All words have already been generated.")
             return 0
 
-        # Generate json input
-        json_list = []
-        for word_key in words_to_process:
-            w = Word(key=word_key)
-            json_list += [{word_key: w.langs}]
-
-        # Generate input string
-        input_str = json.dumps(json_list, ensure_ascii=False, indent=4)
-
-        # Generate and print full prompt
-        full_prompt = f"{gpt_prompt_newsentences}{input_str}"
-
         # Print prompt if verbose
         if verbose:
             print('')
@@ -299,18 +391,22 @@ class Generator():
 
         # Return if in symulation mode
         if sym_mode:
-            print(f"♻️ Running in simulation mode. Words not processed.")
+            print("♻️ Running in simulation mode. Words not processed.")
             self.sentence_jsonlist_output = None
             return 0
 
-        # Execute prompt (function already returns parsed JSON)
-        out = ai.send_prompt(full_prompt)
+        # Execute prompt: streamed and saved item by item, or parsed and kept for save_sentences()
+        if stream:
+            sentence_jsonlist_output = self.stream_output(words_to_process, full_prompt, save=Generator.write_sentences, verbose=verbose)
+        else:
+            out = get_ai().send_prompt(full_prompt)
 
-        # Extract 'result' field from output
-        sentence_jsonlist_output = out.get('result', [])
+            # Extract 'result' field from output (only well-formed items of requested words)
+            sentence_jsonlist_output = self.check_output(words_to_process, out)
 
         # Print output if verbose
         if verbose:
+            import rich
             rich.print_json(data=sentence_jsonlist_output)
 
         # Assign output to internal variable
@@ -319,7 +415,7 @@ class Generator():
         # Return number of generated words
         return len(sentence_jsonlist_output)
 
-    # Method: Save GPT-generated words to files
+    # Method: Save GPT-generated words to the repository
     def save_words(self, verbose=False):
 
         # Check if there is any JSON output to save
@@ -328,29 +424,33 @@ class Generator():
                print("⚠️  No JSON output to save. Please run generate() first.")
             return
 
-        # Iterate over each word entry in the JSON output
-        for json_item in self.word_jsonlist_output:
+        Generator.write_words(self.word_jsonlist_output, verbose=verbose)
+
+    # Static method: Save a list of GPT-generated {word: translations} items to the repository
+    @staticmethod
+    def write_words(jsonlist_output, verbose=False):
 
-            # Word key is the first (and only) key in the json_item dict
-            word_key = list(json_item.keys())[0]
+        # Skip words that already exist (one bulk existence query)
+        word_keys = [list(json_item.keys())[0] for json_item in jsonlist_output]
+        existing = shared_repository().words_exist(word_keys)
 
-            # Check if word file already exists
-            if Generator.word_exists(word_key):
+        # Collect new words (word key is the first and only key in each json_item dict)
+        items = []
+        for word_key, json_item in zip(word_keys, jsonlist_output):
+            if word_key in existing:
                 if verbose:
                     print(f"⚠️ Word '{word_key}' already exists. Skipping.")
                 continue
+            items.append((word_key, json_item[word_key], False))
 
-            # Create Word object from JSON entry
-            w = Word(key=word_key, verbose=verbose)
-            w.langs = json_item[word_key]
-
-            # Save word to file
-            w.save(what_to_save='word')
+        # Save words (bulk upsert: one journaled batch for JSON folders)
+        shared_repository().write_words(items)
 
-            # Print confirmation
+        # Print confirmation
+        for word_key, _, _ in items:
             print(f"✅ Saved word: {word_key}")
 
-    # Method: Save GPT-generated sentences to files
+    # Method: Save GPT-generated sentences to the repository
     def save_sentences(self, verbose=False):
 
         # Check if there is any JSON output to save
@@ -359,26 +459,30 @@ class Generator():
                print("⚠️  No JSON output to save. Please run generate() first.")
             return
 
-        # Iterate over each word entry in the JSON output
-        for json_item in self.sentence_jsonlist_output:
+        Generator.write_sentences(self.sentence_jsonlist_output, verbose=verbose)
+
+    # Static method: Save a list of GPT-generated {word: sentences} items to the repository
+    @staticmethod
+    def write_sentences(jsonlist_output, verbose=False):
 
-            # Word key is the first (and only) key in the json_item dict
-            word_key = list(json_item.keys())[0]
+        # Skip words that already have sentences (one bulk existence query)
+        word_keys = [list(json_item.keys())[0] for json_item in jsonlist_output]
+        existing = shared_repository().sentences_exist(word_keys)
 
-            # Check if sample sentences already exist
-            if Generator.sentences_exist(word_key):
+        # Collect new sentences (word key is the first and only key in each json_item dict)
+        items = []
+        for word_key, json_item in zip(word_keys, jsonlist_output):
+            if word_key in existing:
                 if verbose:
                     print(f"⚠️ Sentences for '{word_key}' already exist. Skipping.")
                 continue
+            items.append((word_key, json_item[word_key], False))
 
-            # Create Word object from JSON entry
-            w = Word(key=word_key, verbose=verbose)
-            w.samples = json_item[word_key]
-
-            # Save word to file
-            w.save(what_to_save='sentences')
+        # Save sentences (bulk upsert: one journaled batch for JSON folders)
+        shared_repository().write_sentences(items)
 
-            # Print confirmation
+        # Print confirmation
+        for word_key, _, _ in items:
             print(f"✅ Saved sentences for word: {word_key}")
 
 #================#
@@ -392,52 +496,76 @@ if __name__ == "__main__":
     # Get list of words to process from file with list of most common words
     word_list = parse_word_list_with_stats()
 
-    #===============================#
-    # Process in batches of N words #
-    #===============================#
+    #======================================#
+    # Process in batches sized to a budget #
+    #======================================#
 
     # Processing parameters
-    batch_size = 5
     max_num_iterations = 100000
     iter_counter = 0
     verbose = False
     sym_mode = False
+    stream = True       # save each word as soon as its part of the answer arrives
 
-    # Loop over words list
-    for i,b in enumerate(range(0, len(word_list), batch_size)):
+    # Partition the word list once, from a snapshot of the corpus status
+    status = CorpusStatus.snapshot(audio_folder=None)
+    if what_to_process=='words':
+        # Words with sentences but no translations yet
+        word_list = status.missing(status.having(word_list, 'sentences'), 'words')
+    elif what_to_process=='sentences':
+        # Words with translations but no sentences yet
+        word_list = status.missing(status.having(word_list, 'words'), 'sentences')
+    print(f"📊 {len(word_list)} words to process ({what_to_process})")
 
-        # Get current batch of words
-        batch_words = tuple(word_list[b:b+batch_size])
+    # Pack batches to the token budget; words missing from an answer are sent again
+    packer = Generator.packer(word_list, what_to_process)
+    while len(packer):
 
-        # Keep only words that exist
-        if what_to_process=='words':
-            batch_words = tuple([word_key for word_key in word_list[b:b+batch_size] if Generator.sentences_exist(word_key) and not Generator.word_exists(word_key)])
-        elif what_to_process=='sentences':
-            batch_words = tuple([word_key for word_key in word_list[b:b+batch_size] if Generator.word_exists(word_key)])
+        # Get next batch of words
+        batch_words = packer.next_batch()
 
         # Create Generator object for the batch
         gen = Generator(word_list=batch_words)
+        n_generated = 0
 
-        # What to generate?
-        # -> Words
-        if what_to_process=='words':
+        try:
+            # What to generate?
+            # -> Words
+            if what_to_process=='words':
+
+                # Generate new words
+                n_generated = gen.generate_words(sym_mode=sym_mode, verbose=verbose, stream=stream)
+
+                # Save generated words (already saved when streaming)
+                if not sym_mode and not stream:
+                    gen.save_words(verbose=verbose)
 
-            # Generate new words
-            n_generated = gen.generate_words(sym_mode=sym_mode, verbose=verbose)
+            # -> Sentences
+            elif what_to_process=='sentences':
 
-            # Save generated words
-            if not sym_mode:
-                gen.save_words(verbose=verbose)
+                # Generate new sentences
+                n_generated = gen.generate_sentences(sym_mode=sym_mode, verbose=verbose, stream=stream)
 
-        # -> Sentences
-        elif what_to_process=='sentences':
+                # Save generated sentences (already saved when streaming)
+                if not sym_mode and not stream:
+                    gen.save_sentences(verbose=verbose)
 
-            # Generate new sentences
-            n_generated = gen.generate_sentences(sym_mode=sym_mode, verbose=verbose)
+        # API failing for now: wait for the circuit to close, then send the batch again
+        except CircuitOpenError as e:
+            print(f"⏸️ Circuit open, retrying in {e.retry_in:.0f} s")
+            time.sleep(max(e.retry_in, CIRCUIT_WAIT_MIN))
+            packer.requeue(batch_words)
+            continue
 
-            # Save generated sentences
-            if not sym_mode:
-                gen.save_sentences(verbose=verbose)
+        # Failed batch: its words count as missing (sent again up to max_attempts), unless nothing can succeed
+        except Exception as e:
+            print(f"❌ Batch failed ({', '.join(batch_words)}): {e}")
+            if is_fatal(e):
+                break
+
+        # Re-queue words that did not come back (out of those actually sent: existing words were filtered out)
+        if not sym_mode:
+            packer.feedback(batch_words if gen.words_to_process is None else gen.words_to_process, gen.answered, gen.truncated)
 
         # Check if it counts as an effective iteration
         iter_counter += int(n_generated>0)
@@ -445,3 +573,7 @@ if __name__ == "__main__":
         # Stop after max number of iterations
         if iter_counter==max_num_iterations:
             break
+
+    # Words given up after too many attempts
+    if packer.dropped:
+        print(f"❌ Not generated after {packer.max_attempts} attempts: {', '.join(packer.dropped)}")
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import hashlib, json, os, sqlite3, threading, time
+
+# Cache location and mode (readwrite: use and fill the cache; replay: offline, cache only; off: no cache)
+GPT_CACHE_FILE_PATH = os.getenv("LANGUAGENINJA_GPT_CACHE", "./data/gpt_cache.sqlite")
+GPT_CACHE_MODE = os.getenv("LANGUAGENINJA_GPT_CACHE_MODE", "readwrite")
+GPT_CACHE_TTL = float(os.getenv("LANGUAGENINJA_GPT_CACHE_TTL", 30 * 86400))           # seconds
+GPT_CACHE_MAX_BYTES = int(os.getenv("LANGUAGENINJA_GPT_CACHE_MAX_BYTES", 256 * 2**20))
+CACHE_MODES = ("readwrite", "replay", "off")
+ACCESS_FLUSH_SIZE = 64      # hits whose access times are written together
+
+
+class CacheMiss(KeyError):
+    """
+    Raised in replay mode when a prompt is not in the cache.
+    """
+
+
+def cache_key(model: str, prompt: str, response_format=None) -> str:
+    """
+    Returns the cache key of a request: hash of (model, prompt, response_format).
+    """
+    data = json.dumps([model, prompt, response_format], ensure_ascii=False, sort_keys=True)
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=20).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path: str = GPT_CACHE_FILE_PATH, mode: str = GPT_CACHE_MODE,
+                 ttl: float = GPT_CACHE_TTL, max_bytes: int = GPT_CACHE_MAX_BYTES):
+        """
+        Persistent cache of chat completion contents (SQLite), with TTL and size-based (LRU) eviction.
+
+        :param path: SQLite file
+        :param mode: "readwrite", "replay" (offline: misses raise CacheMiss) or "off"
+        :param ttl: Entries older than this (seconds) are ignored and evicted; 0 keeps them forever
+        :param max_bytes: Least recently used entries are evicted above this total content size
+        """
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._db = None
+        self._total = None          # running total of content sizes (measured once, then kept up to date)
+        self._accessed = {}         # access times of recent hits, not written yet
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @property
+    def offline(self) -> bool:
+        return self.mode == "replay"
+
+    def connect(self):
+        """
+        Opens the cache database (created on first use).
+        """
+        if self._db is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, model TEXT NOT NULL, content TEXT NOT NULL,"
+                " size INTEGER NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS responses_by_access ON responses (accessed)")
+            db.execute("CREATE INDEX IF NOT EXISTS responses_by_creation ON responses (created)")
+            db.commit()
+            self._db = db
+        return self._db
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._flush_access(self._db)
+                self._db.close()
+                self._db = None
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl > 0 and now - created > self.ttl
+
+    def get(self, key: str):
+        """
+        Returns the cached content for a key, or None (expired entries count as misses).
+        In replay mode a miss raises CacheMiss.
+        """
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            db = self.connect()
+            row = db.execute("SELECT content, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self._expired(row[1], now) and not self.offline:
+                db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                db.commit()
+                self._total = None
+                self._accessed.pop(key, None)
+                self.counters["evictions"] += 1
+                row = None
+            if row is None:
+                self.counters["misses"] += 1
+            else:
+                # Access times only order evictions: written in batches, not on every hit
+                self._accessed[key] = now
+                if len(self._accessed) >= ACCESS_FLUSH_SIZE:
+                    self._flush_access(db)
+                self.counters["hits"] += 1
+        if row is None and self.offline:
+            raise CacheMiss(f"Prompt not in the response cache (replay mode): {key}")
+        return None if row is None else row[0]
+
+    def put(self, key: str, model: str, content: str) -> None:
+        """
+        Stores the content of a response (not in replay mode), then evicts entries above the size limit.
+        """
+        if self.mode != "readwrite" or content is None:
+            return
+        now = time.time()
+        size = len(content.encode("utf-8"))
+        with self._lock:
+            db = self.connect()
+            total = self._measure(db)
+            old = db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, model, content, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, content, size, now, now))
+            db.commit()
+            self._total = total + size - (old[0] if old else 0)
+            self.counters["stores"] += 1
+            self._evict(db, now)
+
+    def _measure(self, db) -> int:
+        """
+        Returns the total content size, scanning the table only the first time.
+        """
+        if self._total is None:
+            self._total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        return self._total
+
+    def _flush_access(self, db) -> None:
+        """
+        Writes the pending access times of cache hits (one statement for the batch).
+        """
+        if self._accessed:
+            db.executemany("UPDATE responses SET accessed = ? WHERE key = ?", [(t, k) for k, t in self._accessed.items()])
+            db.commit()
+            self._accessed.clear()
+
+    def _evict(self, db, now: float) -> None:
+        removed = 0
+        if self.ttl > 0:
+            # Both use the creation index: nothing is scanned when no entry has expired
+            expired = db.execute("SELECT COALESCE(SUM(size), 0), COUNT(*) FROM responses WHERE created < ?", (now - self.ttl,)).fetchone()
+            if expired[1]:
+                db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+                self._total = self._measure(db) - expired[0]
+                removed += expired[1]
+        if self.max_bytes and self._measure(db) > self.max_bytes:
+            # Other processes may share the file: re-measure before deleting anything
+            self._total = None
+            total = self._measure(db)
+            if total > self.max_bytes:
+                self._flush_access(db)
+                for key, size in db.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall():
+                    db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    removed += 1
+                    total -= size
+                    if total <= self.max_bytes:
+                        break
+                self._total = total
+        db.commit()
+        self.counters["evictions"] += removed
+
+    def prune(self) -> int:
+        """
+        Applies TTL and size eviction now; returns the number of evicted entries.
+        """
+        before = self.counters["evictions"]
+        with self._lock:
+            self._total = None
+            self._evict(self.connect(), time.time())
+        return self.counters["evictions"] - before
+
+    def stats(self) -> dict:
+        """
+        Returns the counters plus the number of entries and their total size.
+        """
+        with self._lock:
+            db = self.connect()
+            self._flush_access(db)
+            entries, size = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            self._total = size
+        return {**self.counters, "entries": entries, "bytes": size}
+
+
+# Shared cache, created on first use
+_shared_cache = None
+
+def shared_cache() -> ResponseCache:
+    """
+    Returns the shared ResponseCache configured from the environment.
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = ResponseCache()
+    return _shared_cache
+
+
+if __name__ == "__main__":
+    cache = shared_cache()
+    print(f"🗄️ {cache.path} ({cache.mode}): {cache.stats()}")
+    print(f"🧹 Evicted {cache.prune()} entries")
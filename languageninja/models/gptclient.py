@@ -1,49 +1,275 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from dotenv import load_dotenv
-from openai import OpenAI
-import os, json, rich
+import asyncio, os, json
+from languageninja.models.gptretry import GPTConfigError, RetryPolicy, CircuitBreaker, call_with_retry, async_call_with_retry, classify
+
+def parse_response_content(message) -> dict:
+    """
+    Parses the content of a chat completion message into a dictionary.
+    """
+    try:
+        if message is None:
+            return {"error": "No response from model"}
+        return json.loads(message)
+    except json.JSONDecodeError:
+        return {"raw_response": message}
+
+def new_usage() -> dict:
+    """
+    Returns empty usage counters (requests and tokens).
+    """
+    return {"requests": 0, "retries": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+
+def record_usage(counters: dict, response) -> None:
+    """
+    Adds the token usage of a chat completion response to the counters.
+    """
+    counters["requests"] += 1
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        counters["prompt_tokens"] += usage.prompt_tokens or 0
+        counters["completion_tokens"] += usage.completion_tokens or 0
+        counters["total_tokens"] += usage.total_tokens or 0
+
+# Requests ask for JSON output
+RESPONSE_FORMAT = {"type": "json_object"}
+
+def log_retry(counters: dict):
+    """
+    Returns an on_retry callback that counts and reports retries.
+    """
+    def on_retry(error, attempt, wait):
+        counters["retries"] += 1
+        print(f"🔁 {type(error).__name__}: {error} (retry {attempt + 1} in {wait:.1f} s)")
+    return on_retry
+
+def missing_key_error() -> GPTConfigError:
+    return GPTConfigError("OPENAI_API_KEY not found: set it in the .env file or pass api_key")
+
+def cacheable(result: dict) -> bool:
+    """
+    Only well-formed JSON answers are cached.
+    """
+    return "raw_response" not in result and "error" not in result
+
 
 class GPTConnector:
-    def __init__(self, model: str = "gpt-4o-mini"):
+    def __init__(self, model: str = "gpt-4o-mini", base_url: str = None, api_key: str = None, cache=None,
+                 policy: RetryPolicy = None, breaker: CircuitBreaker = None):
         """
         Initialize the GPTConnector. Loads API key from .env file.
+
+        :param base_url: Optional API endpoint (e.g. a local fake server); defaults to OpenAI
+        :param api_key: Optional API key; defaults to OPENAI_API_KEY
+        :param cache: Optional ResponseCache; defaults to the shared cache (see gptcache.py)
+        :param policy: Optional RetryPolicy (timeouts, retries, backoff)
+        :param breaker: Optional CircuitBreaker; defaults to one per connector
+        :raises GPTConfigError: If no API key is available (and the cache is not in replay mode)
         """
+        from languageninja.models.gptcache import shared_cache
+
+        self.model = model
+        self.usage = new_usage()
+        self.cache = cache if cache is not None else shared_cache()
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.client = None
+
+        # Replay mode answers from the cache only: no client, no network
+        if self.cache.offline:
+            return
+
+        # Heavy imports are deferred until a connector is actually needed
+        from dotenv import load_dotenv
+        from openai import OpenAI
+
         # Load environment variables from .env
         load_dotenv()
 
-        api_key = os.getenv("OPENAI_API_KEY")
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not api_key:
-            print("⚠️ OPENAI_API_KEY not found in .env file")
-            return None
+            raise missing_key_error()
 
-        self.client = OpenAI(api_key=api_key)
-        self.model = model
+        # Retries are handled by call_with_retry (see gptretry.py)
+        self.client = OpenAI(api_key=api_key, base_url=base_url, timeout=self.policy.timeout, max_retries=0)
 
     def send_prompt(self, prompt: str) -> dict:
         """
-        Sends a prompt to ChatGPT and returns the JSON response.
+        Sends a prompt to ChatGPT and returns the JSON response (from the response cache if possible).
 
         :param prompt: The text prompt to send to ChatGPT
         :return: A dictionary containing the model's JSON response
         """
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"}  # ensures valid JSON
+        from languageninja.models.gptcache import cache_key
+
+        key = cache_key(self.model, prompt, RESPONSE_FORMAT)
+        content = self.cache.get(key)
+        if content is not None:
+            return parse_response_content(content)
+
+        response = call_with_retry(
+            lambda: self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                response_format=RESPONSE_FORMAT  # ensures valid JSON
+            ),
+            self.policy, self.breaker, on_retry=log_retry(self.usage)
         )
+        record_usage(self.usage, response)
 
-        message = response.choices[0].message.content
+        content = response.choices[0].message.content
+        result = parse_response_content(content)
+        if cacheable(result):
+            self.cache.put(key, self.model, content)
+        return result
 
+    def stream_prompt(self, prompt: str, parser=None):
+        """
+        Sends a prompt in streaming mode and yields each element of the answer's "result" list
+        as soon as it is complete (a cached answer is replayed the same way).
+
+        Only opening the stream is retried: once elements have been yielded, an error is raised as is.
+        After the loop, parser.complete tells whether the whole list was received.
+
+        :param prompt: The text prompt to send to ChatGPT
+        :param parser: Optional ResultStreamParser (pass one to inspect it afterwards)
+        :return: A generator of result elements (e.g. {word: {...}} dicts)
+        """
+        from languageninja.models.gptcache import cache_key
+        from languageninja.models.jsonstream import ResultStreamParser
+
+        parser = parser if parser is not None else ResultStreamParser()
+        key = cache_key(self.model, prompt, RESPONSE_FORMAT)
+        content = self.cache.get(key)
+        if content is not None:
+            yield from parser.feed(content)
+            return
+
+        stream = call_with_retry(
+            lambda: self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                response_format=RESPONSE_FORMAT,  # ensures valid JSON
+                stream=True,
+                stream_options={"include_usage": True}
+            ),
+            self.policy, self.breaker, on_retry=log_retry(self.usage)
+        )
+        usage_chunk = None
         try:
-            if message is None:
-                return {"error": "No response from model"}
-            return json.loads(message)
-        except json.JSONDecodeError:
-            return {"raw_response": message}
+            for chunk in stream:
+                if getattr(chunk, "usage", None) is not None:
+                    usage_chunk = chunk
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield from parser.feed(chunk.choices[0].delta.content)
+        except Exception as exc:
+            error = classify(exc)
+            if error is exc:
+                raise
+            raise error from exc
+        finally:
+            stream.close()
+            record_usage(self.usage, usage_chunk)
+
+        content = parser.content()
+        if parser.complete and cacheable(parse_response_content(content)):
+            self.cache.put(key, self.model, content)
+
+
+class AsyncGPTConnector:
+    def __init__(self, model: str = "gpt-4o-mini", base_url: str = None, api_key: str = None, cache=None,
+                 policy: RetryPolicy = None, breaker: CircuitBreaker = None):
+        """
+        Initialize the AsyncGPTConnector (AsyncOpenAI-backed variant of GPTConnector).
+
+        :param base_url: Optional API endpoint (e.g. a local fake server); defaults to OpenAI
+        :param api_key: Optional API key; defaults to OPENAI_API_KEY
+        :param cache: Optional ResponseCache; defaults to the shared cache (see gptcache.py)
+        :param policy: Optional RetryPolicy (timeouts, retries, backoff)
+        :param breaker: Optional CircuitBreaker; defaults to one per connector
+        :raises GPTConfigError: If no API key is available (and the cache is not in replay mode)
+        """
+        from languageninja.models.gptcache import shared_cache
+
+        self.model = model
+        self.usage = new_usage()
+        self.cache = cache if cache is not None else shared_cache()
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.client = None
+
+        # Replay mode answers from the cache only: no client, no network
+        if self.cache.offline:
+            return
+
+        from dotenv import load_dotenv
+        from openai import AsyncOpenAI
+
+        # Load environment variables from .env
+        load_dotenv()
+
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise missing_key_error()
+
+        # Retries are handled by async_call_with_retry (see gptretry.py)
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url, timeout=self.policy.timeout, max_retries=0)
+
+    async def send_prompt(self, prompt: str) -> dict:
+        """
+        Sends a prompt to ChatGPT without blocking the event loop and returns the JSON response
+        (from the response cache if possible).
+
+        :param prompt: The text prompt to send to ChatGPT
+        :return: A dictionary containing the model's JSON response
+        """
+        from languageninja.models.gptcache import cache_key
+
+        # SQLite calls run off the event loop
+        key = cache_key(self.model, prompt, RESPONSE_FORMAT)
+        content = await asyncio.to_thread(self.cache.get, key)
+        if content is not None:
+            return parse_response_content(content)
+
+        response = await async_call_with_retry(
+            lambda: self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                response_format=RESPONSE_FORMAT  # ensures valid JSON
+            ),
+            self.policy, self.breaker, on_retry=log_retry(self.usage)
+        )
+        record_usage(self.usage, response)
+
+        content = response.choices[0].message.content
+        result = parse_response_content(content)
+        if cacheable(result):
+            await asyncio.to_thread(self.cache.put, key, self.model, content)
+        return result
+
+    async def close(self):
+        """
+        Closes the underlying HTTP client.
+        """
+        if self.client is not None:
+            await self.client.close()
+
+
+# Shared connectors, created on first use (one per model)
+_connectors = {}
+
+def shared_connector(model: str) -> GPTConnector:
+    """
+    Returns the shared GPTConnector for the given model, creating it on first call.
+    """
+    if model not in _connectors:
+        print(f"Using AI model: {model}")
+        _connectors[model] = GPTConnector(model=model)
+    return _connectors[model]
 
 
 if __name__ == "__main__":
+    import rich
     connector = GPTConnector(model="gpt-4o-mini")
 
     prompt = """
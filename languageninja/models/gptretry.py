@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import random, threading, time
+
+# Shortest wait of a batch run before it sends a batch again after CircuitOpenError
+CIRCUIT_WAIT_MIN = 1.0
+
+
+class GPTError(Exception):
+    """
+    Base class of the errors raised by the GPT connectors.
+    """
+    retryable = False
+
+
+class GPTConfigError(GPTError):
+    """
+    The connector cannot work as configured (missing or rejected API key, unknown model, exhausted quota).
+    No request can succeed until the configuration is fixed.
+    """
+
+
+class GPTRequestError(GPTError):
+    """
+    The request was rejected and retrying it will not help (bad request, unknown model, quota exceeded, ...).
+    """
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        self.status = status
+
+
+class GPTTransientError(GPTError):
+    """
+    Connection failure or server-side error: the request may succeed if retried.
+    """
+    retryable = True
+
+    def __init__(self, message: str, status: int = None, retry_after: float = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class GPTTimeoutError(GPTTransientError):
+    """
+    The call did not complete before its deadline.
+    """
+
+
+class GPTRateLimitError(GPTTransientError):
+    """
+    HTTP 429: too many requests (retry_after holds the server's Retry-After, if any).
+    """
+
+
+class CircuitOpenError(GPTError):
+    """
+    Raised without calling the API while the circuit breaker is open.
+    """
+    def __init__(self, message: str, retry_in: float):
+        super().__init__(message)
+        self.retry_in = retry_in
+
+
+def is_fatal(error: Exception) -> bool:
+    """
+    Should a batch run stop on this error (instead of failing every remaining batch the same way)?
+    An open circuit is not fatal: batch runs wait for it to close and send the batch again.
+    """
+    return isinstance(error, GPTConfigError)
+
+
+def parse_retry_after(headers) -> float:
+    """
+    Returns the delay requested by Retry-After / Retry-After-Ms headers in seconds (None if absent).
+    """
+    if headers is None:
+        return None
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify(exc: Exception) -> Exception:
+    """
+    Maps an exception raised by the OpenAI client to a typed GPTError (other exceptions are returned as is).
+    """
+    if isinstance(exc, GPTError):
+        return exc
+    import openai
+
+    if isinstance(exc, openai.APITimeoutError):
+        return GPTTimeoutError(f"Request timed out: {exc}")
+    if isinstance(exc, openai.APIConnectionError):
+        return GPTTransientError(f"Connection error: {exc}")
+    if isinstance(exc, openai.APIStatusError):
+        status = exc.status_code
+        message = f"HTTP {status}: {exc.message}"
+        if status in (401, 403, 404):
+            return GPTConfigError(message)
+        if status == 429:
+            # An exhausted quota will not come back by waiting
+            if getattr(exc, "code", None) == "insufficient_quota":
+                return GPTConfigError(message)
+            return GPTRateLimitError(message, status, parse_retry_after(exc.response.headers))
+        if status in (408, 409) or status >= 500:
+            return GPTTransientError(message, status, parse_retry_after(exc.response.headers))
+        return GPTRequestError(message, status)
+    return exc
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = 6, base_delay: float = 1.0, max_delay: float = 60.0,
+                 timeout: float = 120.0, deadline: float = 600.0):
+        """
+        Retry policy for API calls: jittered exponential backoff that honours Retry-After.
+
+        :param max_attempts: Attempts per call (1 = no retry)
+        :param base_delay: Backoff scale (seconds); attempt n waits up to base_delay * 2**n
+        :param max_delay: Longest wait between two attempts (seconds)
+        :param timeout: Deadline of a single attempt (seconds)
+        :param deadline: Total time budget of a call, including retries (seconds)
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.deadline = deadline
+
+    def delay(self, attempt: int, retry_after: float = None) -> float:
+        """
+        Seconds to wait before retry number `attempt` (0-based): full jitter, at least Retry-After.
+        """
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after is not None:
+            backoff = max(backoff, min(retry_after, self.max_delay))
+        return backoff
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Stops calling the API after `failure_threshold` consecutive failed calls; after `reset_timeout`
+        seconds a single trial call is let through (half-open), and its outcome closes or re-opens the circuit.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def before_call(self) -> None:
+        """
+        Raises CircuitOpenError if calls are currently blocked.
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return
+            waited = time.monotonic() - self.opened_at
+            if waited < self.reset_timeout or self._trial:
+                raise CircuitOpenError(f"Circuit open after {self.failures} consecutive failures",
+                                       retry_in=max(0.0, self.reset_timeout - waited))
+            self._trial = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial = False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+def _next_delay(error: Exception, attempt: int, policy: RetryPolicy, started: float):
+    """
+    Returns the wait before the next attempt, or None if the error must be raised.
+    """
+    if not getattr(error, "retryable", False) or attempt + 1 >= policy.max_attempts:
+        return None
+    wait = policy.delay(attempt, getattr(error, "retry_after", None))
+    if time.monotonic() - started + wait > policy.deadline:
+        return None
+    return wait
+
+
+def call_with_retry(call, policy: RetryPolicy, breaker: CircuitBreaker = None, on_retry=None):
+    """
+    Runs call() under the retry policy and circuit breaker; raises a typed GPTError when giving up.
+    """
+    started = time.monotonic()
+    attempt = 0
+    while True:
+        if breaker is not None:
+            breaker.before_call()
+        try:
+            result = call()
+        except Exception as exc:
+            error = classify(exc)
+            if breaker is not None:
+                # Only outages count against the service; a rejected or rate-limited request means it is up
+                if getattr(error, "retryable", False) and not isinstance(error, GPTRateLimitError):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            wait = _next_delay(error, attempt, policy, started)
+            if wait is None:
+                if error is exc:
+                    raise
+                raise error from exc
+            if on_retry is not None:
+                on_retry(error, attempt, wait)
+            time.sleep(wait)
+            attempt += 1
+            continue
+        if breaker is not None:
+            breaker.record_success()
+        return result
+
+
+async def async_call_with_retry(call, policy: RetryPolicy, breaker: CircuitBreaker = None, on_retry=None):
+    """
+    Async version of call_with_retry (call() returns an awaitable; waits do not block the event loop).
+    """
+    import asyncio
+
+    started = time.monotonic()
+    attempt = 0
+    while True:
+        if breaker is not None:
+            breaker.before_call()
+        try:
+            result = await call()
+        except Exception as exc:
+            error = classify(exc)
+            if breaker is not None:
+                # Only outages count against the service; a rejected or rate-limited request means it is up
+                if getattr(error, "retryable", False) and not isinstance(error, GPTRateLimitError):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            wait = _next_delay(error, attempt, policy, started)
+            if wait is None:
+                if error is exc:
+                    raise
+                raise error from exc
+            if on_retry is not None:
+                on_retry(error, attempt, wait)
+            await asyncio.sleep(wait)
+            attempt += 1
+            continue
+        if breaker is not None:
+            breaker.record_success()
+        return result
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import json
+
+# Container delimiters of the JSON grammar
+OPENERS = {"{", "["}
+CLOSERS = {"}", "]"}
+
+
+class ResultStreamParser:
+    def __init__(self, field: str = "result"):
+        """
+        Incremental parser for JSON answers of the form {"<field>": [item, item, ...]}.
+
+        Text is fed as it arrives (e.g. chat-completion stream deltas); each object or array element
+        of the field's list is returned as soon as its closing bracket has been read.
+
+        :param field: Name of the top-level list to extract
+        """
+        self.field = field
+        self.text = []              # every chunk fed, for the response cache
+        self.items = 0
+        self.started = False        # the field's list has been opened
+        self.complete = False       # ... and closed
+        self._stack = []            # open containers
+        self._in_string = False
+        self._escape = False
+        self._key = None            # last top-level string (candidate key)
+        self._string = None         # characters of a top-level string being read
+        self._list_depth = None     # stack depth inside the field's list
+        self._element = None        # characters of the element being read
+
+    def feed(self, chunk: str) -> list:
+        """
+        Parses the next piece of text and returns the elements completed by it.
+
+        :raises json.JSONDecodeError: If a completed element is not valid JSON
+        """
+        self.text.append(chunk)
+        done = []
+        for c in chunk:
+            if self._element is not None:
+                self._element.append(c)
+
+            # Inside a string: only track its end
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._string is not None:
+                        self._key = "".join(self._string)
+                        self._string = None
+                    continue
+                if self._string is not None:
+                    self._string.append(c)
+                continue
+
+            if c == '"':
+                self._in_string = True
+                # Keys of the top-level object are collected to find the field
+                if len(self._stack) == 1 and self._element is None:
+                    self._string = []
+            elif c in OPENERS:
+                if len(self._stack) == 1 and c == "[" and self._key == self.field and not self.started:
+                    self.started = True
+                    self._list_depth = 2
+                elif self._list_depth is not None and len(self._stack) == self._list_depth and self._element is None:
+                    self._element = [c]
+                self._stack.append(c)
+            elif c in CLOSERS:
+                if self._stack:
+                    self._stack.pop()
+                depth = len(self._stack)
+                if self._element is not None and depth == self._list_depth:
+                    done.append(json.loads("".join(self._element)))
+                    self._element = None
+                    self.items += 1
+                elif self._list_depth is not None and depth == self._list_depth - 1:
+                    self._list_depth = None
+                    self.complete = True
+        return done
+
+    def content(self) -> str:
+        """
+        Returns all the text fed so far.
+        """
+        return "".join(self.text)
+
+
+if __name__ == "__main__":
+    answer = json.dumps({"result": [{"cat": {"en": "cat", "fr": "chat"}}, {"dog": {"en": "dog", "fr": "chien"}}]})
+    parser = ResultStreamParser()
+    for i in range(0, len(answer), 7):
+        for item in parser.feed(answer[i:i+7]):
+            print(f"📦 {item}")
+    print(f"🏁 {parser.items} items, complete: {parser.complete}")
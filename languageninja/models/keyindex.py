@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os, random, threading
+from array import array
+from bisect import bisect_left
+from collections import deque
+from languageninja.common.auxfcn import parse_word_stats
+
+#-------------------#
+# Static parameters #
+#-------------------#
+WORDS_FOLDER_PATH = './data/words'
+WORD_STATS_FILE_PATH = 'resources/sources/list_of_words_with_stats.txt'
+
+#----------------------------#
+# Class definition: KeyIndex #
+#----------------------------#
+# Sorted word keys packed into a single string + offset array, with an optional
+# alias table (Vose) for O(1) frequency-weighted sampling.
+class KeyIndex():
+
+    # Class constructor
+    # - keys: iterable of word keys
+    # - weights: optional {key: weight} dict (missing keys get the smallest weight)
+    # - no_repeat: do not return a key drawn within the last N draws
+    def __init__(self, keys=(), weights=None, no_repeat=0, seed=None):
+
+        # Pack sorted keys into one string; key i lives in blob[offsets[i]:offsets[i+1]]
+        keys = sorted(set(keys))
+        self._blob = ''.join(keys)
+        self._offsets = array('I', [0])
+        for key in keys:
+            self._offsets.append(self._offsets[-1] + len(key))
+        self.n = len(keys)
+
+        # Random generator and no-repeat window (capped so rejection stays O(1) on average)
+        self._rng = random.Random(seed)
+        self.no_repeat = min(no_repeat, self.n // 2)
+        self._recent = deque(maxlen=max(self.no_repeat, 1))
+        self._recent_set = set()
+        self._lock = threading.Lock()
+
+        # Alias table for weighted sampling
+        self._prob = None
+        self._alias = None
+        if weights:
+            self._build_alias([weights.get(key) for key in keys])
+
+    # Method: Build alias table from list of weights (aligned with key positions)
+    def _build_alias(self, weights):
+        n = self.n
+        if n == 0:
+            return
+
+        # Missing/invalid weights default to the smallest known weight
+        known = [w for w in weights if w is not None and w > 0]
+        floor = min(known) if known else 1.0
+        weights = [w if w is not None and w > 0 else floor for w in weights]
+
+        # Scale weights so that the average is 1
+        total = sum(weights)
+        scaled = [w * n / total for w in weights]
+        small = [i for i, w in enumerate(scaled) if w < 1.0]
+        large = [i for i, w in enumerate(scaled) if w >= 1.0]
+
+        # Pair each under-full slot with an over-full one
+        prob = array('d', bytes(8 * n))
+        alias = array('I', bytes(4 * n))
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in small + large:
+            prob[i] = 1.0
+
+        self._prob = prob
+        self._alias = alias
+
+    # Class method: Build index from the JSON files in the words folder (+ optional frequency stats)
+    @classmethod
+    def from_folder(cls, folder=WORDS_FOLDER_PATH, stats_file=WORD_STATS_FILE_PATH, **kwargs):
+        keys = [os.path.splitext(f)[0] for f in os.listdir(folder) if f.endswith('.json')]
+        return cls(keys, weights=KeyIndex.load_weights(stats_file), **kwargs)
+
+    # Static method: Load {word: frequency} from the stats file (None if not available)
+    @staticmethod
+    def load_weights(stats_file=WORD_STATS_FILE_PATH):
+        if not stats_file or not os.path.exists(stats_file):
+            return None
+        weights = {}
+        for rank, freq, word in parse_word_stats(stats_file):
+            # Fall back to Zipf's law (1/rank) when no frequency is given
+            weights.setdefault(word, freq if freq > 0 else 1.0 / rank)
+        return weights
+
+    # Method: Key at position i
+    def key_at(self, i):
+        return self._blob[self._offsets[i]:self._offsets[i + 1]]
+
+    # Method: Position of key (or -1 if not indexed)
+    def position(self, key):
+        i = bisect_left(self, key)
+        return i if i < self.n and self.key_at(i) == key else -1
+
+    # Property: Is weighted sampling available?
+    @property
+    def weighted(self):
+        return self._prob is not None
+
+    # Method: Draw one position (uniform, or alias-weighted)
+    def _draw(self, weighted):
+        i = self._rng.randrange(self.n)
+        if weighted and self._prob is not None and self._rng.random() >= self._prob[i]:
+            i = self._alias[i]
+        return i
+
+    # Method: Draw a random key, honouring the no-repeat window
+    def sample(self, weighted=False):
+        if self.n == 0:
+            return None
+        with self._lock:
+            i = self._draw(weighted)
+            if self.no_repeat:
+                # Weighted draws can keep hitting recent heavy keys: fall back to uniform
+                attempts = 0
+                while i in self._recent_set:
+                    attempts += 1
+                    i = self._draw(weighted and attempts < 16)
+                if len(self._recent) == self._recent.maxlen:
+                    self._recent_set.discard(self._recent[0])
+                self._recent.append(i)
+                self._recent_set.add(i)
+        return self.key_at(i)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.n
+        if not 0 <= i < self.n:
+            raise IndexError(i)
+        return self.key_at(i)
+
+    def __len__(self):
+        return self.n
+
+    def __contains__(self, key):
+        return self.position(key) >= 0
+
+    def __iter__(self):
+        return (self.key_at(i) for i in range(self.n))
+
+#---------------------------------------#
+# Shared index over the repository keys #
+#---------------------------------------#
+_shared_index = None
+_shared_index_version = None
+
+# Get the key index over the words of the configured repository
+# (rebuilt on refresh, or when words were added or removed since it was built)
+def shared_index(refresh=False):
+    global _shared_index, _shared_index_version
+    from languageninja.models.repository import shared_repository
+    repository = shared_repository()
+    version = repository.keys_version()
+    if _shared_index is None or refresh or version != _shared_index_version:
+        _shared_index = KeyIndex(repository.keys(), weights=KeyIndex.load_weights())
+        _shared_index_version = version
+    return _shared_index
+
+#================#
+# Main execution #
+#================#
+if __name__ == "__main__":
+    index = KeyIndex.from_folder(no_repeat=10)
+    print(f"Indexed {len(index)} keys (weighted: {index.weighted})")
+    print([index.sample(weighted=True) for _ in range(10)])
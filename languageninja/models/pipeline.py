@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio, time
+from languageninja.common.auxfcn import parse_word_list_with_stats
+from languageninja.common.ratelimit import TokenBucket
+from languageninja.models.batching import PROMPT_TOKEN_BUDGET, COMPLETION_TOKEN_BUDGET, MAX_BATCH_ITEMS
+from languageninja.models.gptclient import AsyncGPTConnector
+from languageninja.models.gptretry import CircuitOpenError, CIRCUIT_WAIT_MIN, is_fatal
+from languageninja.models.generator import Generator, ai_model
+from languageninja.models.repository import shared_repository
+from languageninja.models.status import CorpusStatus
+
+#-------------------#
+# Static parameters #
+#-------------------#
+CONCURRENCY = 4             # batches in flight
+REQUESTS_PER_SECOND = 1.0   # token bucket refill rate
+BURST = 4                   # token bucket capacity
+
+#--------------------------------------#
+# Class definition: GenerationPipeline #
+#--------------------------------------#
+# Async version of the Generator batch loop: keeps up to `concurrency` batches in flight,
+# paces requests with a token bucket and saves each batch as soon as it completes.
+# Batches are packed to a token budget (see BatchPacker); words missing from an answer are sent again.
+class GenerationPipeline():
+
+    # Class constructor
+    def __init__(self, what='words', max_items=MAX_BATCH_ITEMS, prompt_budget=PROMPT_TOKEN_BUDGET,
+                 completion_budget=COMPLETION_TOKEN_BUDGET, concurrency=CONCURRENCY,
+                 requests_per_second=REQUESTS_PER_SECOND, burst=BURST, connector=None,
+                 dry_run=False, verbose=False):
+        self.what = what
+        self.budget = {"max_items": max_items, "prompt_budget": prompt_budget, "completion_budget": completion_budget}
+        self.packer = None
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate=requests_per_second, capacity=burst)
+        self.connector = connector
+        self.dry_run = dry_run
+        self.verbose = verbose
+
+        # Run statistics
+        self.stats = {"batches": 0, "requests": 0, "generated": 0, "requeued": 0, "dropped": 0,
+                      "failed": 0, "aborted": None, "seconds": 0.0}
+
+    # Method: Build prompt for a batch (runs in a worker thread: reads the repository)
+    def _prepare(self, batch):
+
+        # Sentences need translations to start from
+        if self.what == 'sentences':
+            existing = shared_repository().words_exist(batch)
+            batch = tuple(word_key for word_key in batch if word_key in existing)
+
+        gen = Generator(word_list=batch)
+        words_to_process, prompt = gen.words_prompt() if self.what == 'words' else gen.sentences_prompt()
+        return gen, words_to_process, prompt
+
+    # Method: Store GPT output in the generator and save it (runs in a worker thread)
+    def _save(self, gen, result):
+        if self.what == 'words':
+            gen.word_jsonlist_output = result
+            if not self.dry_run:
+                gen.save_words(verbose=self.verbose)
+        else:
+            gen.sentence_jsonlist_output = result
+            if not self.dry_run:
+                gen.save_sentences(verbose=self.verbose)
+
+    # Method: Process one batch end to end
+    async def _process(self, batch):
+        gen, words_to_process, prompt = await asyncio.to_thread(self._prepare, batch)
+        if prompt is None:
+            return 0
+
+        # Respect the request rate, then send
+        await self.bucket.acquire()
+        print(f"⏳ Processing {self.what} with GPT: {', '.join(gen.word_list)}")
+        out = await self.connector.send_prompt(prompt)
+        self.stats["requests"] += 1
+
+        # Save as soon as the batch is back (well-formed items of requested words only)
+        result = gen.check_output(words_to_process, out)
+        await asyncio.to_thread(self._save, gen, result)
+
+        # Send missing words again in a later batch
+        self.stats["requeued"] += len(self.packer.feedback(words_to_process, gen.answered, gen.truncated))
+        return len(result)
+
+    # Method: Worker coroutine, pulls batches from the packer until it is empty
+    async def _worker(self):
+        while True:
+            batch = self.packer.next_batch()
+            if not batch:
+                return
+            try:
+                n_generated = await self._process(batch)
+                self.stats["generated"] += n_generated
+            except CircuitOpenError as e:
+                # API failing for now: wait for the circuit to close, then send the batch again
+                print(f"⏸️ Circuit open, retrying in {e.retry_in:.0f} s ({', '.join(batch)})")
+                await asyncio.sleep(max(e.retry_in, CIRCUIT_WAIT_MIN))
+                self.packer.requeue(batch)
+                continue
+            except Exception as e:
+                self.stats["failed"] += 1
+                print(f"❌ Batch failed ({', '.join(batch)}): {e}")
+
+                # Hard failure (bad configuration): drop the remaining batches
+                if is_fatal(e):
+                    self.stats["aborted"] = f"{type(e).__name__}: {e}"
+                    self.packer.clear()
+            self.stats["batches"] += 1
+
+    # Method: Words of the list that still need work, from one corpus status snapshot
+    def pending(self, word_list, status=None):
+        status = status or CorpusStatus.snapshot(audio_folder=None)
+        if self.what == 'words':
+            return status.missing(word_list, 'words')
+        return status.missing(status.having(word_list, 'words'), 'sentences')
+
+    # Method: Run the pipeline over a word list (only words that still need work are queued)
+    async def run(self, word_list):
+        t0 = time.perf_counter()
+        word_list = await asyncio.to_thread(self.pending, word_list)
+
+        # Create connector on first run
+        if self.connector is None:
+            self.connector = AsyncGPTConnector(model=ai_model)
+
+        # Queue all words (prompt costs are computed up front: they read the repository),
+        # then let the workers drain the packer
+        self.packer = Generator.packer(word_list, self.what, **self.budget)
+        await asyncio.to_thread(lambda: [self.packer.item_cost(word_key) for word_key in word_list])
+        await asyncio.gather(*(self._worker() for _ in range(self.concurrency)))
+
+        self.stats["dropped"] = len(self.packer.dropped)
+        self.stats["seconds"] = time.perf_counter() - t0
+        return self.stats
+
+    # Method: Blocking helper around run()
+    def run_sync(self, word_list):
+        return asyncio.run(self.run(word_list))
+
+#================#
+# Main execution #
+#================#
+if __name__ == "__main__":
+
+    # What to process? ('words' or 'sentences')
+    what_to_process = 'words'
+
+    # Get list of words to process from file with list of most common words
+    word_list = parse_word_list_with_stats()
+
+    # Run pipeline
+    pipeline = GenerationPipeline(what=what_to_process)
+    stats = pipeline.run_sync(word_list)
+    print(f"🏁 {stats['generated']} {what_to_process} generated in {stats['requests']} requests, "
+          f"{stats['failed']} failed batches, {stats['requeued']} words re-sent, {stats['seconds']:.1f} s")
+    if stats['dropped']:
+        print(f"❌ {stats['dropped']} words given up: {', '.join(pipeline.packer.dropped)}")
+    if stats['aborted']:
+        print(f"🛑 Aborted: {stats['aborted']}")
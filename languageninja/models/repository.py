@@ -0,0 +1,598 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import atexit, json, os, sqlite3, threading
+from contextlib import contextmanager
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+#-------------------#
+# Static parameters #
+#-------------------#
+# Storage backend for words and sentences: 'json' (data/words + data/sentences folders) or 'sqlite'
+REPOSITORY_BACKEND = os.getenv('LANGUAGENINJA_REPOSITORY', 'json')
+REPOSITORY_FILE_PATH = os.getenv('LANGUAGENINJA_REPOSITORY_FILE', './data/corpus.sqlite')
+WORDS_FOLDER_PATH     = './data/words'
+SENTENCES_FOLDER_PATH = './data/sentences'
+
+# SQLite limits the number of host parameters per statement
+SQLITE_CHUNK = 500
+
+# JSON files: compact encoding (no indentation) is ~30% smaller, indented files diff better
+JSON_COMPACT = os.getenv('LANGUAGENINJA_JSON_COMPACT', '0') == '1'
+
+# Journal of bulk JSON writes (next to the words folder by default); applied files are flushed to disk
+# and the journal emptied once it grows past this size, and at exit. Processes sharing the journal
+# take an exclusive lock on <journal>.lock around its use (where fcntl is available)
+JOURNAL_FILE_NAME = 'repository.journal'
+JOURNAL_CHECKPOINT_BYTES = 8 * 2**20
+
+# Raised when a stored JSON file cannot be decoded (instead of reading it as a missing record);
+# single reads and writes refuse the word, bulk reads report the file and skip it
+class CorruptRecordError(ValueError):
+    pass
+
+#-----------------------#
+# Auxiliary functions   #
+#-----------------------#
+
+# Flatten a langs/samples dict into (lang, script, value) rows ('' script for single-script languages)
+def flatten(values):
+    for lang, value in (values or {}).items():
+        if isinstance(value, dict):
+            for script, v in value.items():
+                yield lang, script, v
+        else:
+            yield lang, '', value
+
+# Split a list in chunks
+def chunks(items, size=SQLITE_CHUNK):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i+size]
+
+# (has translations, has sentences, words validated, sentences validated) of a record
+def record_flags(record):
+    return ((record["langs"] or {}).get('fr') is not None, bool((record["samples"] or {}).get('en')),
+            bool(record["words_validated"]), bool(record["sentences_validated"]))
+
+# Empty record returned by read()
+def empty_record():
+    return {"langs": None, "words_validated": False, "samples": None, "sentences_validated": False}
+
+# JSON text of a stored file
+def encode_json(data, compact=False):
+    if compact:
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    return json.dumps(data, ensure_ascii=False, indent=4)
+
+# Flush a directory entry (a rename) to disk, where the platform allows it
+def fsync_dir(folder):
+    try:
+        fd = os.open(folder or '.', os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+# Replace a file atomically: readers see the old or the new content, never a truncated file
+# - sync: flush the content and the rename to disk before returning
+def atomic_write(file_path, text, sync=True):
+    tmp_path = f"{file_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        if sync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, file_path)
+    if sync:
+        fsync_dir(os.path.dirname(file_path))
+
+#--------------------------------#
+# Class definition: WriteJournal #
+#--------------------------------#
+# Append-only log of pending file writes: a batch of records followed by a commit line is flushed with
+# a single fsync, then the files can be written without one. Records of a batch whose commit line is
+# missing (interrupted while logging) are ignored, so a batch is replayed completely or not at all.
+class WriteJournal():
+
+    # Class constructor
+    def __init__(self, path):
+        self.path = path
+        self._lock_depth = 0
+
+    # Method: Exclusive lock on the journal between processes, held around append, replay and clear
+    # (re-entrant for the thread holding it: callers serialise their own threads)
+    @contextmanager
+    def locked(self):
+        if fcntl is None or self._lock_depth:
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+            return
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(f"{self.path}.lock", 'a') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            self._lock_depth = 1
+            try:
+                yield
+            finally:
+                self._lock_depth = 0
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    # Method: Records of every committed batch, in order
+    def records(self):
+        committed, batch = [], []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # torn last line
+                    if "commit" in record:
+                        if record["commit"] == len(batch):
+                            committed += batch
+                        batch = []
+                    else:
+                        batch.append(record)
+        except FileNotFoundError:
+            pass
+        return committed
+
+    # Method: Append a batch of records and its commit line, then flush them to disk
+    def append(self, records):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(encode_json(record, compact=True) + '\n')
+            f.write(encode_json({"commit": len(records)}, compact=True) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    # Method: Size in bytes (0 if there is no journal)
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    # Method: Start over (every logged write has reached its file)
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            return
+        fsync_dir(os.path.dirname(self.path))
+
+#------------------------------#
+# Class definition: Repository #
+#------------------------------#
+# Storage interface for words (translations) and sentences. Records are raw dicts:
+#   {"langs": dict|None, "words_validated": bool, "samples": dict|None, "sentences_validated": bool}
+# Callers merge langs/samples over the Word skeletons.
+class Repository():
+
+    # Method: Record for one word (langs/samples are None when missing)
+    def read(self, key, verbose=False):
+        raise NotImplementedError
+
+    # Method: (key, record) for every word, sorted by key (corrupt records are reported and skipped)
+    def entries(self, verbose=False):
+        for key in self.keys():
+            try:
+                record = self.read(key, verbose=verbose)
+            except CorruptRecordError as e:
+                print(f"❌ Skipped {key}: {e}")
+                continue
+            yield key, record
+
+    # Method: Sorted word keys
+    def keys(self):
+        raise NotImplementedError
+
+    # Method: Token that changes whenever words are added or removed (None: not tracked)
+    def keys_version(self):
+        return None
+
+    # Method: Bulk upsert of translations, items are (key, langs, validated)
+    def write_words(self, items):
+        raise NotImplementedError
+
+    # Method: Bulk upsert of sample sentences, items are (key, samples, validated)
+    def write_sentences(self, items):
+        raise NotImplementedError
+
+    # Method: Subset of keys that already have translations
+    def words_exist(self, keys):
+        return {key for key in keys if (self.read(key)["langs"] or {}).get('fr') is not None}
+
+    # Method: Subset of keys that already have sample sentences
+    def sentences_exist(self, keys):
+        return {key for key in keys if (self.read(key)["samples"] or {}).get('en')}
+
+    # Method: {key: (has translations, has sentences, words validated, sentences validated)} for every word
+    def flags(self):
+        return {key: record_flags(r) for key, r in self.entries()}
+
+#----------------------------------#
+# Class definition: JsonRepository #
+#----------------------------------#
+# One JSON file per word in the words folder and in the sentences folder.
+# Files are replaced atomically (temp file + rename). A single-file write is flushed to disk before the
+# rename; bulk writes are logged to a journal with one fsync, written without any, and flushed together
+# at the next checkpoint. A journal left by a crash is replayed on first use.
+class JsonRepository(Repository):
+
+    # Class constructor
+    # - compact: write JSON without indentation
+    # - journal_path: journal of bulk writes (default: next to the words folder)
+    def __init__(self, words_folder=WORDS_FOLDER_PATH, sentences_folder=SENTENCES_FOLDER_PATH, compact=JSON_COMPACT, journal_path=None):
+        self.words_folder = words_folder
+        self.sentences_folder = sentences_folder
+        self.compact = compact
+        self.journal = WriteJournal(journal_path or os.path.join(os.path.dirname(os.path.normpath(words_folder)), JOURNAL_FILE_NAME))
+        self._recovered = False
+        self._unsynced = set()      # files written since the last checkpoint
+        self._exit_hook = False
+        self._lock = threading.RLock()
+
+    # Static method: Read JSON file and return (payload, validated) for the given key
+    @staticmethod
+    def _read(file_path, key, verbose=False):
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            if verbose:
+                print(f"⚠️ File not found: {file_path}")
+            return None, False
+        except json.JSONDecodeError as e:
+            raise CorruptRecordError(f"Error decoding JSON from file {file_path}: {e}") from e
+        return data.get(key), data.get("validated", False)
+
+    # Static method: Payload of a file for bulk checks (a corrupt file is reported and counts as missing)
+    @staticmethod
+    def _payload(file_path, key):
+        try:
+            return JsonRepository._read(file_path, key)[0]
+        except CorruptRecordError as e:
+            print(f"❌ Skipped {key}: {e}")
+            return None
+
+    # Method: File of a word in the 'words' or 'sentences' folder
+    def _path(self, kind, key):
+        return os.path.join(self.words_folder if kind == 'words' else self.sentences_folder, f"{key}.json")
+
+    # Method: Write {key: payload, "validated": validated} to the word's file
+    def _write(self, kind, key, payload, validated, sync=True):
+        atomic_write(self._path(kind, key), encode_json({key: payload, "validated": validated}, self.compact), sync=sync)
+
+    # Method: Replay the journal of an interrupted run (once, before the files are used)
+    # The locks are only taken on first use, and only if there is a journal to replay
+    def recover(self):
+        if self._recovered:
+            return
+        if not self.journal.size():
+            self._recovered = True
+            return
+        with self._lock, self.journal.locked():
+            if self._recovered:
+                return
+            records = self.journal.records()
+            for record in records:
+                self._write(record["kind"], record["key"], record["payload"], record["validated"], sync=False)
+                self._unsynced.add(self._path(record["kind"], record["key"]))
+            if records:
+                print(f"♻️ Replayed {len(records)} journaled writes from {self.journal.path}")
+            if self.journal.size():
+                self.checkpoint()
+            self._recovered = True
+
+    # Method: Flush the files written since the last checkpoint to disk, then empty the journal
+    # (including files journaled by other processes, whose batches are cleared too)
+    def checkpoint(self):
+        with self._lock, self.journal.locked():
+            if not self._unsynced and not self.journal.size():
+                return
+            paths = self._unsynced | {self._path(record["kind"], record["key"]) for record in self.journal.records()}
+            for path in paths:
+                try:
+                    with open(path, 'rb+') as f:
+                        os.fsync(f.fileno())
+                except FileNotFoundError:
+                    pass
+            for folder in {os.path.dirname(path) for path in paths}:
+                fsync_dir(folder)
+            self._unsynced.clear()
+            self.journal.clear()
+
+    # Method: Write files of one kind, items are (key, payload, validated)
+    # One file with nothing pending (in any process) is written directly; anything else goes through the
+    # journal (also single files then, so a replay never overwrites a newer write).
+    def _commit(self, kind, items):
+        items = list(items)
+        if not items:
+            return
+        self.recover()
+        with self._lock, self.journal.locked():
+            if len(items) == 1 and not self._unsynced and not self.journal.size():
+                self._write(kind, *items[0])
+                return
+            self.journal.append([{"kind": kind, "key": key, "payload": payload, "validated": validated} for key, payload, validated in items])
+            for key, payload, validated in items:
+                self._write(kind, key, payload, validated, sync=False)
+                self._unsynced.add(self._path(kind, key))
+            if not self._exit_hook:
+                atexit.register(self.checkpoint)
+                self._exit_hook = True
+            if self.journal.size() > JOURNAL_CHECKPOINT_BYTES:
+                self.checkpoint()
+
+    def read(self, key, verbose=False):
+        self.recover()
+        langs, words_validated = JsonRepository._read(os.path.join(self.words_folder, f"{key}.json"), key, verbose)
+        samples, sentences_validated = JsonRepository._read(os.path.join(self.sentences_folder, f"{key}.json"), key, verbose)
+        return {"langs": langs, "words_validated": words_validated, "samples": samples, "sentences_validated": sentences_validated}
+
+    def keys(self):
+        self.recover()
+        return sorted(os.path.splitext(f)[0] for f in os.listdir(self.words_folder) if f.endswith('.json'))
+
+    # Adding or removing a file changes the folder's modification time
+    def keys_version(self):
+        try:
+            return os.stat(self.words_folder).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def write_words(self, items):
+        self._commit('words', items)
+
+    def write_sentences(self, items):
+        self._commit('sentences', items)
+
+    # Existence checks only need the relevant file
+    def words_exist(self, keys):
+        self.recover()
+        found = set()
+        for key in keys:
+            path = os.path.join(self.words_folder, f"{key}.json")
+            if os.path.exists(path) and (JsonRepository._payload(path, key) or {}).get('fr') is not None:
+                found.add(key)
+        return found
+
+    def sentences_exist(self, keys):
+        self.recover()
+        found = set()
+        for key in keys:
+            path = os.path.join(self.sentences_folder, f"{key}.json")
+            if os.path.exists(path) and (JsonRepository._payload(path, key) or {}).get('en'):
+                found.add(key)
+        return found
+
+#------------------------------------#
+# Class definition: SqliteRepository #
+#------------------------------------#
+# Words, per-language translations and sentences in indexed SQLite tables:
+# - words(key, words_validated, sentences_validated)
+# - translations(key, lang, script, text)       -- script is '' except for ru (cyr/lat) and il (heb/lat)
+# - sentences(key, lang, script, idx, text)
+class SqliteRepository(Repository):
+
+    # Class constructor
+    def __init__(self, db_path=REPOSITORY_FILE_PATH):
+        self.db_path = db_path
+        self._db = None
+        self._lock = threading.Lock()
+
+    # Method: Open the database (tables are created on first use)
+    def connect(self):
+        if self._db is None:
+            if os.path.dirname(self.db_path):
+                os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            db = sqlite3.connect(self.db_path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS words (
+                    key TEXT PRIMARY KEY,
+                    words_validated INTEGER NOT NULL DEFAULT 0,
+                    sentences_validated INTEGER NOT NULL DEFAULT 0
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS translations (
+                    key TEXT NOT NULL, lang TEXT NOT NULL, script TEXT NOT NULL DEFAULT '', text TEXT,
+                    PRIMARY KEY (key, lang, script)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS translations_by_lang ON translations (lang, script, key);
+                CREATE TABLE IF NOT EXISTS sentences (
+                    key TEXT NOT NULL, lang TEXT NOT NULL, script TEXT NOT NULL DEFAULT '', idx INTEGER NOT NULL, text TEXT,
+                    PRIMARY KEY (key, lang, script, idx)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS sentences_by_lang ON sentences (lang, script, key);
+            """)
+            self._db = db
+        return self._db
+
+    # Method: Close the database
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    # Static method: Rebuild nested dicts from (key, lang, script, value) rows
+    @staticmethod
+    def _nest(rows, as_list=False):
+        out = {}
+        for key, lang, script, *value in rows:
+            values = out.setdefault(key, {})
+            if script:
+                target = values.setdefault(lang, {})
+                name = script
+            else:
+                target, name = values, lang
+            if as_list:
+                target.setdefault(name, []).append(value[-1])
+            else:
+                target[name] = value[-1]
+        return out
+
+    # Method: Records for the given keys (all words if None), two indexed queries per chunk
+    def _records(self, keys=None):
+        db = self.connect()
+        with self._lock:
+            if keys is None:
+                flags = db.execute("SELECT key, words_validated, sentences_validated FROM words").fetchall()
+                langs = db.execute("SELECT key, lang, script, text FROM translations ORDER BY key, lang, script").fetchall()
+                samples = db.execute("SELECT key, lang, script, idx, text FROM sentences ORDER BY key, lang, script, idx").fetchall()
+            else:
+                flags, langs, samples = [], [], []
+                for part in chunks(keys):
+                    marks = ','.join('?' * len(part))
+                    flags += db.execute(f"SELECT key, words_validated, sentences_validated FROM words WHERE key IN ({marks})", part).fetchall()
+                    langs += db.execute(f"SELECT key, lang, script, text FROM translations WHERE key IN ({marks}) ORDER BY key, lang, script", part).fetchall()
+                    samples += db.execute(f"SELECT key, lang, script, idx, text FROM sentences WHERE key IN ({marks}) ORDER BY key, lang, script, idx", part).fetchall()
+        langs = SqliteRepository._nest(langs)
+        samples = SqliteRepository._nest(samples, as_list=True)
+        records = {}
+        for key, words_validated, sentences_validated in flags:
+            records[key] = {
+                "langs": langs.get(key), "words_validated": bool(words_validated),
+                "samples": samples.get(key), "sentences_validated": bool(sentences_validated),
+            }
+        return records
+
+    def read(self, key, verbose=False):
+        record = self._records([key]).get(key)
+        if record is None:
+            if verbose:
+                print(f"⚠️ Word not found in {self.db_path}: {key}")
+            return empty_record()
+        return record
+
+    def entries(self, verbose=False):
+        records = self._records()
+        for key in sorted(records):
+            yield key, records[key]
+
+    def keys(self):
+        with self._lock:
+            return [key for (key,) in self.connect().execute("SELECT key FROM words ORDER BY key")]
+
+    # Word count and size of the keys (a cheap scan of the primary key)
+    def keys_version(self):
+        with self._lock:
+            return tuple(self.connect().execute("SELECT COUNT(*), TOTAL(LENGTH(key)) FROM words").fetchone())
+
+    # Method: Bulk upsert (one transaction): replace the rows of each key in the given table
+    def _write(self, items, table, flag):
+        items = list(items)
+        if not items:
+            return
+        db = self.connect()
+        with self._lock, db:
+            db.executemany(
+                f"INSERT INTO words (key, {flag}) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET {flag} = excluded.{flag}",
+                [(key, int(bool(validated))) for key, _, validated in items])
+            for part in chunks([key for key, _, _ in items]):
+                db.execute(f"DELETE FROM {table} WHERE key IN ({','.join('?' * len(part))})", part)
+            if table == 'translations':
+                rows = [(key, lang, script, text) for key, langs, _ in items for lang, script, text in flatten(langs)]
+                db.executemany("INSERT INTO translations (key, lang, script, text) VALUES (?, ?, ?, ?)", rows)
+            else:
+                rows = [(key, lang, script, idx, text)
+                        for key, samples, _ in items for lang, script, texts in flatten(samples) for idx, text in enumerate(texts or [])]
+                db.executemany("INSERT INTO sentences (key, lang, script, idx, text) VALUES (?, ?, ?, ?, ?)", rows)
+
+    def write_words(self, items):
+        self._write(items, 'translations', 'words_validated')
+
+    def write_sentences(self, items):
+        self._write(items, 'sentences', 'sentences_validated')
+
+    # Method: Keys matching an existence query, chunked over the key list
+    def _existing(self, query, keys):
+        found = set()
+        db = self.connect()
+        with self._lock:
+            for part in chunks(keys):
+                found.update(key for (key,) in db.execute(query.format(marks=','.join('?' * len(part))), part))
+        return found
+
+    def words_exist(self, keys):
+        return self._existing(
+            "SELECT key FROM translations WHERE lang = 'fr' AND script = '' AND text IS NOT NULL AND key IN ({marks})", keys)
+
+    def sentences_exist(self, keys):
+        return self._existing(
+            "SELECT DISTINCT key FROM sentences WHERE lang = 'en' AND script = '' AND key IN ({marks})", keys)
+
+    # Single query over the words table (existence subqueries use the primary keys)
+    def flags(self):
+        db = self.connect()
+        with self._lock:
+            rows = db.execute(
+                "SELECT w.key,"
+                " EXISTS (SELECT 1 FROM translations t WHERE t.key = w.key AND t.lang = 'fr' AND t.script = '' AND t.text IS NOT NULL),"
+                " EXISTS (SELECT 1 FROM sentences s WHERE s.key = w.key AND s.lang = 'en' AND s.script = ''),"
+                " w.words_validated, w.sentences_validated FROM words w").fetchall()
+        return {key: tuple(bool(v) for v in values) for key, *values in rows}
+
+#------------------------------------#
+# Function: Migrate between backends #
+#------------------------------------#
+# One-shot copy of every word and sentence record (e.g. JSON folders -> SQLite)
+def migrate(source, target, verbose=False):
+    words, sentences = [], []
+    for key, record in source.entries(verbose=verbose):
+        if record["langs"] is not None:
+            words.append((key, record["langs"], record["words_validated"]))
+        if record["samples"] is not None:
+            sentences.append((key, record["samples"], record["sentences_validated"]))
+    target.write_words(words)
+    target.write_sentences(sentences)
+    if verbose:
+        print(f"🚚 Migrated {len(words)} words and {len(sentences)} sentence sets.")
+    return len(words), len(sentences)
+
+#----------------------#
+# Repository selection #
+#----------------------#
+
+# Repository for the configured backend (JSON repositories can point at other folders)
+def open_repository(backend=None, words_folder=WORDS_FOLDER_PATH, sentences_folder=SENTENCES_FOLDER_PATH):
+    backend = backend or REPOSITORY_BACKEND
+    if backend == 'sqlite':
+        return shared_repository() if REPOSITORY_BACKEND == 'sqlite' else SqliteRepository()
+    if backend == 'json':
+        return JsonRepository(words_folder, sentences_folder)
+    raise ValueError(f"Unknown repository backend: {backend}")
+
+_shared_repository = None
+
+# Get (and open once) the configured repository
+def shared_repository():
+    global _shared_repository
+    if _shared_repository is None:
+        _shared_repository = SqliteRepository() if REPOSITORY_BACKEND == 'sqlite' else JsonRepository()
+    return _shared_repository
+
+#================#
+# Main execution #
+#================#
+# Example: python -m languageninja.models.repository data/corpus.sqlite
+if __name__ == "__main__":
+    import sys, time
+    t0 = time.perf_counter()
+    target = SqliteRepository(sys.argv[1] if len(sys.argv) > 1 else REPOSITORY_FILE_PATH)
+    migrate(JsonRepository(), target, verbose=True)
+    print(f"⏱️ Migrated to {target.db_path} in {time.perf_counter()-t0:.2f} s")
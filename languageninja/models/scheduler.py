@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os, random, sqlite3, threading, time
+from languageninja.models.vocabulary import vocabulary
+from languageninja.models.word import LANGS
+
+#-------------------#
+# Static parameters #
+#-------------------#
+REVIEWS_FILE_PATH = os.getenv('LANGUAGENINJA_REVIEWS', './data/reviews.sqlite')
+DAY = 86400.0
+
+# SM-2 parameters
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+RELEARN_INTERVAL = 600.0       # seconds before a failed card comes back
+PASS_GRADE = 3                 # grades 0..5, below this the card is relearned
+
+#--------------------------------#
+# Function: SM-2 review schedule #
+#--------------------------------#
+# Returns (interval in seconds, ease, reps, lapses) after a review graded 0..5
+def sm2(interval, ease, reps, lapses, grade):
+    if grade < PASS_GRADE:
+        return RELEARN_INTERVAL, max(MIN_EASE, ease - 0.2), 0, lapses + 1
+    ease = max(MIN_EASE, ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+    reps += 1
+    if reps == 1:
+        interval = DAY
+    elif reps == 2:
+        interval = 6 * DAY
+    else:
+        interval = max(interval, DAY) * ease
+    return interval, ease, reps, lapses
+
+#-----------------------------------#
+# Class definition: ReviewScheduler #
+#-----------------------------------#
+# Spaced-repetition scheduler (SM-2). Review state lives in SQLite only, one row per (user, word, lang),
+# and every request queries it (the earliest due card is one lookup on the (user, lang, due) index):
+# API workers share the database file, so a review recorded by one worker is seen by all of them.
+class ReviewScheduler():
+
+    # Class constructor
+    def __init__(self, db_path=REVIEWS_FILE_PATH, store=vocabulary, seed=None):
+        self.db_path = db_path
+        self.store = store
+        self._db = None
+        self._rng = random.Random(seed)     # own generator: new cards do not move /api/random's no-repeat window
+        self._lock = threading.RLock()
+
+    # Method: Open the database (created on first use)
+    def connect(self):
+        if self._db is None:
+            if os.path.dirname(self.db_path):
+                os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            # Autocommit mode: review() opens its own write transaction
+            db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS reviews ("
+                " user TEXT NOT NULL, key TEXT NOT NULL, lang TEXT NOT NULL,"
+                " due REAL NOT NULL, interval REAL NOT NULL, ease REAL NOT NULL,"
+                " reps INTEGER NOT NULL, lapses INTEGER NOT NULL,"
+                " PRIMARY KEY (user, key, lang)) WITHOUT ROWID"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS reviews_due ON reviews (user, lang, due)")
+            self._db = db
+        return self._db
+
+    # Method: Close the database
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    # Method: Earliest due card of a user in a lang, as a row (None if the user has no card in that lang)
+    # Cards of words no longer in the vocabulary are skipped.
+    def earliest(self, user, lang):
+        keys = self.store.keys()
+        rows = self.connect().execute(
+            "SELECT key, due, interval, ease, reps, lapses FROM reviews WHERE user = ? AND lang = ? ORDER BY due",
+            (user, lang))
+        for row in rows:
+            if row[0] in keys:
+                return row
+        return None
+
+    # Method: A word the user has not seen yet in this lang (None once every word was seen)
+    def new_key(self, user, lang, attempts=32):
+        keys = self.store.keys()
+        if len(keys) == 0:
+            return None
+        db = self.connect()
+        seen = "SELECT 1 FROM reviews WHERE user = ? AND key = ? AND lang = ?"
+        for _ in range(attempts):
+            key = keys[self._rng.randrange(len(keys))]
+            if db.execute(seen, (user, key, lang)).fetchone() is None:
+                return key
+        reviewed = {key for (key,) in db.execute("SELECT key FROM reviews WHERE user = ? AND lang = ?", (user, lang))}
+        return next((key for key in keys if key not in reviewed), None)
+
+    # Method: Next card to study in a lang: the earliest due card, else a new word, else the earliest upcoming card
+    def next(self, user, lang, now=None):
+        if lang not in LANGS:
+            raise ValueError(f"Unknown lang: {lang}")
+        now = time.time() if now is None else now
+        self.store.ensure_loaded()
+        with self._lock:
+            row = self.earliest(user, lang)
+            if row is not None and row[1] <= now:
+                return self.card(lang, row, now)
+            key = self.new_key(user, lang)
+            if key is not None:
+                return {"key": key, "lang": lang, "new": True, "due": now, "interval": 0.0,
+                        "ease": INITIAL_EASE, "reps": 0, "lapses": 0}
+            return None if row is None else self.card(lang, row, now)
+
+    # Method: Card dict for a (key, due, interval, ease, reps, lapses) row
+    @staticmethod
+    def card(lang, row, now):
+        key, due, interval, ease, reps, lapses = row
+        return {"key": key, "lang": lang, "new": False, "overdue": max(0.0, now - due),
+                "due": due, "interval": interval, "ease": round(ease, 3), "reps": reps, "lapses": lapses}
+
+    # Method: Record a review (grade 0..5) and reschedule the card
+    def review(self, user, key, lang, grade, now=None):
+        if not 0 <= grade <= 5:
+            raise ValueError(f"Grade must be between 0 and 5: {grade}")
+        now = time.time() if now is None else now
+        self.store.ensure_loaded()
+        if key not in self.store.keys() or lang not in LANGS:
+            raise KeyError(f"Unknown card: {key}/{lang}")
+        with self._lock:
+            db = self.connect()
+            # Read and write in one transaction, so reviews of the same card from other workers are not lost
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                state = db.execute(
+                    "SELECT interval, ease, reps, lapses FROM reviews WHERE user = ? AND key = ? AND lang = ?",
+                    (user, key, lang)).fetchone() or (0.0, INITIAL_EASE, 0, 0)
+                interval, ease, reps, lapses = sm2(*state, grade)
+                db.execute(
+                    "INSERT OR REPLACE INTO reviews (user, key, lang, due, interval, ease, reps, lapses) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (user, key, lang, now + interval, interval, ease, reps, lapses))
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            return self.card(lang, (key, now + interval, interval, ease, reps, lapses), now)
+
+#---------------------------#
+# Shared scheduler instance #
+#---------------------------#
+scheduler = ReviewScheduler()
+
+#================#
+# Main execution #
+#================#
+if __name__ == "__main__":
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        demo = ReviewScheduler(db_path=os.path.join(tmp, "reviews.sqlite"))
+        now = time.time()
+        for step in range(20):
+            card = demo.next("demo", "fr", now=now)
+            grade = random.choice([2, 3, 4, 5])
+            result = demo.review("demo", card["key"], "fr", grade, now=now)
+            print(f"🗂️ {card['key']:>12} (new={card['new']}) graded {grade} -> next in {result['interval'] / 3600:.1f} h")
+            now += 300
+        demo.close()
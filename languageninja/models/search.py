@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import re, threading, unicodedata
+from bisect import bisect_left
+from languageninja.models.vocabulary import vocabulary
+
+#-------------------#
+# Static parameters #
+#-------------------#
+SEARCH_LIMIT = 20
+PREFIX_EXPANSION_LIMIT = 64    # max sentence terms a trailing prefix expands to
+TOKEN_RE = re.compile(r"\w+")
+
+# Normalize text for matching: case-folded, without diacritics (accents, niqqud, breve, ...)
+def normalize(text):
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold().strip()
+
+# Split normalized text into terms
+def tokenize(text):
+    return TOKEN_RE.findall(text)
+
+# Auxiliary function: (lang, script, text) for every script of a field (ru/il have cyr|heb + lat)
+def scripts(values):
+    for lang, value in (values or {}).items():
+        if isinstance(value, dict):
+            for script, text in value.items():
+                yield lang, script, text
+        else:
+            yield lang, None, value
+
+#-------------------------------#
+# Class definition: SearchIndex #
+#-------------------------------#
+# In-memory search over the vocabulary, in every language and script:
+# - words: sorted array of normalized translations (full phrase and single terms) for exact/prefix lookup
+# - sentences: inverted index term -> sentence ids
+class SearchIndex():
+
+    # Class constructor
+    def __init__(self, store=vocabulary):
+        self.store = store
+        self.version = None
+        self._lock = threading.Lock()
+        self._word_terms = []      # sorted normalized terms
+        self._word_hits = []       # hits for each term: [(key, lang, script, text), ...]
+        self._sentences = []       # sentence id -> (key, lang, script, index, text)
+        self._postings = {}        # term -> sentence ids (ascending)
+        self._sentence_terms = []  # sorted terms of the inverted index (prefix expansion)
+
+    # Method: Build the index from the vocabulary
+    def build(self):
+        self.store.ensure_loaded()
+        version = self.store.version
+        words, sentences, postings = {}, [], {}
+        for key in self.store.keys():
+            entry = self.store.get(key)
+            if entry is None:
+                continue
+
+            for lang, script, text in scripts(entry.get("langs")):
+                if not isinstance(text, str) or not text:
+                    continue
+                norm = normalize(text)
+                hit = (key, lang, script, text)
+                for term in {norm, *tokenize(norm)}:
+                    words.setdefault(term, []).append(hit)
+
+            for lang, script, texts in scripts(entry.get("samples")):
+                for i, text in enumerate(texts or []):
+                    if not isinstance(text, str) or not text:
+                        continue
+                    sentence_id = len(sentences)
+                    sentences.append((key, lang, script, i, text))
+                    for term in set(tokenize(normalize(text))):
+                        postings.setdefault(term, []).append(sentence_id)
+
+        word_terms = sorted(words)
+        with self._lock:
+            self._word_terms = word_terms
+            self._word_hits = [words[t] for t in word_terms]
+            self._sentences = sentences
+            self._postings = postings
+            self._sentence_terms = sorted(postings)
+            self.version = version
+        return self
+
+    # Method: Rebuild if the vocabulary was reloaded since the last build
+    def ensure_current(self):
+        if self.version is None or self.version != self.store.version:
+            self.build()
+
+    # Method: Word hits whose term starts with the prefix (exact matches first, then shortest terms)
+    def match_words(self, prefix):
+        terms, hits = self._word_terms, self._word_hits
+        i = bisect_left(terms, prefix)
+        found = []
+        while i < len(terms) and terms[i].startswith(prefix):
+            found.append((terms[i] != prefix, len(terms[i]), terms[i], hits[i]))
+            i += 1
+        found.sort(key=lambda f: f[:3])
+        return [hit for *_, term_hits in found for hit in term_hits]
+
+    # Method: Sentence ids containing all terms (the last term as a prefix)
+    def match_sentences(self, terms):
+        if not terms:
+            return []
+        *exact, last = terms
+        sets = []
+        for term in exact:
+            ids = self._postings.get(term)
+            if not ids:
+                return []
+            sets.append(ids)
+
+        # Trailing term: union of the postings of every term it prefixes
+        expanded = set(self._postings.get(last, ()))
+        i = bisect_left(self._sentence_terms, last)
+        n = 0
+        while i < len(self._sentence_terms) and self._sentence_terms[i].startswith(last) and n < PREFIX_EXPANSION_LIMIT:
+            expanded.update(self._postings[self._sentence_terms[i]])
+            i += 1
+            n += 1
+        if not expanded:
+            return []
+
+        # Intersect starting from the rarest term
+        result = expanded
+        for ids in sorted(sets, key=len):
+            result = result.intersection(ids)
+            if not result:
+                return []
+        return sorted(result)
+
+    # Method: Search words and sentences (diacritic- and case-insensitive), words ranked first
+    def search(self, query, limit=SEARCH_LIMIT, lang=None):
+        self.ensure_current()
+        norm = normalize(query or "")
+        if not norm:
+            return []
+
+        results, seen = [], set()
+
+        for key, hit_lang, script, text in self.match_words(norm):
+            if lang and hit_lang != lang:
+                continue
+            if (key, hit_lang, script, None) in seen:
+                continue
+            seen.add((key, hit_lang, script, None))
+            results.append({"key": key, "lang": hit_lang, "script": script, "field": "word", "text": text})
+            if len(results) >= limit:
+                return results
+
+        for sentence_id in self.match_sentences(tokenize(norm)):
+            key, hit_lang, script, i, text = self._sentences[sentence_id]
+            if lang and hit_lang != lang:
+                continue
+            results.append({"key": key, "lang": hit_lang, "script": script, "field": "sentence", "sentence": i, "text": text})
+            if len(results) >= limit:
+                break
+        return results
+
+#------------------------#
+# Shared index instance  #
+#------------------------#
+search_index = SearchIndex()
+
+#================#
+# Main execution #
+#================#
+if __name__ == "__main__":
+    import sys, time
+    t0 = time.perf_counter()
+    search_index.build()
+    print(f"🔎 Indexed {len(search_index._word_terms)} word terms and {len(search_index._sentences)} sentences in {1000*(time.perf_counter()-t0):.1f} ms")
+    for query in sys.argv[1:] or ["chien", "собака", "kelev"]:
+        t0 = time.perf_counter()
+        results = search_index.search(query)
+        print(f"{query!r}: {len(results)} results in {1000*(time.perf_counter()-t0):.3f} ms")
+        for r in results[:5]:
+            print(f"   {r['key']} [{r['lang']}{'/' + r['script'] if r['script'] else ''}] {r['field']}: {r['text']}")
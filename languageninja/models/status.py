@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+from languageninja.audio.manifest import AudioManifest
+from languageninja.models.repository import shared_repository, record_flags
+from languageninja.models.word import AUDIO_FOLDER_PATH
+
+#-------------------#
+# Static parameters #
+#-------------------#
+# What a snapshot can answer for a key
+STATUS_FIELDS = ('words', 'sentences', 'words_validated', 'sentences_validated', 'audio')
+
+#--------------------------------#
+# Class definition: CorpusStatus #
+#--------------------------------#
+# Snapshot of which words have translations / sentences / validation / audio, taken with one pass
+# over the repository (a single query with SQLite when audio is not needed).
+# A word has audio when every clip planned for it (see audio/engine.py) is recorded in the audio
+# manifest, or, for trees rendered before the manifest existed, is on disk.
+# Answers "which of these N keys ..." with set lookups instead of loading a Word per key.
+class CorpusStatus():
+
+    # Class constructor
+    def __init__(self, flags=None, audio=()):
+        flags = flags or {}
+        self.keys = set(flags)
+        self.sets = {
+            'words': {key for key, f in flags.items() if f[0]},
+            'sentences': {key for key, f in flags.items() if f[1]},
+            'words_validated': {key for key, f in flags.items() if f[2]},
+            'sentences_validated': {key for key, f in flags.items() if f[3]},
+            'audio': set(audio),
+        }
+
+    # Class method: Take a snapshot of the repository and audio folder (no audio status if audio_folder is None)
+    @classmethod
+    def snapshot(cls, repository=None, audio_folder=AUDIO_FOLDER_PATH):
+        repository = repository or shared_repository()
+        if audio_folder is None or not os.path.isdir(audio_folder):
+            return cls(repository.flags())
+
+        # Expected clips need the texts: flags and audio come from the same pass
+        from languageninja.audio.engine import plan_jobs
+        manifest = AudioManifest(audio_folder).load()
+        rendered = set(manifest.clips) or {manifest.relpath(path) for path in manifest.untracked()}
+        flags, audio = {}, []
+        for key, record in repository.entries():
+            flags[key] = record_flags(record)
+            entry = {"key": key, "langs": record["langs"] or {}, "samples": record["samples"] or {}}
+            clips = [manifest.relpath(job.out_path) for job in plan_jobs([entry], folder=audio_folder)]
+            if clips and all(clip in rendered for clip in clips):
+                audio.append(key)
+        return cls(flags, audio)
+
+    # Method: Keys (in the given order) that have / do not have the given field
+    def having(self, keys, what='words'):
+        done = self.sets[what]
+        return [key for key in keys if key in done]
+
+    def missing(self, keys, what='words'):
+        done = self.sets[what]
+        return [key for key in keys if key not in done]
+
+    # Method: Split keys into (missing, having) for the given field
+    def partition(self, keys, what='words'):
+        done = self.sets[what]
+        todo, have = [], []
+        for key in keys:
+            (have if key in done else todo).append(key)
+        return todo, have
+
+    # Method: Record that keys now have the given field (keeps a long-running driver's snapshot current)
+    def mark(self, keys, what='words'):
+        self.sets[what].update(keys)
+        self.keys.update(keys)
+
+    # Method: Number of keys per field (over the given keys, all known words by default)
+    def summary(self, keys=None):
+        keys = self.keys if keys is None else set(keys)
+        return {"total": len(keys), **{what: len(keys & self.sets[what]) for what in STATUS_FIELDS}}
+
+#================#
+# Main execution #
+#================#
+if __name__ == "__main__":
+    import time
+    t0 = time.perf_counter()
+    status = CorpusStatus.snapshot()
+    print(f"📊 Snapshot in {1000*(time.perf_counter()-t0):.1f} ms: {status.summary()}")
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import argparse, asyncio, hashlib, json, os, time
+from languageninja.common.ratelimit import TokenBucket
+from languageninja.models.gptclient import AsyncGPTConnector
+from languageninja.models.gptretry import CircuitOpenError, CIRCUIT_WAIT_MIN, is_fatal
+from languageninja.models.status import CorpusStatus
+from languageninja.models.vocabulary import VocabularyStore
+from languageninja.models.word import ai_model
+
+#-------------------#
+# Static parameters #
+#-------------------#
+BATCH_SIZE = 10             # words per prompt
+CONCURRENCY = 4             # prompts in flight
+REQUESTS_PER_SECOND = 1.0   # token bucket refill rate
+BURST = 4                   # token bucket capacity
+JOURNAL_FILE_PATH = './data/validation_journal.jsonl'
+
+# Batch validation prompts (one JSON object {word: translations or sentences} per prompt)
+VALIDATION_PROMPT_MARKER = "Here's your JSON object of words to validate:"
+
+gpt_prompt_validate_words = """
+The following is a JSON object mapping words to their translations in multiple languages.
+Validate the translations of each word for accuracy and completeness.
+Respond with a JSON object with a single field "result": an object with one entry per word, each entry being
+an object with a boolean field "validated" set to true if all translations of that word are correct, or false otherwise.
+If false, include a "corrections" field with suggested corrections for each language that is incorrect.
+Consider that the provided input was generated by your model, so don't overcorrect minor issues.
+"""
+
+gpt_prompt_validate_sentences = """
+The following is a JSON object mapping words to translations of their sample sentences in multiple languages.
+For each word, validate the following: (1) the translations for accuracy and completeness; (2) the ordering of the translated sentences.
+Make sure that sentence A in position n in the 'en' field is also in position n in the other language fields, 'es', 'fr', etc.
+Respond with a JSON object with a single field "result": an object with one entry per word, each entry being
+an object with a boolean field "validated" set to true if all sentences of that word are correctly translated and ordered, or false otherwise.
+If false, include a "corrections" field with suggested corrections for each language that is incorrect.
+Consider that the provided input was generated by your model, so don't overcorrect minor issues.
+"""
+
+# Digest of the content a word was validated with (its translations or sentences)
+def content_digest(value):
+    data = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.blake2b(data.encode('utf-8'), digest_size=8).hexdigest()
+
+#-------------------------------------#
+# Class definition: ValidationJournal #
+#-------------------------------------#
+# Append-only JSONL checkpoint: one line per validated (or rejected) word, flushed after every batch.
+# Each line records the digest of the content that was checked: when an interrupted run is restarted,
+# words are skipped only if their content is unchanged (a corrected or regenerated word is checked again).
+# The journal is rotated once a run has gone through all its batches without a failure.
+class ValidationJournal():
+
+    # Class constructor
+    def __init__(self, path=JOURNAL_FILE_PATH):
+        self.path = path
+
+    # Method: {key: content digests} already checked for the given field ('word' or 'sentences')
+    def done(self, what):
+        digests = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn last line of an interrupted run
+                    if record.get("what") == what:
+                        digests.setdefault(record["key"], set()).add(record.get("digest"))
+        except FileNotFoundError:
+            pass
+        return digests
+
+    # Method: Append records and flush them to disk
+    def append(self, records):
+        if not records:
+            return
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    # Method: Keep the journal of a completed run as <path>.prev and start the next run empty
+    def rotate(self):
+        try:
+            os.replace(self.path, f"{self.path}.prev")
+        except FileNotFoundError:
+            pass
+
+    # Method: Start over
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+#------------------------------------#
+# Class definition: ValidationRunner #
+#------------------------------------#
+# Validates many words per prompt, with up to `concurrency` prompts in flight (paced by a token bucket).
+# Validated flags are saved per batch (one bulk repository write) and every result goes to the journal.
+class ValidationRunner():
+
+    # Class constructor
+    # - what: 'word' (translations) or 'sentences'
+    def __init__(self, what='sentences', batch_size=BATCH_SIZE, concurrency=CONCURRENCY,
+                 requests_per_second=REQUESTS_PER_SECOND, burst=BURST, connector=None,
+                 journal_path=JOURNAL_FILE_PATH, store=None, dry_run=False, verbose=False):
+        if what not in ('word', 'sentences'):
+            raise ValueError(f"Unknown validation target: {what}")
+        self.what = what
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate=requests_per_second, capacity=burst)
+        self.connector = connector
+        self.journal = ValidationJournal(journal_path)
+        self.store = store or VocabularyStore(corpus_file=None)
+        self.dry_run = dry_run
+        self.verbose = verbose
+
+        # Run statistics
+        self.stats = {"batches": 0, "requests": 0, "words": 0, "validated": 0, "rejected": 0, "missing": 0,
+                      "failed": 0, "aborted": None, "prompt_tokens": 0, "completion_tokens": 0, "seconds": 0.0}
+
+    # Method: Words that still need validation (not validated yet, not in the journal)
+    def pending(self, keys=None):
+        self.store.ensure_loaded()
+        status = CorpusStatus.snapshot(repository=self.store.repository, audio_folder=None)
+        flag = 'words_validated' if self.what == 'word' else 'sentences_validated'
+        source = 'words' if self.what == 'word' else 'sentences'
+        done = self.journal.done(self.what)
+        keys = sorted(self.store.keys()) if keys is None else keys
+        return [key for key in status.missing(status.having(keys, source), flag)
+                if self.digest(key) not in done.get(key, ())]
+
+    # Method: Digest of the content validated for a word
+    def digest(self, key):
+        return content_digest(self.store.get(key)["langs" if self.what == 'word' else "samples"])
+
+    # Method: Prompt for a batch of words
+    def prompt(self, batch):
+        field = "langs" if self.what == 'word' else "samples"
+        items = {key: self.store.get(key)[field] for key in batch}
+        header = gpt_prompt_validate_words if self.what == 'word' else gpt_prompt_validate_sentences
+        return f"{header}{VALIDATION_PROMPT_MARKER}\n{json.dumps(items, ensure_ascii=False, separators=(',', ':'))}"
+
+    # Method: Save validated flags (one bulk write) and checkpoint the batch (runs in a worker thread)
+    def _save(self, batch, result):
+        records, validated = [], []
+        for key in batch:
+            item = result.get(key)
+            if not isinstance(item, dict):
+                continue  # not answered: stays pending for the next run
+            ok = item.get("validated") is True
+            records.append({"key": key, "what": self.what, "validated": ok, "digest": self.digest(key),
+                            "corrections": item.get("corrections"), "time": time.time()})
+            if ok:
+                validated.append(key)
+
+        if validated and not self.dry_run:
+            repository = self.store.repository
+            if self.what == 'word':
+                repository.write_words([(key, self.store.get(key)["langs"], True) for key in validated])
+            else:
+                repository.write_sentences([(key, self.store.get(key)["samples"], True) for key in validated])
+        if not self.dry_run:
+            self.journal.append(records)
+        return records
+
+    # Method: Validate one batch end to end
+    async def _process(self, batch):
+        prompt = self.prompt(batch)
+
+        # Respect the request rate, then send
+        await self.bucket.acquire()
+        if self.verbose:
+            print(f"⏳ Validating {self.what}: {', '.join(batch)}")
+        out = await self.connector.send_prompt(prompt)
+        self.stats["requests"] += 1
+
+        result = out.get('result', {})
+        if not isinstance(result, dict):
+            result = {}
+        records = await asyncio.to_thread(self._save, batch, result)
+
+        n_validated = sum(r["validated"] for r in records)
+        self.stats["words"] += len(records)
+        self.stats["validated"] += n_validated
+        self.stats["rejected"] += len(records) - n_validated
+        self.stats["missing"] += len(batch) - len(records)
+        for r in records:
+            if not r["validated"]:
+                print(f"❌ {r['key']}: {self.what} validation failed: {json.dumps(r['corrections'], ensure_ascii=False)}")
+
+    # Method: Worker coroutine, pulls batches from the queue until it is empty
+    async def _worker(self, queue):
+        while True:
+            try:
+                batch = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                await self._process(batch)
+            except CircuitOpenError as e:
+                # API failing for now: wait for the circuit to close, then send the batch again
+                print(f"⏸️ Circuit open, retrying in {e.retry_in:.0f} s ({', '.join(batch)})")
+                await asyncio.sleep(max(e.retry_in, CIRCUIT_WAIT_MIN))
+                queue.put_nowait(batch)
+                continue
+            except Exception as e:
+                self.stats["failed"] += 1
+                print(f"❌ Batch failed ({', '.join(batch)}): {e}")
+
+                # Hard failure (bad configuration): drop the remaining batches
+                if is_fatal(e):
+                    self.stats["aborted"] = f"{type(e).__name__}: {e}"
+                    while not queue.empty():
+                        queue.get_nowait()
+            self.stats["batches"] += 1
+
+    # Method: Run the validation over the given keys (all pending words by default)
+    async def run(self, keys=None):
+        t0 = time.perf_counter()
+
+        # Create connector on first run
+        if self.connector is None:
+            self.connector = AsyncGPTConnector(model=ai_model)
+        usage = dict(getattr(self.connector, "usage", {}))
+
+        # Queue all batches, then let the workers drain it
+        pending = await asyncio.to_thread(self.pending, keys)
+        print(f"🔎 {len(pending)} words to validate ({self.what}), {self.batch_size} per prompt, {self.concurrency} in flight")
+        queue = asyncio.Queue()
+        for b in range(0, len(pending), self.batch_size):
+            queue.put_nowait(tuple(pending[b:b+self.batch_size]))
+        await asyncio.gather(*(self._worker(queue) for _ in range(self.concurrency)))
+
+        # Every batch went through: the next run starts from an empty journal
+        # (after a failed batch, the journal still holds the words rejected by this run)
+        if not self.stats["aborted"] and not self.stats["failed"] and not self.dry_run:
+            self.journal.rotate()
+
+        # Token usage of this run
+        for name in ("prompt_tokens", "completion_tokens"):
+            self.stats[name] = getattr(self.connector, "usage", {}).get(name, 0) - usage.get(name, 0)
+        self.stats["seconds"] = time.perf_counter() - t0
+        return self.stats
+
+    # Method: Blocking helper around run()
+    def run_sync(self, keys=None):
+        return asyncio.run(self.run(keys))
+
+    # Method: Words and tokens per minute of the last run
+    def throughput(self):
+        minutes = max(self.stats["seconds"], 1e-9) / 60
+        tokens = self.stats["prompt_tokens"] + self.stats["completion_tokens"]
+        return {"words_per_min": self.stats["words"] / minutes, "tokens_per_min": tokens / minutes}
+
+#================#
+# Main execution #
+#================#
+# Example: python -m languageninja.models.validation --what sentences --fake 0.5
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate translations or sentences in batches.")
+    parser.add_argument("--what", choices=["word", "sentences"], default="sentences")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--rps", type=float, default=REQUESTS_PER_SECOND)
+    parser.add_argument("--journal", default=JOURNAL_FILE_PATH)
+    parser.add_argument("--fresh", action="store_true", help="ignore (delete) the journal of previous runs")
+    parser.add_argument("--fake", type=float, default=None, metavar="LATENCY",
+                        help="validate against a local fake API with the given latency (dry run: no flags or journal saved)")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = None
+    connector = None
+    if args.fake is not None:
+        from languageninja.models.fakegpt import FakeChatServer
+        from languageninja.models.gptcache import ResponseCache
+        server = FakeChatServer(latency=args.fake).start()
+        # Fake answers must not end up in the response cache
+        connector = AsyncGPTConnector(model=ai_model, base_url=server.base_url, api_key="fake", cache=ResponseCache(mode="off"))
+
+    runner = ValidationRunner(what=args.what, batch_size=args.batch_size, concurrency=args.concurrency,
+                              requests_per_second=args.rps, connector=connector, journal_path=args.journal,
+                              dry_run=server is not None, verbose=args.verbose)
+    if args.fresh:
+        runner.journal.clear()
+    try:
+        stats = runner.run_sync()
+    finally:
+        if server is not None:
+            server.stop()
+
+    rates = runner.throughput()
+    print(f"🏁 {stats['validated']} validated, {stats['rejected']} rejected, {stats['missing']} unanswered, "
+          f"{stats['failed']} failed batches in {stats['requests']} requests, {stats['seconds']:.1f} s "
+          f"({rates['words_per_min']:.0f} words/min, {rates['tokens_per_min']:.0f} tokens/min)")
+    if stats['aborted']:
+        print(f"🛑 Aborted: {stats['aborted']}")
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os, threading
+from languageninja.models.word import Word, WORDS_FOLDER_PATH, SENTENCES_FOLDER_PATH
+from languageninja.models.repository import open_repository
+from languageninja.models.keyindex import KeyIndex, WORD_STATS_FILE_PATH
+from languageninja.models.corpus import CorpusReader, CORPUS_FILE_PATH, encode_entry, corpus_digest
+
+#-------------------#
+# Static parameters #
+#-------------------#
+RANDOM_NO_REPEAT = 10  # /api/random does not repeat a word within the last N draws
+
+#-------------------------------------#
+# Class definition: VocabularyStore   #
+#-------------------------------------#
+# Read-only, in-memory copy of the whole corpus (translations + sample sentences).
+# All records are read once from the repository (JSON folders or SQLite) by load(); lookups never touch the disk.
+# If a packed corpus file is configured (see corpus.py), it is memory-mapped instead
+# and entries are decoded on demand.
+class VocabularyStore():
+
+    # Class constructor
+    def __init__(self, words_folder=WORDS_FOLDER_PATH, sentences_folder=SENTENCES_FOLDER_PATH,
+                 stats_file=WORD_STATS_FILE_PATH, no_repeat=RANDOM_NO_REPEAT, corpus_file=CORPUS_FILE_PATH,
+                 repository=None):
+
+        # Set sources
+        self.words_folder = words_folder
+        self.sentences_folder = sentences_folder
+        self.corpus_file = corpus_file
+        self.stats_file = stats_file
+        self.no_repeat = no_repeat
+        self.repository = repository or open_repository(words_folder=words_folder, sentences_folder=sentences_folder)
+
+        # Entries indexed by word key (or packed corpus), and key index (sorted keys + sampling tables)
+        self._entries = {}
+        self._corpus = None
+        self._retired = None    # corpus replaced by the last reload, closed by the next one
+        self.index = KeyIndex()
+
+        # Content version (same digest as the packed corpus header), changes whenever the data does
+        self.version = None
+
+        # Guard concurrent (re)loads
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    # Method: Read every word/sentence record into memory (or map the packed corpus)
+    def load(self, verbose=False):
+
+        # Packed corpus: map it and index its keys
+        if self.corpus_file and os.path.exists(self.corpus_file):
+            corpus = CorpusReader(self.corpus_file)
+
+            # Same content as the mapped corpus: keep the current mapping
+            if self._corpus is not None and self._corpus.version == corpus.version:
+                corpus.close()
+                return
+
+            index = KeyIndex(corpus.keys(), weights=KeyIndex.load_weights(self.stats_file), no_repeat=self.no_repeat)
+            with self._lock:
+                self._entries = {}
+                self._retire(self._corpus)
+                self._corpus = corpus
+                self.index = index
+                self.version = corpus.version
+                self.loaded = True
+            if verbose:
+                print(f"📦 Mapped {len(corpus)} words from {self.corpus_file}.")
+            return
+
+        # Build new entries off to the side, then swap them in at once
+        entries = {}
+        for key, record in self.repository.entries(verbose=verbose):
+
+            # Translations and sample sentences (merged over the same skeletons used by Word)
+            langs = Word.default_langs(key)
+            if record["langs"]:
+                langs.update(record["langs"])
+            samples = Word.default_samples()
+            if record["samples"]:
+                samples.update(record["samples"])
+            words_validated = record["words_validated"]
+            sentences_validated = record["sentences_validated"]
+
+            entries[key] = {
+                "key": key,
+                "langs": langs,
+                "samples": samples,
+                "words_validated": words_validated,
+                "sentences_validated": sentences_validated,
+            }
+
+        # Key index for listing and random sampling
+        index = KeyIndex(entries, weights=KeyIndex.load_weights(self.stats_file), no_repeat=self.no_repeat)
+
+        # Content version
+        version = corpus_digest([key.encode('utf-8') for key in index], [encode_entry(entries[key]) for key in index]).hex()
+
+        with self._lock:
+            self._entries = entries
+            self._retire(self._corpus)
+            self._corpus = None
+            self.index = index
+            self.version = version
+            self.loaded = True
+
+        if verbose:
+            print(f"📚 Loaded {len(entries)} words into memory.")
+
+    # Method: Release a replaced corpus mapping (call with the lock held)
+    # Requests that fetched the old mapping just before the swap may still be decoding from it,
+    # so it is closed one reload later rather than right away.
+    def _retire(self, corpus):
+        if self._retired is not None:
+            self._retired.close()
+        self._retired = corpus
+
+    # Method: Explicit reload hook (re-reads the folders and swaps the data in)
+    def reload(self, verbose=False):
+        self.load(verbose=verbose)
+
+    # Method: Load on first use if load() was never called
+    def ensure_loaded(self):
+        if not self.loaded:
+            self.load()
+
+    # Method: Get entry for word key (None if unknown). Returned dicts are shared: do not modify.
+    def get(self, key):
+        self.ensure_loaded()
+        corpus = self._corpus
+        if corpus is not None:
+            return corpus.get(key)
+        return self._entries.get(key)
+
+    # Method: Sorted word keys (KeyIndex, indexable like a list)
+    def keys(self):
+        self.ensure_loaded()
+        return self.index
+
+    # Method: Random entry (optionally frequency-weighted), None if the store is empty
+    def random(self, weighted=False):
+        self.ensure_loaded()
+        index = self.index
+        key = index.sample(weighted=weighted)
+        return None if key is None else self.get(key)
+
+    # Method: Up to n distinct random keys (optionally frequency-weighted), e.g. to preload a session
+    def random_keys(self, n, weighted=False):
+        self.ensure_loaded()
+        index = self.index
+        n = min(n, len(index))
+        picked, attempts = {}, 0
+        while len(picked) < n and attempts < 4 * n + 16:
+            picked.setdefault(index.sample(weighted=weighted), None)
+            attempts += 1
+        return list(picked)
+
+    def __contains__(self, key):
+        self.ensure_loaded()
+        return key in self.index
+
+    def __len__(self):
+        self.ensure_loaded()
+        return len(self.index)
+
+#-----------------------#
+# Shared store instance #
+#-----------------------#
+vocabulary = VocabularyStore()
+
+#================#
+# Main execution #
+#================#
+if __name__ == "__main__":
+    import time
+    t0 = time.perf_counter()
+    vocabulary.load(verbose=True)
+    print(f"⏱️ Loaded in {1000*(time.perf_counter()-t0):.1f} ms")
@@ -1,23 +1,101 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import json, rich, os
+import json, os
 from random import randint
-from languageninja.models.gptclient import GPTConnector
+from languageninja.common.executor import run_command
+from languageninja.models.gptclient import shared_connector
+from languageninja.models.repository import shared_repository, CorruptRecordError
 
 #-------------------#
 # Static parameters #
 #-------------------#
 WORDS_FOLDER_PATH     = './data/words'
 SENTENCES_FOLDER_PATH = './data/sentences'
+AUDIO_FOLDER_PATH     = './data/audio'
+
+# Language codes, and number of sample sentences rendered to audio per language
+LANGS = ['en', 'fr', 'es', 'pt', 'ru', 'il']
+AUDIO_SENTENCES = [0, 1, 2]
+AUDIO_RATES = ['normal', 'slow']
+
+# Map language codes to MacOS voice names
+VOICE_MAP = {
+    "en": "Samantha",
+    "fr": "Thomas",
+    "es": "Mónica",
+    "pt": "Joana",
+    "ru": "Milena",
+    "il": "Carmit",
+}
+
+# Speech rates (words per minute) per language
+RATE_MAP = {
+    'normal': {
+        "en": 130,
+        "fr": 130,
+        "es": 90,
+        "pt": 160,
+        "ru": 120,
+        "il": 100,
+    },
+    'slow': {
+        "en": 80,
+        "fr": 70,
+        "es": 40,
+        "pt": 90,
+        "ru": 60,
+        "il": 50,
+    },
+}
+
+#-----------------------#
+# Auxiliary functions   #
+#-----------------------#
+
+# Text to speak (native script) and text to print for a word or one of its sample sentences
+def speech_text(langs, samples, lang, sentence=None):
+    match lang:
+        case 'en' | 'fr' | 'es' | 'pt':
+            text_to_print = text_to_speak = samples[lang][sentence] if isinstance(sentence, int) else langs[lang]
+        case 'ru':
+            text_to_speak = samples['ru']['cyr'][sentence] if isinstance(sentence, int) else langs['ru']['cyr']
+            text_to_print = samples['ru']['lat'][sentence] + ' / ' + text_to_speak if isinstance(sentence, int) else langs['ru']['lat']
+        case 'il':
+            text_to_speak = samples['il']['heb'][sentence] if isinstance(sentence, int) else langs['il']['heb']
+            text_to_print = samples['il']['lat'][sentence] + ' / ' + text_to_speak if isinstance(sentence, int) else langs['il']['lat']
+        case _:
+            raise ValueError(f"Unsupported language code: {lang}")
+    return text_to_speak, text_to_print
+
+# Audio file path for a word clip, e.g. data/audio/may/may_en_00_normal.mp3
+def audio_file_path(key, lang, sentence, rate, ext='mp3', folder=AUDIO_FOLDER_PATH):
+    return os.path.join(folder, key, f"{key}_{lang}_{str(sentence).zfill(2)}_{rate}.{ext}")
+
+# Parse a clip file name of a word (inverse of audio_file_path): (lang, sentence, rate, ext), or None
+def parse_audio_file_name(key, file_name):
+    stem, _, ext = file_name.rpartition('.')
+    prefix = f"{key}_"
+    if not stem.startswith(prefix):
+        return None
+    parts = stem[len(prefix):].split('_')
+    if len(parts) != 3 or parts[0] not in LANGS or parts[2] not in AUDIO_RATES:
+        return None
+    lang, sentence, rate = parts
+    if sentence == 'None':
+        return lang, None, rate, ext
+    if len(sentence) < 2 or not sentence.isdigit():
+        return None
+    return lang, int(sentence), rate, ext
 
 #------------------------#
 # GPT API Initialisation #
 #------------------------#
 
-# Initialize GPT connector
+# GPT connector (created on first use, so importing this module stays cheap)
 ai_model = "gpt-5"
-print(f"Using AI model: {ai_model}")
-ai = GPTConnector(model=ai_model)
+
+def get_ai():
+    return shared_connector(ai_model)
 
 # GPT prompt for word validation
 gpt_prompt_words = """
@@ -58,8 +136,25 @@ class Word():
         self.sentences_file_path = f"{SENTENCES_FOLDER_PATH}/{self.key}.json"
 
         # Initialise translations
-        self.langs = {
-            'en' : self.key,
+        self.langs = Word.default_langs(self.key)
+
+        # Initialise sample sentences
+        self.samples = Word.default_samples()
+
+        # Load existing data from files (if any)
+        self.load(verbose=verbose)
+
+        # Translations exist?
+        self.translations_exist = self.langs['fr'] is not None
+
+        # Current number of sample sentences
+        self.n_samples = len(self.samples['en'])
+
+    # Static method: Empty translations skeleton
+    @staticmethod
+    def default_langs(key):
+        return {
+            'en' : key,
             'fr' : None,
             'es' : None,
             'pt' : None,
@@ -73,8 +168,10 @@ class Word():
             }
         }
 
-        # Initialise sample sentences
-        self.samples = {
+    # Static method: Empty sample sentences skeleton
+    @staticmethod
+    def default_samples():
+        return {
             'en' : [],
             'fr' : [],
             'es' : [],
@@ -89,15 +186,6 @@ class Word():
             }
         }
 
-        # Load existing data from files (if any)
-        self.load(verbose=verbose)
-
-        # Translations exist?
-        self.translations_exist = self.langs['fr'] is not None
-
-        # Current number of sample sentences
-        self.n_samples = len(self.samples['en'])
-
     # Method: Print word as header
     def print_header(self):
         print('='*(self.len+12))
@@ -108,69 +196,39 @@ class Word():
     def to_json(self):
         return json.dumps(self.langs, ensure_ascii=False, indent=4)
 
-    # Method: Load word JSON from file (if exists)
+    # Method: Load word from the repository (if it exists)
+    # The packed corpus is a read-only snapshot for the API: words are saved to the repository,
+    # so loading them from the corpus would write stale content back on the next save.
     def load(self, verbose=False):
 
-        # Load JSON data from file (if exists)
-        try:
-            with open(self.word_file_path, 'r') as f:
-                data = json.load(f)
-                self.langs.update(data[self.key])
-                self.words_validated = data.get("validated", False)
-        except FileNotFoundError:
-            if verbose:
-                print(f"⚠️ File not found: {self.word_file_path}")
-        except json.JSONDecodeError:
-            if verbose:
-                print(f"❌ Error decoding JSON from file: {self.word_file_path}")
-        except Exception as e:
-            if verbose:
-                print(f"❌ An unexpected error occurred: {e}")
-
-        # Load JSON data from file (if exists)
+        # Load from the repository (JSON folders or SQLite)
         try:
-            with open(self.sentences_file_path, 'r') as f:
-                data = json.load(f)
-                self.samples.update(data[self.key])
-                self.sentences_validated = data.get("validated", False)
-        except FileNotFoundError:
-            if verbose:
-                print(f"⚠️ File not found: {self.sentences_file_path}")
-        except json.JSONDecodeError:
-            if verbose:
-                print(f"❌ Error decoding JSON from file: {self.sentences_file_path}")
+            record = shared_repository().read(self.key, verbose=verbose)
+        except CorruptRecordError as e:
+            # Not a missing word: saving over the skeleton would lose the file's content
+            print(f"❌ {e}")
+            raise
         except Exception as e:
             if verbose:
                 print(f"❌ An unexpected error occurred: {e}")
-
-    # Method: Save word JSON to file
+            return
+        if record["langs"]:
+            self.langs.update(record["langs"])
+            self.words_validated = record["words_validated"]
+        if record["samples"]:
+            self.samples.update(record["samples"])
+            self.sentences_validated = record["sentences_validated"]
+
+    # Method: Save word to the repository
     def save(self, what_to_save='both'):
 
         # Save translations
         if what_to_save in ['both', 'word']:
-
-            # Build data dictionary
-            data = {
-                self.key: self.langs,
-                "validated": self.words_validated
-            }
-
-            # Write data to file
-            with open(self.word_file_path, 'w') as f:
-                json.dump(data, f, ensure_ascii=False, indent=4)
+            shared_repository().write_words([(self.key, self.langs, self.words_validated)])
 
         # Save sample sentences
         if what_to_save in ['both', 'sentences']:
-
-            # Build data dictionary
-            data = {
-                self.key: self.samples,
-                "validated": self.sentences_validated
-            }
-
-            # Write data to file
-            with open(self.sentences_file_path, 'w') as f:
-                json.dump(data, f, ensure_ascii=False, indent=4)
+            shared_repository().write_sentences([(self.key, self.samples, self.sentences_validated)])
 
     # Method: Say the word or sentence using MacOS text-to-speech
     # The 'sentence' parameter can be the index or "random" to select a sample sentence
@@ -181,59 +239,28 @@ class Word():
             sentence = randint(0, len(self.samples[lang]) - 1) if self.samples[lang] else None
 
         # Determine text to speak
-        # Use Switch/ case:
-        match lang:
-            case 'en' | 'fr' | 'es' | 'pt':
-                text_to_print = text_to_speak = self.samples[lang][sentence] if isinstance(sentence, int) else self.langs[lang]
-            case 'ru':
-                text_to_speak = self.samples['ru']['cyr'][sentence] if isinstance(sentence, int) else self.langs['ru']['cyr']
-                text_to_print = self.samples['ru']['lat'][sentence] + ' / ' + text_to_speak if isinstance(sentence, int) else self.langs['ru']['lat']
-            case 'il':
-                text_to_speak = self.samples['il']['heb'][sentence] if isinstance(sentence, int) else self.langs['il']['heb']
-                text_to_print = self.samples['il']['lat'][sentence] + ' / ' + text_to_speak if isinstance(sentence, int) else self.langs['il']['lat']
-            case _:
-                print(f"Unsupported language code: {lang}")
-                return
+        try:
+            text_to_speak, text_to_print = speech_text(self.langs, self.samples, lang, sentence)
+        except ValueError as e:
+            print(e)
+            return
 
-        # Map language codes to MacOS voice names
-        voice_map = {
-            "en": "Samantha",
-            "fr": "Thomas",
-            "es": "Mónica",
-            "pt": "Joana",
-            "ru": "Milena",
-            "il": "Carmit",
-        }
-        voice = voice_map[lang]
-
-        # Rate defaults
-        if rate is None or rate == 'normal':
-            rate_val = {
-                "en": 130,
-                "fr": 130,
-                "es": 90,
-                "pt": 160,
-                "ru": 120,
-                "il": 100,
-            }[lang]
-        elif rate == 'slow':
-            rate_val = {
-                "en": 80,
-                "fr": 70,
-                "es": 40,
-                "pt": 90,
-                "ru": 60,
-                "il": 50,
-            }[lang]
+        # Voice and rate
+        voice = VOICE_MAP[lang]
+        rate_val = RATE_MAP['slow' if rate == 'slow' else 'normal'][lang]
+
+        # Command as an argument vector (no shell); the text goes through stdin, so quotes are harmless
+        cmd = ['say', '-v', voice]
 
         # Optional rate flag (words per minute)
-        rate_flag = f"-r {int(rate_val)} " if isinstance(rate_val, (int, float)) else ""
+        if isinstance(rate_val, (int, float)):
+            cmd += ['-r', int(rate_val)]
 
         # Save to file or speak directly
         if save_to_file:
 
             # Generate file path
-            file_path = f"data/audio/{self.key}/{self.key}_{lang}_{str(sentence).zfill(2)}_{rate}.aiff"
+            file_path = audio_file_path(self.key, lang, sentence, rate, ext='aiff')
 
             # Create directory if it doesn't exist
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
@@ -245,19 +272,23 @@ class Word():
 
             # Print and save audio to file
             print(f'Saving speech to {file_path} in \'{lang}\' ({voice}): {text_to_print}')
-            os.system(f'say -v {voice} {rate_flag}-o {file_path} "{text_to_speak}"')
+            cmd += ['-o', file_path]
 
-        # Execute MacOS say command
+        # Speak directly
         else:
             print(f'Speaking in {lang} ({voice}): {text_to_print}')
-            os.system(f'say -v {voice} {rate_flag}"{text_to_speak}"')
 
-    # Method: Generate audio files for all languages, sentences, and rates
-    def generate_audio(self):
-        for lang in self.langs:
-            for sentence in [0, 1, 2]:
-                for rate in ['normal', 'slow']:
-                    self.say(lang=lang, sentence=sentence, rate=rate, save_to_file=True)
+        # Execute MacOS say command
+        result = run_command(cmd, input=text_to_speak.encode('utf-8'))
+        if not result.ok:
+            print(f'❌ say failed (exit code {result.returncode}): {result.error_text()}')
+        return result
+
+    # Method: Generate audio files for all languages, sentences, and rates (see audio/engine.py)
+    def generate_audio(self, backend=None, workers=None, force=False):
+        from languageninja.audio.engine import AudioEngine
+        from languageninja.audio.tts import TTS_BACKEND
+        return AudioEngine(backend=backend or TTS_BACKEND, workers=workers).build(keys=[self.key], force=force)
 
     # Method: Validate translations using GPT
     def validate(self, what=None, verbose=False):
@@ -289,15 +320,16 @@ class Word():
                 print("⏳ Waiting for word validation ...")
 
             # Execute prompt (function already returns parsed JSON)
-            out = ai.send_prompt(full_prompt)
+            out = get_ai().send_prompt(full_prompt)
 
             # Check validation result
             if out.get("validated") is True:
                 print("✅ Word translations validated successfully.")
                 self.words_validated = True
-                self.save()
+                self.save('word')
             else:
                 print("❌ Word translations validation failed. Corrections:")
+                import rich
                 rich.print_json(data=out.get("corrections", {}))
 
         # Word already validated
@@ -324,15 +356,16 @@ class Word():
                 print("⏳ Waiting for sentence validation ...")
 
             # Execute prompt (function already returns parsed JSON)
-            out = ai.send_prompt(full_prompt)
+            out = get_ai().send_prompt(full_prompt)
 
             # Check validation result
             if out.get("validated") is True:
                 print("✅ Sample sentences validated successfully.")
                 self.sentences_validated = True
-                self.save()
+                self.save('sentences')
             else:
                 print("❌ Sample sentences validation failed. Corrections:")
+                import rich
                 rich.print_json(data=out.get("corrections", {}))
 
         # Sentences already validated
@@ -341,15 +374,15 @@ class Word():
 
     # Method: Get word list
     @staticmethod
-    def get_word_list():
-        word_files = [f for f in os.listdir(WORDS_FOLDER_PATH) if f.endswith('.json')]
-        word_list = [os.path.splitext(f)[0] for f in word_files]
-        return word_list
+    def get_word_list(refresh=False):
+        from languageninja.models.keyindex import shared_index
+        return list(shared_index(refresh=refresh))
 
 #================#
 # Main execution #
 #================#
 if __name__ == "__main__":
+    import rich
 
     # Pick random word from data/words folder
     word_files = [f for f in os.listdir(WORDS_FOLDER_PATH) if f.endswith('.json')]
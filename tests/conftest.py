@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import pytest
+from languageninja.models import repository
+
+# Empty data folder as the working directory, with a fresh shared repository
+@pytest.fixture
+def data_folder(tmp_path, monkeypatch):
+    for folder in ("words", "sentences"):
+        (tmp_path / "data" / folder).mkdir(parents=True)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(repository, "_shared_repository", None)
+    return tmp_path / "data"
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import json, os, time
+from languageninja.models.fakegpt import FakeChatServer, FakeHTTPError, default_responder
+from languageninja.models.gptcache import ResponseCache
+from languageninja.models.gptclient import AsyncGPTConnector
+from languageninja.models.gptretry import RetryPolicy
+from languageninja.models.pipeline import GenerationPipeline
+
+WORDS = ["alpha", "beta", "gamma"]
+
+# Pipeline talking to the fake server (no response cache, short backoff: only Retry-After makes it wait)
+def fake_pipeline(server, what):
+    connector = AsyncGPTConnector(model="fake", base_url=server.base_url, api_key="fake",
+                                  cache=ResponseCache(mode="off"), policy=RetryPolicy(base_delay=0.01))
+    return GenerationPipeline(what=what, concurrency=1, requests_per_second=100, burst=100, connector=connector)
+
+def saved(folder, key):
+    with open(folder / f"{key}.json", encoding="utf-8") as f:
+        return json.load(f)[key]
+
+def test_words_and_sentences_are_saved(data_folder):
+    with FakeChatServer() as server:
+        words = fake_pipeline(server, "words").run_sync(WORDS)
+        sentences = fake_pipeline(server, "sentences").run_sync(WORDS)
+
+    assert words["generated"] == len(WORDS) and words["failed"] == 0
+    assert sentences["generated"] == len(WORDS) and sentences["failed"] == 0
+    for key in WORDS:
+        assert saved(data_folder / "words", key)["fr"] == f"{key} (fr)"
+        assert saved(data_folder / "sentences", key)["en"][0] == f"Sentence 0 with {key} (en)."
+
+def test_missing_words_are_requeued(data_folder):
+    calls = []
+
+    # First answer leaves out the last word
+    def responder(prompt):
+        calls.append(prompt)
+        answer = default_responder(prompt)
+        if len(calls) == 1:
+            answer["result"] = answer["result"][:-1]
+        return answer
+
+    with FakeChatServer(responder=responder) as server:
+        stats = fake_pipeline(server, "words").run_sync(WORDS)
+
+    assert stats["requeued"] == 1 and stats["dropped"] == 0
+    assert stats["requests"] == 2 and stats["generated"] == len(WORDS)
+    assert WORDS[-1] in calls[1] and WORDS[0] not in calls[1]
+    assert sorted(os.listdir(data_folder / "words")) == [f"{key}.json" for key in WORDS]
+
+def test_rate_limit_retry_after_is_respected(data_folder):
+    times = []
+
+    # First request is rate limited for one second
+    def responder(prompt):
+        times.append(time.monotonic())
+        if len(times) == 1:
+            raise FakeHTTPError(429, "Rate limit reached", retry_after=1)
+        return default_responder(prompt)
+
+    with FakeChatServer(responder=responder) as server:
+        stats = fake_pipeline(server, "words").run_sync(WORDS)
+
+    assert len(times) == 2 and times[1] - times[0] >= 0.9
+    assert stats["generated"] == len(WORDS) and stats["failed"] == 0
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import json, os
+from languageninja.models.fakegpt import FakeChatServer, FakeHTTPError, fake_langs
+from languageninja.models.gptcache import ResponseCache
+from languageninja.models.gptclient import AsyncGPTConnector
+from languageninja.models.gptretry import RetryPolicy
+from languageninja.models.repository import JsonRepository
+from languageninja.models.validation import ValidationRunner, VALIDATION_PROMPT_MARKER
+
+WORDS = ["alpha", "beta", "delta", "gamma", "kappa", "omega"]
+REJECTED = "kappa"
+
+# Runner validating translations against the fake server, two words per prompt, one prompt at a time
+def fake_runner(server, data_folder):
+    connector = AsyncGPTConnector(model="fake", base_url=server.base_url, api_key="fake",
+                                  cache=ResponseCache(mode="off"), policy=RetryPolicy(max_attempts=1))
+    return ValidationRunner(what='word', batch_size=2, concurrency=1, requests_per_second=100, burst=100,
+                            connector=connector, journal_path=str(data_folder / "validation_journal.jsonl"))
+
+def test_interrupted_run_resumes_without_repeating_or_skipping(data_folder):
+    repository = JsonRepository()
+    repository.write_words([(key, fake_langs(key), False) for key in WORDS])
+    repository.checkpoint()
+    checked, calls = [], []
+
+    # Second prompt fails (server error); one word is rejected
+    def responder(prompt):
+        items = json.loads(prompt.split(VALIDATION_PROMPT_MARKER, 1)[1])
+        calls.append(list(items))
+        if len(calls) == 2:
+            raise FakeHTTPError(500, "Server error")
+        checked.extend(items)
+        return {"result": {key: {"validated": key != REJECTED} for key in items}}
+
+    journal = data_folder / "validation_journal.jsonl"
+    with FakeChatServer(responder=responder) as server:
+        first = fake_runner(server, data_folder).run_sync()
+
+        # Failed batch: the journal is kept for the next run
+        assert first["failed"] == 1 and first["aborted"] is None
+        assert journal.exists()
+
+        second = fake_runner(server, data_folder).run_sync()
+
+    # The second run only sends the failed batch (the rejected word is skipped through the journal):
+    # every word checked exactly once
+    assert calls[-1] == calls[1] and len(calls) == len(WORDS) // 2 + 1
+    assert sorted(checked) == WORDS
+    assert second["failed"] == 0 and second["validated"] == 2
+
+    # Complete run: journal rotated, flags saved for accepted words only
+    assert not journal.exists() and os.path.exists(f"{journal}.prev")
+    repository = JsonRepository()
+    assert [key for key in WORDS if not repository.read(key)["words_validated"]] == [REJECTED]